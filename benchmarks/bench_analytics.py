@@ -0,0 +1,83 @@
+"""Time the vectorized trade analytics against a plain Python loop.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_analytics.py
+Trades are synthetic: 100k closed trades spread over roughly three years.
+"""
+
+import math
+import timeit
+
+import numpy as np
+
+from freqdash.analytics.performance import calculate, day_ms
+
+
+def synthetic_trades(size: int = 100_000, seed: int = 42) -> dict:
+    rng = np.random.default_rng(seed)
+    close = np.sort(rng.integers(0, 1000 * day_ms, size)) + 1_600_000_000_000
+    return {
+        "open_timestamp": close - rng.integers(60_000, day_ms, size),
+        "close_timestamp": close,
+        "profit_abs": rng.normal(0.05, 2.0, size),
+        "stake_amount": np.full(size, 100.0),
+        "exit_reason": rng.choice(
+            np.array(["roi", "stop_loss", "exit_signal", "trailing"], dtype=object),
+            size,
+        ),
+        "enter_tag": rng.choice(
+            np.array([f"tag_{i}" for i in range(12)], dtype=object), size
+        ),
+    }
+
+
+def loop(trades: dict, starting_capital: float, window: int = 20) -> dict:
+    profits = trades["profit_abs"].tolist()
+    closes = trades["close_timestamp"].tolist()
+    opens = trades["open_timestamp"].tolist()
+    equity, peak, drawdown = starting_capital, starting_capital, 0.0
+    daily: dict = {}
+    by_tag: dict = {}
+    holding = 0
+    for i, profit in enumerate(profits):
+        equity += profit
+        peak = max(peak, equity)
+        drawdown = max(drawdown, peak - equity)
+        day = closes[i] // day_ms
+        daily[day] = daily.get(day, 0.0) + profit
+        holding += closes[i] - opens[i]
+        for label in ["exit_reason", "enter_tag"]:
+            key = (label, trades[label][i])
+            count, wins = by_tag.get(key, (0, 0))
+            by_tag[key] = (count + 1, wins + (profit >= 0))
+    first = min(daily)
+    returns, equity = [], starting_capital
+    for day in range(first, max(daily) + 1):
+        returns.append(daily.get(day, 0.0) / equity)
+        equity += daily.get(day, 0.0)
+    mean = sum(returns) / len(returns)
+    deviation = math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - 1))
+    rolling = [sum(profits[i - window : i]) for i in range(window, len(profits) + 1)]
+    return {
+        "max_drawdown": drawdown,
+        "sharpe": mean / deviation * math.sqrt(365),
+        "holding": holding / len(profits),
+        "groups": by_tag,
+        "rolling": rolling,
+    }
+
+
+if __name__ == "__main__":
+    trades = synthetic_trades()
+    vectorized = calculate(trades, starting_capital=10_000.0)
+    python = loop(trades, starting_capital=10_000.0)
+    assert math.isclose(vectorized["max_drawdown"], python["max_drawdown"])
+    assert math.isclose(vectorized["sharpe"], python["sharpe"])
+
+    number = 5
+    old_time = timeit.timeit(lambda: loop(trades, 10_000.0), number=number)
+    new_time = timeit.timeit(lambda: calculate(trades, 10_000.0), number=number)
+    old_time, new_time = old_time / number * 1000, new_time / number * 1000
+    print(
+        f"{len(trades['profit_abs'])} trades  loop {old_time:8.2f}ms  "
+        f"numpy {new_time:8.2f}ms  x{old_time / new_time:5.1f}"
+    )
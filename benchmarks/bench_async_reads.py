@@ -0,0 +1,106 @@
+"""Compare the sync threadpool read path with the async one for dashboard pages.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_async_reads.py
+Each simulated request does what the index and /getnewspage routes do: three
+news counts and one news page. The sync path runs them one after another in a
+worker thread like a plain def route, the async path gathers them on the event
+loop like the async def routes.
+"""
+
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+requests = 400
+concurrency = 40
+seeded = 50_000
+
+
+def sync_request(database) -> None:
+    for start in [None, 1679414400000, 1679414400000 + seeded * 500]:
+        database.get_count_news_items(start=start)
+    database.get_news_page(limit=50)
+
+
+async def async_request(async_database) -> None:
+    await asyncio.gather(
+        *[
+            async_database.get_count_news_items(start=start)
+            for start in [None, 1679414400000, 1679414400000 + seeded * 500]
+        ],
+        async_database.get_news_page(limit=50),
+    )
+
+
+def run_sync(database) -> list:
+    def timed() -> float:
+        start = time.perf_counter()
+        sync_request(database)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda _: timed(), range(requests)))
+
+
+async def run_async(async_database) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed() -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await async_request(async_database)
+            return time.perf_counter() - start
+
+    latencies = await asyncio.gather(*[timed() for _ in range(requests)])
+    await async_database.dispose()
+    return latencies
+
+
+def report(label: str, elapsed: float, latencies: list) -> None:
+    latencies.sort()
+    print(
+        f"{label:6} requests/s {requests / elapsed:8.1f}  "
+        f"p50 {statistics.median(latencies) * 1000:7.2f}ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    from freqdash.core.config import Database as DBConfig
+    from freqdash.models.async_database import AsyncDatabase
+    from freqdash.models.database import Database
+
+    with tempfile.TemporaryDirectory() as folder:
+        database = Database(
+            config=DBConfig(
+                engine="sqlite",
+                username="",
+                password="",
+                name=str(Path(folder, "news")),
+                read_pool_size=concurrency,
+            )
+        )
+        database.delete_then_update_news(
+            exchange="binance",
+            data=[
+                {
+                    "headline": f"Binance will list token {i}",
+                    "category": "New Cryptocurrency Listing",
+                    "hyperlink": f"https://www.binance.com/en/support/{i}",
+                    "news_time": 1679414400000 + i * 1000,
+                }
+                for i in range(seeded)
+            ],
+        )
+        start = time.perf_counter()
+        latencies = run_sync(database)
+        report("sync", time.perf_counter() - start, latencies)
+        async_database = AsyncDatabase(database=database)
+        start = time.perf_counter()
+        latencies = asyncio.run(run_async(async_database))
+        report("async", time.perf_counter() - start, latencies)
@@ -0,0 +1,106 @@
+"""Compare the news page extractors against the original string helpers.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_extract.py
+Each fixture page is padded with filler so it is about the size of the live page.
+The filler goes in front of the wanted subtree, where the scan has to skip it,
+and after it, where it is never parsed.
+"""
+
+import json
+import timeit
+from pathlib import Path
+
+from freqdash.core.extract import Extractor
+from freqdash.core.utils import find_all_occurrences_in_string, find_in_string
+
+fixtures = Path(Path(__file__).parent.parent, "tests", "fixtures", "news")
+filler = json.dumps(
+    {f"widget_{i}": {"title": f"Promo {i}", "body": "x" * 200} for i in range(8000)}
+)
+
+
+def inflate(page: str, marker: str, after: bool = False) -> str:
+    if not after:
+        return page.replace(marker + "{", marker + '{"filler": ' + filler + ", ", 1)
+    end = page.rindex("}", 0, page.index("</script>", page.index(marker)))
+    return page[:end] + ', "filler": ' + filler + page[end:]
+
+
+def walk(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+
+def bench_json(name: str, marker: str, path: list, after: bool = False) -> None:
+    page = inflate(Path(fixtures, f"{name}.html").read_text(), marker, after=after)
+
+    def old():
+        return walk(
+            find_in_string(
+                string=page,
+                start_substring=marker,
+                end_substring="</script>",
+                return_json=True,
+            ),
+            path,
+        )
+
+    def new():
+        return Extractor(page).json_path(
+            path=path, start_substring=marker, end_substring="</script>"
+        )
+
+    assert old() == new()
+    report(name + ("/after" if after else ""), len(page), old, new)
+
+
+def bench_okx() -> None:
+    page = Path(fixtures, "okx.html").read_text()
+    page = page.replace("<main>", "<main>" + "<div>" + "x" * 2_000_000 + "</div>")
+
+    def old():
+        return [
+            find_in_string(string=section, start_substring='href="', end_substring='"')
+            for section in find_all_occurrences_in_string(
+                string=page,
+                start_substring='<section class="section">',
+                end_substring="</section>",
+            )
+        ]
+
+    def new():
+        extractor = Extractor(page)
+        return [
+            extractor.between('href="', '"', start=start, end=end)
+            for start, end in extractor.spans('<section class="section">', "</section>")
+        ]
+
+    assert old() == new()
+    report("okx", len(page), old, new)
+
+
+def report(name: str, size: int, old, new, number: int = 20) -> None:
+    old_time = timeit.timeit(old, number=number) / number * 1000
+    new_time = timeit.timeit(new, number=number) / number * 1000
+    print(
+        f"{name:<14} {size / 1_000_000:6.2f}MB  old {old_time:8.2f}ms  "
+        f"new {new_time:8.2f}ms  x{old_time / new_time:5.1f}"
+    )
+
+
+if __name__ == "__main__":
+    for after in [False, True]:
+        bench_json(
+            "binance",
+            '<script id="__APP_DATA" type="application/json">',
+            ["routeProps", "ce50", "catalogs"],
+            after=after,
+        )
+        bench_json(
+            "bybit",
+            '<script id="__NEXT_DATA__" type="application/json">',
+            ["props", "pageProps", "articleInitEntity", "list"],
+            after=after,
+        )
+    bench_okx()
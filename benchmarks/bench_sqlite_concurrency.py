@@ -0,0 +1,163 @@
+"""Compare concurrent reads and writes on the default and the WAL sqlite setup.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_sqlite_concurrency.py
+Writes go through the DatabaseWriter thread as in the app, adding trades and
+logs like the scraper does, while reader threads page through trades and
+performance like dashboard requests.
+Each mode runs in its own process because Database can only be built once.
+"""
+
+import logging
+import multiprocessing
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+duration = 5.0
+readers = 4
+seeded = 50_000
+
+
+def trade(trade_id: int) -> dict:
+    return {
+        "trade_id": trade_id,
+        "pair": "SUSHI/USDT",
+        "base_currency": "SUSHI",
+        "quote_currency": "USDT",
+        "exchange": "binance",
+        "is_open": False,
+        "amount": 10.0,
+        "stake_amount": 12.86,
+        "profit_abs": (trade_id % 7) - 3.0,
+        "enter_tag": "force_entry",
+        "fee_open_cost": 0.01286,
+        "fee_open_currency": "USDT",
+        "fee_close_cost": 0.013,
+        "fee_close_currency": "USDT",
+        "open_timestamp": 1670329806846 + trade_id * 60_000,
+        "open_rate": 1.286,
+        "close_timestamp": 1670329806846 + trade_id * 60_000 + 30_000,
+        "close_rate": 1.3,
+        "exit_reason": "roi",
+        "stop_loss_abs": 1.2,
+        "leverage": 1.0,
+        "is_short": False,
+        "trading_mode": "spot",
+        "funding_fees": 0.0,
+        "orders": [],
+    }
+
+
+def run(wal: bool, folder: str, results) -> None:
+    logging.disable(logging.INFO)
+    from sqlalchemy import insert
+
+    from freqdash.core.config import Database as DBConfig
+    from freqdash.models.database import Database
+    from freqdash.models.writer import DatabaseWriter
+
+    database = Database(
+        config=DBConfig(
+            engine="sqlite",
+            username="",
+            password="",
+            name=str(Path(folder, "wal" if wal else "default")),
+            sqlite_wal=wal,
+            read_pool_size=readers,
+        )
+    )
+    table_object = database.get_table_object(table_name="trades")
+    columns = table_object.columns.keys()
+    with database.write_session() as session:
+        session.execute(
+            insert(table_object),
+            [
+                {key: value for key, value in trade(i).items() if key in columns}
+                | {"host_id": 1, "trading_mode": "SPOT"}
+                for i in range(1, seeded + 1)
+            ],
+        )
+    writer = DatabaseWriter(database=database)
+    writer.start()
+    trade_id = seeded + 1
+    stop = threading.Event()
+    latencies: list = []
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def write() -> None:
+        nonlocal trade_id
+        while not stop.is_set():
+            try:
+                writer.submit(
+                    database.check_then_add_trades,
+                    data=[trade(trade_id + i) for i in range(5)],
+                    host_id=1,
+                ).result()
+                writer.submit(
+                    database.update_logs,
+                    data=[
+                        [
+                            None,
+                            trade(trade_id + i)["open_timestamp"],
+                            "bot",
+                            "INFO",
+                            "x",
+                        ]
+                        for i in range(20)
+                    ],
+                    host_id=1,
+                ).result()
+                counts["writes"] += 1
+            except Exception:
+                counts["errors"] += 1
+            trade_id += 5
+
+    def read() -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                database.get_trades_page(host_id=1, limit=50)
+                database.get_performance(group_by="pair", host_id=1)
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                counts["reads"] += 1
+
+    threads = [threading.Thread(target=write)]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    writer.stop()
+    latencies.sort()
+    results[wal] = counts | {
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as folder, context.Manager() as manager:
+        results = manager.dict()
+        for wal in [False, True]:
+            process = context.Process(target=run, args=(wal, folder, results))
+            process.start()
+            process.join()
+        for wal, label in [(False, "default"), (True, "wal")]:
+            result = results[wal]
+            print(
+                f"{label:8} reads/s {result['reads'] / duration:8.1f}  "
+                f"writes/s {result['writes'] / duration:6.1f}  "
+                f"p50 {result['p50']:6.2f}ms  p95 {result['p95']:7.2f}ms  "
+                f"errors {result['errors']}"
+            )
@@ -0,0 +1,122 @@
+"""Compare time to first byte and peak memory of a list response and a stream.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_streaming.py
+Both routes return every news item behind the same gzip middleware as the app,
+one builds the list and serializes it in one go like /getnews, the other
+streams NDJSON/CSV from the database cursor like /getnews?format=ndjson.
+The ASGI app is called directly so the time of the first body message is seen,
+the peak memory is taken from a separate run under tracemalloc.
+"""
+
+import asyncio
+import logging
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+seeded = 50_000
+
+
+async def call(app, path: str, query: str, traced: bool = False) -> dict:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+    result = {"first": None, "bytes": 0}
+    received = asyncio.Event()
+    start = time.perf_counter()
+
+    async def receive() -> dict:
+        # the request body once, then block like a client that stays connected
+        if received.is_set():
+            await asyncio.Event().wait()
+        received.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            if result["first"] is None and message.get("body"):
+                result["first"] = time.perf_counter() - start
+            result["bytes"] += len(message.get("body", b""))
+
+    if traced:
+        tracemalloc.start()
+    await app(scope, receive, send)
+    result["total"] = time.perf_counter() - start
+    if traced:
+        result["peak"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    from freqdash.core.config import Database as DBConfig
+    from freqdash.core.middleware import StreamingGZipMiddleware
+    from freqdash.models.database import Database
+    from freqdash.models.export import media_types, stream_records
+
+    with tempfile.TemporaryDirectory() as folder:
+        database = Database(
+            config=DBConfig(
+                engine="sqlite", username="", password="", name=str(Path(folder, "s"))
+            )
+        )
+        database.delete_then_update_news(
+            exchange="binance",
+            data=[
+                {
+                    "headline": f"Binance will list token {i}",
+                    "category": "New Cryptocurrency Listing",
+                    "hyperlink": f"https://www.binance.com/en/support/{i}",
+                    "news_time": 1679414400000 + i * 1000,
+                }
+                for i in range(seeded)
+            ],
+        )
+        app = FastAPI()
+        app.add_middleware(StreamingGZipMiddleware)
+
+        @app.get("/list")
+        def news_list():
+            return database.get_news_items(start=None, end=None, exchange=None)
+
+        @app.get("/stream")
+        def news_stream(stream_format: str = "ndjson"):
+            return StreamingResponse(
+                stream_records(
+                    database.stream_news_items(start=None, end=None, exchange=None),
+                    stream_format=stream_format,
+                ),
+                media_type=media_types[stream_format],
+            )
+
+        for label, path, query in [
+            ("json", "/list", ""),
+            ("ndjson", "/stream", "stream_format=ndjson"),
+            ("csv", "/stream", "stream_format=csv"),
+        ]:
+            # tracemalloc slows everything down, so timings come from a run
+            # without it and the peak from a second, traced run
+            result = asyncio.run(call(app, path, query))
+            result["peak"] = asyncio.run(call(app, path, query, traced=True))["peak"]
+            print(
+                f"{label:7} ttfb {result['first'] * 1000:8.1f}ms  "
+                f"total {result['total'] * 1000:8.1f}ms  "
+                f"peak {result['peak'] / 1024 / 1024:7.1f}MB  "
+                f"gzip bytes {result['bytes']}"
+            )
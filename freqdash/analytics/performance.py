@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from enum import Enum
+
+import numpy as np
+
+from freqdash.models.database import Database
+
+log = logging.getLogger(__name__)
+
+day_ms = 24 * 60 * 60 * 1000
+trade_columns = [
+    "open_timestamp",
+    "close_timestamp",
+    "profit_abs",
+    "stake_amount",
+    "exit_reason",
+    "enter_tag",
+]
+
+
+class PerformanceGroups(str, Enum):
+    PAIR = "pair"
+    BASE_CURRENCY = "base_currency"
+    ENTER_TAG = "enter_tag"
+    EXIT_REASON = "exit_reason"
+    STRATEGY = "strategy"
+
+
+def load_trades(database: Database, host_id: int) -> dict:
+    columns = database.get_closed_trade_columns(host_id=host_id, columns=trade_columns)
+    return {
+        "open_timestamp": np.asarray(columns["open_timestamp"], dtype=np.int64),
+        "close_timestamp": np.asarray(columns["close_timestamp"], dtype=np.int64),
+        "profit_abs": np.asarray(columns["profit_abs"], dtype=np.float64),
+        "stake_amount": np.asarray(columns["stake_amount"], dtype=np.float64),
+        "exit_reason": np.asarray(
+            [value or "" for value in columns["exit_reason"]], dtype=object
+        ),
+        "enter_tag": np.asarray(
+            [value or "" for value in columns["enter_tag"]], dtype=object
+        ),
+    }
+
+
+def max_drawdown(profits: np.ndarray, starting_capital: float = 0.0) -> dict:
+    if profits.size == 0:
+        return {"max_drawdown": 0.0, "max_drawdown_pct": 0.0, "index": None}
+    equity = starting_capital + np.cumsum(profits)
+    peaks = np.maximum.accumulate(np.concatenate(([starting_capital], equity)))[1:]
+    drawdowns = peaks - equity
+    index = int(np.argmax(drawdowns))
+    pct = 0.0
+    if peaks[index] > 0:
+        pct = float(drawdowns[index] / peaks[index] * 100)
+    return {
+        "max_drawdown": float(drawdowns[index]),
+        "max_drawdown_pct": pct,
+        "index": index if drawdowns[index] > 0 else None,
+    }
+
+
+def daily_returns(
+    close_timestamps: np.ndarray, profits: np.ndarray, capital: float
+) -> np.ndarray:
+    if profits.size == 0 or capital <= 0:
+        return np.empty(0)
+    days = close_timestamps // day_ms
+    daily = np.bincount(days - days.min(), weights=profits)
+    equity = capital + np.concatenate(([0.0], np.cumsum(daily)[:-1]))
+    return np.divide(daily, equity, out=np.zeros_like(daily), where=equity > 0)
+
+
+def sharpe_ratio(returns: np.ndarray, periods: int = 365) -> float | None:
+    if returns.size < 2:
+        return None
+    deviation = returns.std(ddof=1)
+    if deviation == 0:
+        return None
+    return float(returns.mean() / deviation * np.sqrt(periods))
+
+
+def sortino_ratio(returns: np.ndarray, periods: int = 365) -> float | None:
+    if returns.size < 2:
+        return None
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    if downside == 0:
+        return None
+    return float(returns.mean() / downside * np.sqrt(periods))
+
+
+def expectancy(profits: np.ndarray) -> dict:
+    if profits.size == 0:
+        return {"expectancy": 0.0, "expectancy_ratio": 0.0, "win_rate": 0.0}
+    wins = profits >= 0
+    win_rate = float(wins.mean())
+    average_win = float(profits[wins].mean()) if wins.any() else 0.0
+    average_loss = float(-profits[~wins].mean()) if (~wins).any() else 0.0
+    value = win_rate * average_win - (1 - win_rate) * average_loss
+    ratio = None
+    if average_loss > 0:
+        ratio = value / average_loss
+    return {"expectancy": value, "expectancy_ratio": ratio, "win_rate": win_rate}
+
+
+def factorize(labels: np.ndarray) -> tuple[list, np.ndarray]:
+    codes: dict = {}
+    groups = np.fromiter(
+        (codes.setdefault(label, len(codes)) for label in labels),
+        dtype=np.int64,
+        count=len(labels),
+    )
+    return list(codes), groups
+
+
+def win_rate_by(labels: np.ndarray, profits: np.ndarray) -> dict:
+    if profits.size == 0:
+        return {}
+    names, groups = factorize(labels)
+    counts = np.bincount(groups)
+    wins = np.bincount(groups, weights=profits >= 0)
+    totals = np.bincount(groups, weights=profits)
+    return {
+        str(name): {
+            "trades": int(counts[i]),
+            "win_rate": float(wins[i] / counts[i]),
+            "profit": float(totals[i]),
+        }
+        for i, name in enumerate(names)
+    }
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    if values.size < window:
+        return np.empty(0)
+    totals = np.cumsum(np.concatenate(([0.0], values)))
+    return totals[window:] - totals[:-window]
+
+
+def rolling_metrics(profits: np.ndarray, window: int = 20) -> dict:
+    wins = (profits >= 0).astype(np.float64)
+    profit = rolling_sum(profits, window)
+    win_rate = rolling_sum(wins, window) / window
+    win_profit = rolling_sum(np.where(profits >= 0, profits, 0.0), window)
+    loss_profit = rolling_sum(np.where(profits < 0, profits, 0.0), window)
+    profit_factor = np.divide(
+        win_profit,
+        -loss_profit,
+        out=np.full_like(win_profit, np.inf),
+        where=loss_profit < 0,
+    )
+    return {
+        "window": window,
+        "profit": profit,
+        "win_rate": win_rate,
+        "expectancy": profit / window,
+        "profit_factor": profit_factor,
+    }
+
+
+def calculate(trades: dict, starting_capital: float | None, window: int = 20) -> dict:
+    profits = trades["profit_abs"]
+    capital = starting_capital or 0.0
+    return_capital = capital
+    if return_capital <= 0 and profits.size > 0:
+        return_capital = float(trades["stake_amount"].mean())
+    returns = daily_returns(trades["close_timestamp"], profits, return_capital)
+    holding = trades["close_timestamp"] - trades["open_timestamp"]
+    drawdown = max_drawdown(profits, capital)
+    rolling = rolling_metrics(profits, window)
+    return {
+        "trades": int(profits.size),
+        "profit": float(profits.sum()),
+        "max_drawdown": drawdown["max_drawdown"],
+        "max_drawdown_pct": drawdown["max_drawdown_pct"],
+        "max_drawdown_timestamp": (
+            None
+            if drawdown["index"] is None
+            else int(trades["close_timestamp"][drawdown["index"]])
+        ),
+        "sharpe": sharpe_ratio(returns),
+        "sortino": sortino_ratio(returns),
+        **expectancy(profits),
+        "avg_holding_minutes": (
+            float(holding.mean() / 60000) if holding.size > 0 else 0.0
+        ),
+        "exit_reason": win_rate_by(trades["exit_reason"], profits),
+        "enter_tag": win_rate_by(trades["enter_tag"], profits),
+        "rolling": {
+            "window": window,
+            "close_timestamp": trades["close_timestamp"][window - 1 :].tolist(),
+            "profit": rolling["profit"].tolist(),
+            "win_rate": rolling["win_rate"].tolist(),
+            "expectancy": rolling["expectancy"].tolist(),
+            "profit_factor": np.where(
+                np.isinf(rolling["profit_factor"]), None, rolling["profit_factor"]
+            ).tolist(),
+        },
+    }
+
+
+class PerformanceAnalytics:
+    def __init__(self, database: Database, max_entries: int = 256) -> None:
+        self.database = database
+        # every window and group_by adds an entry, so only the most recently
+        # used results are kept
+        self.max_entries = max_entries
+        self.cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def cached(self, key: tuple, version) -> dict | list | None:
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is None or cached[0] != version:
+                return None
+            self.cache.move_to_end(key)
+            return cached[1]
+
+    def store(self, key: tuple, version, result: dict | list) -> None:
+        with self.lock:
+            self.cache[key] = (version, result)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+
+    def get(self, host_id: int, window: int = 20) -> dict:
+        # starting capital is rewritten on every scrape and feeds the
+        # drawdown and returns, so it is part of the version
+        starting_capital = self.database.get_starting_capital(host_id=host_id)
+        version = (
+            self.database.get_closed_trades_version(host_id=host_id),
+            starting_capital,
+        )
+        key = (host_id, window)
+        result = self.cached(key, version)
+        if result is not None:
+            return result
+
+        result = calculate(
+            trades=load_trades(self.database, host_id),
+            starting_capital=starting_capital,
+            window=window,
+        )
+        self.store(key, version, result)
+        log.info(f"Analytics calculated for host {host_id} at version {version}")
+        return result
+
+    def get_performance(self, group_by: str, host_id: int | None = None) -> list:
+        version = self.database.get_closed_trades_version(host_id=host_id)
+        key = ("performance", group_by, host_id)
+        result = self.cached(key, version)
+        if result is not None:
+            return result
+
+        result = self.database.get_performance(group_by=group_by, host_id=host_id)
+        self.store(key, version, result)
+        return result
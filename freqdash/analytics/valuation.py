@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from freqdash.exchange.utils import Markets
+from freqdash.models.database import Database
+
+log = logging.getLogger(__name__)
+
+reference_currency = "USDT"
+bridge_currencies = ["BTC", "ETH", "BNB"]
+
+
+def normalise_symbol(symbol: str) -> str:
+    return symbol.replace("-", "").replace("_", "").replace("/", "").upper()
+
+
+def price_vector(prices: dict, currencies: list) -> np.ndarray:
+    vector = np.full(len(currencies), np.nan)
+    for index, currency in enumerate(currencies):
+        if currency == reference_currency:
+            vector[index] = 1.0
+        elif currency + reference_currency in prices:
+            vector[index] = prices[currency + reference_currency]
+        elif prices.get(reference_currency + currency, 0) > 0:
+            vector[index] = 1 / prices[reference_currency + currency]
+        else:
+            for bridge in bridge_currencies:
+                if (
+                    currency + bridge in prices
+                    and bridge + reference_currency in prices
+                ):
+                    vector[index] = (
+                        prices[currency + bridge] * prices[bridge + reference_currency]
+                    )
+                    break
+    return vector
+
+
+def value_balances(
+    balances: np.ndarray, unit_prices: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    priced = ~np.isnan(unit_prices)
+    values = np.where(priced, balances * np.nan_to_num(unit_prices), 0.0)
+    return values, priced
+
+
+class FleetValuation:
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self.lock = threading.Lock()
+        self.snapshot: dict | None = None
+
+    def refresh(self) -> dict:
+        balances = self.database.get_all_balances()
+        if len(balances) == 0:
+            snapshot = {
+                "updated": int(datetime.now(timezone.utc).timestamp() * 1000),
+                "currency": reference_currency,
+                "total": 0.0,
+                "totals": {},
+                "currencies": {},
+                "hosts": {},
+            }
+            with self.lock:
+                self.snapshot = snapshot
+            log.info("Fleet valuation refreshed: no balances")
+            return snapshot
+
+        # spot prices win, futures only fill in symbols without a spot market
+        prices: dict = {}
+        for market in (Markets.SPOT, Markets.FUTURES):
+            for exchange, symbol, price in self.database.get_all_prices(
+                trading_mode=market.value
+            ):
+                prices.setdefault(exchange, {}).setdefault(
+                    normalise_symbol(symbol), price
+                )
+
+        hosts: dict = {}
+        for row in balances:
+            hosts.setdefault(row.host_id, (row.exchange, row.stake_currency))
+        host_ids = list(hosts)
+        # hosts that have not reported their config yet have no stake currency
+        stakes = sorted({stake for _, stake in hosts.values() if stake})
+        exchanges = sorted({exchange for exchange, stake in hosts.values()})
+        currencies = sorted({row.currency for row in balances} | set(stakes))
+        host_index = {host_id: index for index, host_id in enumerate(host_ids)}
+        currency_index = {currency: index for index, currency in enumerate(currencies)}
+
+        matrix = np.zeros((len(host_ids), len(currencies)))
+        np.add.at(
+            matrix,
+            (
+                np.fromiter(
+                    (host_index[row.host_id] for row in balances),
+                    dtype=np.int64,
+                    count=len(balances),
+                ),
+                np.fromiter(
+                    (currency_index[row.currency] for row in balances),
+                    dtype=np.int64,
+                    count=len(balances),
+                ),
+            ),
+            np.fromiter(
+                (row.balance for row in balances),
+                dtype=np.float64,
+                count=len(balances),
+            ),
+        )
+        price_matrix = np.vstack(
+            [
+                price_vector(prices.get(exchange, {}), currencies)
+                for exchange in exchanges
+            ]
+            or [np.empty((0, len(currencies)))]
+        )
+        host_exchange = np.array(
+            [exchanges.index(hosts[host_id][0]) for host_id in host_ids],
+            dtype=np.int64,
+        )
+        unit_prices = price_matrix[host_exchange]
+        values, priced = value_balances(matrix, unit_prices)
+        host_values = values.sum(axis=1)
+        stake_prices = np.array(
+            [
+                (
+                    unit_prices[index, currency_index[hosts[host_id][1]]]
+                    if hosts[host_id][1]
+                    else np.nan
+                )
+                for index, host_id in enumerate(host_ids)
+            ],
+            dtype=np.float64,
+        )
+
+        total = float(host_values.sum())
+        totals = {}
+        for stake in stakes:
+            reference_prices = price_matrix[:, currency_index[stake]]
+            reference_prices = reference_prices[~np.isnan(reference_prices)]
+            if reference_prices.size > 0:
+                totals[stake] = round(total / float(reference_prices.mean()), 8)
+
+        snapshot: dict = {
+            "updated": int(datetime.now(timezone.utc).timestamp() * 1000),
+            "currency": reference_currency,
+            "total": round(total, 8),
+            "totals": totals,
+            "currencies": {
+                currency: {
+                    "amount": round(float(amount), 8),
+                    "value": round(float(value), 8),
+                }
+                for currency, amount, value in zip(
+                    currencies, matrix.sum(axis=0), values.sum(axis=0)
+                )
+                if amount != 0
+            },
+            "hosts": {},
+        }
+        for index, host_id in enumerate(host_ids):
+            held = np.flatnonzero(matrix[index])
+            snapshot["hosts"][host_id] = {
+                "exchange": hosts[host_id][0],
+                "stake_currency": hosts[host_id][1],
+                "value": round(float(host_values[index]), 8),
+                "stake_value": (
+                    None
+                    if np.isnan(stake_prices[index]) or stake_prices[index] == 0
+                    else round(float(host_values[index] / stake_prices[index]), 8)
+                ),
+                "unpriced": [
+                    currencies[column] for column in held if not priced[index, column]
+                ],
+                "currencies": {
+                    currencies[column]: {
+                        "amount": float(matrix[index, column]),
+                        "value": round(float(values[index, column]), 8),
+                    }
+                    for column in held
+                },
+            }
+        with self.lock:
+            self.snapshot = snapshot
+        log.info(f"Fleet valuation refreshed: {len(host_ids)} hosts, {total} USDT")
+        return snapshot
+
+    def get(self, host_id: int | None = None) -> dict:
+        with self.lock:
+            snapshot = self.snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        if host_id is None:
+            return snapshot
+        if host_id not in snapshot["hosts"]:
+            return {"error": "instance not found"}
+        return snapshot["hosts"][host_id]
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+from freqdash.core.config import load_config
+from freqdash.models.database import Database
+from freqdash.models.export import ExportFormats, ExportTables, stream_export
+
+log = logging.getLogger(__name__)
+
+
+def rebuild_host_stats(database: Database, args) -> int:
+    mismatches = database.rebuild_host_stats(host_id=args.host_id)
+    for mismatch in mismatches:
+        print(
+            f"host {mismatch['host_id']} {mismatch['quote_currency']} "
+            f"{mismatch['column']}: stored {mismatch['stored']} "
+            f"calculated {mismatch['calculated']}"
+        )
+    print(f"{len(mismatches)} mismatches found, host_stats rebuilt")
+    return 1 if len(mismatches) > 0 and args.check else 0
+
+
+def rebuild_equity(database: Database, args) -> int:
+    rows = database.rebuild_equity_rollups(host_id=args.host_id)
+    print(f"equity_rollups rebuilt: {rows} rows")
+    return 0
+
+
+def check_freqtrade_stats(database: Database, args) -> int:
+    mismatches = database.check_freqtrade_stats(host_id=args.host_id)
+    for mismatch in mismatches:
+        print(
+            f"host {mismatch['host_id']} {mismatch['scope']} {mismatch['column']}: "
+            f"freqtrade {mismatch['freqtrade']} freqdash {mismatch['freqdash']}"
+        )
+    print(f"{len(mismatches)} mismatches found")
+    return 1 if len(mismatches) > 0 else 0
+
+
+def export(database: Database, args) -> int:
+    output = args.output
+    if output is None:
+        output = Path(f"{args.table}.{args.format}")
+    with open(output, "wb") as f:
+        for chunk in stream_export(
+            database=database,
+            table_name=args.table,
+            export_format=args.format,
+            host_id=args.host_id,
+            start=args.start,
+            end=args.end,
+            pair=args.pair,
+            chunk_size=args.chunk_size,
+        ):
+            f.write(chunk)
+    print(f"{args.table} exported to {output}")
+    return 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="freqdash")
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=Path(Path().resolve(), "config", "config.json"),
+        help="path to config.json",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-host-stats", help="recalculate host_stats from the trades table"
+    )
+    rebuild.add_argument("--host-id", type=int, default=None)
+    rebuild.add_argument(
+        "--check", action="store_true", help="exit with 1 if any mismatch was found"
+    )
+    rebuild.set_defaults(function=rebuild_host_stats)
+
+    equity = commands.add_parser(
+        "rebuild-equity", help="recalculate equity_rollups from the trades table"
+    )
+    equity.add_argument("--host-id", type=int, default=None)
+    equity.set_defaults(function=rebuild_equity)
+
+    check = commands.add_parser(
+        "check-freqtrade-stats",
+        help="compare ingested freqtrade /profit and /performance with local trades",
+    )
+    check.add_argument("--host-id", type=int, default=None)
+    check.set_defaults(function=check_freqtrade_stats)
+
+    export_parser = commands.add_parser(
+        "export", help="write trades or orders to a parquet or arrow file"
+    )
+    export_parser.add_argument("table", choices=[table.value for table in ExportTables])
+    export_parser.add_argument(
+        "--format",
+        choices=[export_format.value for export_format in ExportFormats],
+        default=ExportFormats.PARQUET.value,
+    )
+    export_parser.add_argument("--output", type=Path, default=None)
+    export_parser.add_argument("--host-id", type=int, default=None)
+    export_parser.add_argument(
+        "--start", type=int, default=None, help="from this timestamp in ms"
+    )
+    export_parser.add_argument(
+        "--end", type=int, default=None, help="up to this timestamp in ms"
+    )
+    export_parser.add_argument("--pair", default=None, help="e.g. BTC/USDT")
+    export_parser.add_argument("--chunk-size", type=int, default=10000)
+    export_parser.set_defaults(function=export)
+    return parser
+
+
+def main(argv: list | None = None) -> int:
+    args = get_parser().parse_args(argv)
+    config = load_config(path=args.config)
+    logging.basicConfig(
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        level=config.log_level.upper(),
+    )
+    database = Database(config=config.database, retention=config.retention)
+    return args.function(database, args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
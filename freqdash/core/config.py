@@ -27,6 +27,35 @@ class Database(BaseModel):
     host: IPvAnyAddress = IPvAnyAddress.validate("127.0.0.1")  # type: ignore
     port: int = Field(5432, ge=1, le=65535)
     name: str = "freqdash"
+    sqlite_wal: bool = True
+    sqlite_mmap_size: int = Field(268435456, ge=0)
+    sqlite_cache_size: int = -64000
+    sqlite_busy_timeout: int = Field(5000, ge=0)
+    read_pool_size: int = Field(4, ge=1)
+    pool_size: int = Field(5, ge=1)
+    max_overflow: int = Field(10, ge=0)
+    pool_timeout: int = Field(30, ge=1)
+    pool_pre_ping: bool = True
+    pool_recycle: int = Field(1800, ge=-1)
+    statement_timeout: int = Field(0, ge=0)
+    read_replica_url: str | None = None
+    partition_by_month: bool = False
+    partition_months_ahead: int = Field(3, ge=1)
+
+
+class Retention(BaseModel):
+    sysinfo_raw_days: int = Field(7, ge=1)
+    sysinfo_5m_days: int = Field(30, ge=1)
+    sysinfo_1h_days: int = Field(365, ge=1)
+    logs_days: int = Field(30, ge=1)
+    logs_max_rows: int = Field(100000, ge=1000)
+    balances_daily_after_days: int = Field(30, ge=1)
+    open_trade_snapshot_days: int = Field(14, ge=1)
+    news_days: int = Field(90, ge=1)
+    prices_days: int = Field(7, ge=1)
+    batch_size: int = Field(5000, ge=100)
+    vacuum: bool = False
+    compaction_interval: int = Field(3600, ge=60)
 
 
 class LocalFreqtradeAPI(BaseModel):
@@ -63,6 +92,8 @@ class Config(BaseModel):
     log_level: str = "info"
     news_source: list[Exchanges] = ["binance", "bybit", "okx"]  # type: ignore
     scrape_interval: int = 600
+    ingest_freqtrade_stats: bool = False
+    retention: Retention = Retention()
 
     @validator("scrape_interval")
     def interval_amount(cls, v):
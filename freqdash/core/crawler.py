@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from freqdash.core.utils import build_url, send_public_request
+
+log = logging.getLogger(__name__)
+
+
+class DomainLimiter:
+    def __init__(self, max_concurrency: int = 2, min_interval: float = 0.25) -> None:
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait_for_slot(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        self.wait_for_slot()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.semaphore.release()
+
+
+class Crawler:
+    def __init__(
+        self,
+        max_workers: int = 8,
+        per_domain_concurrency: int = 2,
+        min_interval: float = 0.25,
+        max_validators: int = 512,
+    ) -> None:
+        self.max_workers = max_workers
+        self.per_domain_concurrency = per_domain_concurrency
+        self.min_interval = min_interval
+        self.limiters: dict[str, DomainLimiter] = {}
+        # paginated and dated urls keep changing, so only the most recently
+        # used ones keep their validators
+        self.max_validators = max_validators
+        self.validators: OrderedDict[str, dict] = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = self.empty_stats()
+
+    def empty_stats(self) -> dict:
+        return {
+            "requests": 0,
+            "parsed": 0,
+            "not_modified": 0,
+            "unchanged": 0,
+            "bytes_saved": 0,
+            "parse_time_saved": 0.0,
+        }
+
+    def cycle_report(self) -> dict:
+        with self.lock:
+            report, self.stats = self.stats, self.empty_stats()
+        report["parse_time_saved"] = round(report["parse_time_saved"], 4)
+        return report
+
+    def record(
+        self, result: str, bytes_saved: int = 0, parse_time_saved: float = 0.0
+    ) -> None:
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats[result] += 1
+            self.stats["bytes_saved"] += bytes_saved
+            self.stats["parse_time_saved"] += parse_time_saved
+
+    def get_limiter(self, url: str) -> DomainLimiter:
+        domain = urlparse(url).netloc
+        with self.lock:
+            if domain not in self.limiters:
+                self.limiters[domain] = DomainLimiter(
+                    max_concurrency=self.per_domain_concurrency,
+                    min_interval=self.min_interval,
+                )
+            return self.limiters[domain]
+
+    def fetch(
+        self,
+        url: str,
+        url_path: str | None = None,
+        payload: dict | None = None,
+        json: bool = True,
+        extra_headers: dict | None = None,
+    ):
+        with self.get_limiter(url):
+            return send_public_request(
+                url=url,
+                url_path=url_path,
+                payload=payload,
+                json=json,
+                extra_headers=extra_headers,
+            )
+
+    def fetch_parsed(
+        self,
+        url: str,
+        parse,
+        url_path: str | None = None,
+        payload: dict | None = None,
+    ):
+        key = build_url(url=url, url_path=url_path, payload=payload)
+        with self.lock:
+            cached = self.validators.get(key)
+            if cached is not None:
+                self.validators.move_to_end(key)
+
+        extra_headers = {}
+        if cached is not None:
+            if cached["etag"] is not None:
+                extra_headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"] is not None:
+                extra_headers["If-Modified-Since"] = cached["last_modified"]
+
+        header, raw_text = self.fetch(
+            url=url,
+            url_path=url_path,
+            payload=payload,
+            json=False,
+            extra_headers=extra_headers,
+        )
+        if raw_text is None:
+            if cached is not None:
+                log.debug(f"{key} not modified")
+                self.record(
+                    result="not_modified",
+                    bytes_saved=cached["size"],
+                    parse_time_saved=cached["parse_time"],
+                )
+                return cached["parsed"]
+            raw_text = ""
+
+        digest = hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
+        if cached is not None and cached["digest"] == digest:
+            log.debug(f"{key} unchanged")
+            self.record(result="unchanged", parse_time_saved=cached["parse_time"])
+            return cached["parsed"]
+
+        start = time.perf_counter()
+        parsed = parse(raw_text)
+        parse_time = time.perf_counter() - start
+        self.record(result="parsed")
+        if len(raw_text) > 0:
+            with self.lock:
+                self.validators[key] = {
+                    "etag": header.get("ETag"),
+                    "last_modified": header.get("Last-Modified"),
+                    "digest": digest,
+                    "size": len(raw_text.encode("utf-8")),
+                    "parse_time": parse_time,
+                    "parsed": parsed,
+                }
+                self.validators.move_to_end(key)
+                while len(self.validators) > self.max_validators:
+                    self.validators.popitem(last=False)
+        return parsed
+
+    def map(self, function, items) -> list:
+        items = list(items)
+        if len(items) < 2:
+            return [function(item) for item in items]
+        workers = min(self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(function, items))
+
+
+crawler = Crawler()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from json.decoder import scanstring
+
+log = logging.getLogger(__name__)
+
+decoder = json.JSONDecoder()
+
+whitespace = re.compile(r"\s*")
+colon = re.compile(r"\s*:\s*")
+comma = re.compile(r"\s*,\s*")
+closing = re.compile(r"\s*}")
+
+
+def member(text: str, key: str, position: int) -> int | None:
+    # walks the members of the object at position and returns where the value
+    # of key starts, so keys of nested objects or inside strings never match;
+    # the values of other keys are skipped whole by the C scanner
+    position = whitespace.match(text, position).end()
+    if text[position : position + 1] != "{":
+        return None
+    position = whitespace.match(text, position + 1).end()
+    while text[position : position + 1] == '"':
+        name, position = scanstring(text, position + 1)
+        separator = colon.match(text, position)
+        if separator is None:
+            raise ValueError(f"Expecting ':' delimiter at {position}")
+        if name == key:
+            return separator.end()
+        try:
+            value, position = decoder.scan_once(text, separator.end())
+        except StopIteration as e:
+            raise ValueError(f"Expecting value at {e.value}")
+        separator = comma.match(text, position)
+        if separator is None:
+            if closing.match(text, position) is None:
+                raise ValueError(f"Expecting ',' delimiter at {position}")
+            return None
+        position = separator.end()
+    return None
+
+
+class Extractor:
+    def __init__(self, data: str | bytes | bytearray | memoryview) -> None:
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        self.buffer = data
+        self.is_bytes = isinstance(data, bytes)
+
+    def encode(self, marker: str | bytes):
+        if self.is_bytes and isinstance(marker, str):
+            return marker.encode("utf-8")
+        if not self.is_bytes and isinstance(marker, bytes):
+            return marker.decode("utf-8")
+        return marker
+
+    def text(self, span: tuple[int, int] | None) -> str:
+        if span is None:
+            return ""
+        if self.is_bytes:
+            return str(memoryview(self.buffer)[span[0] : span[1]], "utf-8")
+        return self.buffer[span[0] : span[1]]
+
+    def span(
+        self,
+        start_substring: str | bytes,
+        end_substring: str | bytes | None = None,
+        start: int = 0,
+        end: int | None = None,
+    ) -> tuple[int, int] | None:
+        if end is None:
+            end = len(self.buffer)
+        start_substring = self.encode(start_substring)
+        start_index = self.buffer.find(start_substring, start, end)
+        if start_index == -1:
+            return None
+        start_index += len(start_substring)
+        if end_substring is None:
+            return start_index, end
+        end_index = self.buffer.find(self.encode(end_substring), start_index, end)
+        if end_index == -1:
+            return None
+        return start_index, end_index
+
+    def spans(
+        self,
+        start_substring: str | bytes,
+        end_substring: str | bytes,
+        start: int = 0,
+        end: int | None = None,
+    ) -> list:
+        if end is None:
+            end = len(self.buffer)
+        start_substring = self.encode(start_substring)
+        end_substring = self.encode(end_substring)
+        occurrences = []
+        start_index = self.buffer.find(start_substring, start, end)
+        while start_index > -1:
+            text_start = start_index + len(start_substring)
+            end_index = self.buffer.find(end_substring, text_start, end)
+            if end_index == -1:
+                break
+            occurrences.append((text_start, end_index))
+            start_index = self.buffer.find(start_substring, text_start, end)
+        return occurrences
+
+    def between(
+        self,
+        start_substring: str | bytes,
+        end_substring: str | bytes | None = None,
+        start: int = 0,
+        end: int | None = None,
+    ) -> str:
+        return self.text(self.span(start_substring, end_substring, start, end))
+
+    def all_between(
+        self,
+        start_substring: str | bytes,
+        end_substring: str | bytes,
+        start: int = 0,
+        end: int | None = None,
+    ) -> list:
+        return [
+            self.text(span)
+            for span in self.spans(start_substring, end_substring, start, end)
+        ]
+
+    def json_path(
+        self,
+        path: list,
+        start_substring: str | bytes,
+        end_substring: str | bytes,
+    ):
+        blob = self.span(start_substring, end_substring)
+        if blob is None:
+            return None
+        text = self.text(blob)
+        position = 0
+        try:
+            for key in path:
+                position = member(text, key, position)
+                if position is None:
+                    return None
+            value, length = decoder.raw_decode(text, position)
+            return value
+        except ValueError:
+            log.info(f"Subtree {path} could not be decoded, parsing full blob")
+        try:
+            value = json.loads(text)
+        except ValueError as e:
+            log.warning(f"JSON decode error: {e}")
+            return None
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                return None
+            value = value[key]
+        return value
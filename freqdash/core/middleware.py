@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import gzip
+import io
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class FlushingGzipFile(gzip.GzipFile):
+    def write(self, data) -> int:
+        written = super().write(data)
+        self.flush()
+        return written
+
+
+class StreamingGZipResponder(GZipResponder):
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int = 9) -> None:
+        super().__init__(app, minimum_size, compresslevel=compresslevel)
+        # without a flush zlib holds on to streamed chunks until its own
+        # buffer fills, which delays the first bytes of a streaming response
+        self.gzip_buffer = io.BytesIO()
+        self.gzip_file = FlushingGzipFile(
+            mode="wb", fileobj=self.gzip_buffer, compresslevel=compresslevel
+        )
+
+
+class StreamingGZipMiddleware(GZipMiddleware):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = StreamingGZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -41,6 +41,19 @@ def dispatch_request(http_method, key=None, auth=None):
     }.get(http_method, "GET")
 
 
+def build_url(
+    url: str, url_path: str | None = None, payload: dict | None = None
+) -> str:
+    if url_path is not None:
+        url += url_path
+    if payload is None:
+        payload = {}
+    query_string = urlencode(payload, True)
+    if query_string:
+        url = url + "?" + query_string
+    return url
+
+
 def send_public_request(
     url: str,
     method: str = "GET",
@@ -49,18 +62,15 @@ def send_public_request(
     auth: tuple | None = None,
     access_token: str | None = None,
     json: bool = True,
+    extra_headers: dict | None = None,
 ):
     empty_response = BlankResponse().content
-    if url_path is not None:
-        url += url_path
-    if payload is None:
-        payload = {}
-    query_string = urlencode(payload, True)
-    if query_string:
-        url = url + "?" + query_string
+    url = build_url(url=url, url_path=url_path, payload=payload)
 
     log.debug(f"Requesting {url}")
     headers = {"Authorization": f"Bearer {access_token}"}
+    if extra_headers is not None:
+        headers |= extra_headers
 
     try:
         response = dispatch_request(method)(
@@ -68,6 +78,8 @@ def send_public_request(
         )
         headers = response.headers
         if not json:
+            if response.status_code == 304:
+                return headers, None
             return headers, response.text
         json_response = response.json()
         if "code" in json_response and "msg" in json_response:
@@ -3,7 +3,9 @@ from __future__ import annotations
 import logging
 from decimal import Decimal
 
-from freqdash.core.utils import find_in_string, send_public_request
+from freqdash.core.crawler import crawler
+from freqdash.core.extract import Extractor
+from freqdash.core.utils import send_public_request
 from freqdash.exchange.exchange import Exchange
 from freqdash.exchange.utils import Intervals, Settle
 
@@ -153,46 +155,45 @@ class Binance(Exchange):
             ]
         return []
 
+    news_categories = {
+        48: "New crypto",
+        49: "Latest news",
+        93: "Latest activities",
+        50: "New fiat",
+        161: "Delisting",
+        157: "Wallet",
+        51: "API",
+        128: "Airdrop",
+    }
+
     def get_news(self) -> list:
-        news_type = {
-            48: "New crypto",
-            49: "Latest news",
-            93: "Latest activities",
-            50: "New fiat",
-            161: "Delisting",
-            157: "Wallet",
-            51: "API",
-            128: "Airdrop",
-        }
-        header, raw_text = send_public_request(
-            url=self.news_url, url_path="c-51?navId=51", json=False
+        return list(
+            crawler.fetch_parsed(
+                url=self.news_url, url_path="c-51?navId=51", parse=self.parse_news
+            )
         )
-        to_find_start = '<script id="__APP_DATA" type="application/json">'
-        to_find_end = "</script>"
+
+    def parse_news(self, raw_text: str) -> list:
         news: list = []
-        text = find_in_string(
-            string=raw_text,
-            start_substring=to_find_start,
-            end_substring=to_find_end,
-            return_json=True,
+        catalogs = Extractor(raw_text).json_path(
+            path=["routeProps", "ce50", "catalogs"],
+            start_substring='<script id="__APP_DATA" type="application/json">',
+            end_substring="</script>",
         )
-        if len(text) > 0:
-            if "routeProps" in text:
-                if "ce50" in text["routeProps"]:
-                    if "catalogs" in text["routeProps"]["ce50"]:
-                        for catalog in text["routeProps"]["ce50"]["catalogs"]:
-                            catalog_id = catalog["catalogId"]
-                            if "articles" in catalog:
-                                for article in catalog["articles"]:
-                                    headline = article["title"]
-                                    code = article["code"]
-                                    release = article["releaseDate"]
-                                    news.append(
-                                        {
-                                            "headline": headline,
-                                            "category": news_type[catalog_id],
-                                            "hyperlink": f"{self.news_url}{code}",
-                                            "news_time": release,
-                                        }
-                                    )
+        if catalogs is not None:
+            for catalog in catalogs:
+                catalog_id = catalog["catalogId"]
+                if "articles" in catalog:
+                    for article in catalog["articles"]:
+                        headline = article["title"]
+                        code = article["code"]
+                        release = article["releaseDate"]
+                        news.append(
+                            {
+                                "headline": headline,
+                                "category": self.news_categories[catalog_id],
+                                "hyperlink": f"{self.news_url}{code}",
+                                "news_time": release,
+                            }
+                        )
         return news
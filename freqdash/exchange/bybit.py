@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import logging
 from decimal import Decimal
+from functools import partial
 
-from freqdash.core.utils import find_in_string, send_public_request
+from freqdash.core.crawler import crawler
+from freqdash.core.extract import Extractor
+from freqdash.core.utils import send_public_request
 from freqdash.exchange.exchange import Exchange
 from freqdash.exchange.utils import Intervals, Settle
 
@@ -179,62 +182,53 @@ class Bybit(Exchange):
                 ]
         return []
 
+    news_categories = {
+        "new_crypto": "New crypto",
+        "latest_activities": "Latest activities",
+        "latest_bybit_news": "Latest news",
+        "product_updates": "Product",
+        "new_fiat_listings": "New fiat",
+        "maintenance_updates": "API",
+        "delistings": "Delisting",
+        "other": "Other",
+    }
+
     def get_news(self) -> list:
-        all_categories = [
-            "new_crypto",
-            "latest_activities",
-            "latest_bybit_news",
-            "product_updates",
-            "new_fiat_listings",
-            "maintenance_updates",
-            "delistings",
-            "other",
-        ]
-        news_type = {
-            "new_crypto": "New crypto",
-            "latest_bybit_news": "Latest news",
-            "latest_activities": "Latest activities",
-            "new_fiat_listings": "New fiat",
-            "delistings": "Delisting",
-            "product_updates": "Product",
-            "maintenance_updates": "API",
-            "other": "Other",
-        }
         news: list = []
-        for category in all_categories:
-            params: dict = {"category": category, "page": 1}
-            header, raw_text = send_public_request(
-                url=self.news_url, payload=params, json=False
-            )
-            to_find_start = '<script id="__NEXT_DATA__" type="application/json">'
-            to_find_end = "</script>"
-
-            text = find_in_string(
-                string=raw_text,
-                start_substring=to_find_start,
-                end_substring=to_find_end,
-                return_json=True,
+        for category_news in crawler.map(
+            self.get_category_news, [*self.news_categories]
+        ):
+            news += category_news
+        return news
+
+    def get_category_news(self, category: str) -> list:
+        params: dict = {"category": category, "page": 1}
+        return list(
+            crawler.fetch_parsed(
+                url=self.news_url,
+                payload=params,
+                parse=partial(self.parse_category_news, category),
             )
-            if len(text) > 0:
-                if "props" in text:
-                    if "pageProps" in text["props"]:
-                        if "articleInitEntity" in text["props"]["pageProps"]:
-                            if (
-                                "list"
-                                in text["props"]["pageProps"]["articleInitEntity"]
-                            ):
-                                for item in text["props"]["pageProps"][
-                                    "articleInitEntity"
-                                ]["list"]:
-                                    headline = item["title"]
-                                    release = item["date_timestamp"] * 1000
-                                    code = item["url"]
-                                    news.append(
-                                        {
-                                            "headline": headline,
-                                            "category": news_type[category],
-                                            "hyperlink": f"{self.news_url}{code}",
-                                            "news_time": release,
-                                        }
-                                    )
+        )
+
+    def parse_category_news(self, category: str, raw_text: str) -> list:
+        news: list = []
+        articles = Extractor(raw_text).json_path(
+            path=["props", "pageProps", "articleInitEntity", "list"],
+            start_substring='<script id="__NEXT_DATA__" type="application/json">',
+            end_substring="</script>",
+        )
+        if articles is not None:
+            for item in articles:
+                headline = item["title"]
+                release = item["date_timestamp"] * 1000
+                code = item["url"]
+                news.append(
+                    {
+                        "headline": headline,
+                        "category": self.news_categories[category],
+                        "hyperlink": f"{self.news_url}{code}",
+                        "news_time": release,
+                    }
+                )
         return news
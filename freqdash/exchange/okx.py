@@ -3,12 +3,11 @@ from __future__ import annotations
 import logging
 from datetime import datetime
 from decimal import Decimal
+from functools import partial
 
-from freqdash.core.utils import (
-    find_all_occurrences_in_string,
-    find_in_string,
-    send_public_request,
-)
+from freqdash.core.crawler import crawler
+from freqdash.core.extract import Extractor
+from freqdash.core.utils import find_in_string, send_public_request
 from freqdash.exchange.exchange import Exchange
 from freqdash.exchange.utils import Intervals, Settle
 
@@ -201,35 +200,47 @@ class Okx(Exchange):
                     ]
         return []
 
+    news_categories = {
+        "New-Token": "New crypto",
+        "Latest-Announcements": "Latest news",
+        "Latest-Event": "Latest activities",
+        "Fiat-Gateway": "New fiat",
+        "Spot-Margin-Trading": "Spot Crypto",
+        "Derivatives": "Derivatives Crypto",
+        "Deposit-Withdrawal-Suspension-Resumption": "Wallet",
+        "Product-Updates": "Product",
+        "API": "API",
+        "Others": "Other",
+    }
+
+    news_sections_skipped = [
+        "OKB-Buy-back-Burn",
+        "Introduction-to-Digital-Assets",
+        "OKX-Pool-Announcement",
+        "OKX-Broker",
+        "OKC",
+        "P2P-Trading",
+    ]
+
     def get_news(self) -> list:
-        news_type = {
-            "New-Token": "New crypto",
-            "Latest-Announcements": "Latest news",
-            "Latest-Event": "Latest activities",
-            "Fiat-Gateway": "New fiat",
-            "Spot-Margin-Trading": "Spot Crypto",
-            "Derivatives": "Derivatives Crypto",
-            "Deposit-Withdrawal-Suspension-Resumption": "Wallet",
-            "Product-Updates": "Product",
-            "API": "API",
-            "Others": "Other",
-        }
-        header, raw_text = send_public_request(
+        section_links = crawler.fetch_parsed(
             url=self.news_url,
             url_path="/hc/en-us/categories/115000275131-Announcements",
-            json=False,
+            parse=self.parse_sections,
         )
-        to_find_start = '<section class="section">'
-        to_find_end = "</section>"
         news: list = []
-        sections = find_all_occurrences_in_string(
-            string=raw_text, start_substring=to_find_start, end_substring=to_find_end
-        )
-        to_find_start = 'href="'
-        to_find_end = '"'
-        for section in sections:
-            section_link = find_in_string(
-                string=section, start_substring=to_find_start, end_substring=to_find_end
+        for section_news in crawler.map(self.get_section_news, section_links):
+            news += section_news
+        return news
+
+    def parse_sections(self, raw_text: str) -> list:
+        extractor = Extractor(raw_text)
+        section_links: list = []
+        for start, end in extractor.spans(
+            start_substring='<section class="section">', end_substring="</section>"
+        ):
+            section_link = extractor.between(
+                start_substring='href="', end_substring='"', start=start, end=end
             )
             if len(section_link) > 0:
                 section_name = find_in_string(
@@ -237,50 +248,60 @@ class Okx(Exchange):
                 )
                 section_name = find_in_string(string=section_name, start_substring="-")
                 section_name = section_name.strip()
-                if section_name in [
-                    "OKB-Buy-back-Burn",
-                    "Introduction-to-Digital-Assets",
-                    "OKX-Pool-Announcement",
-                    "OKX-Broker",
-                    "OKC",
-                    "P2P-Trading",
-                ]:
+                if section_name in self.news_sections_skipped:
                     continue
-                header, raw_text = send_public_request(
-                    url=self.news_url, url_path=f"{section_link}", json=False
-                )
-                articles = find_all_occurrences_in_string(
-                    string=raw_text,
-                    start_substring='<li class="article-list-item',
-                    end_substring="</li>",
-                )
-                for article in articles:
-                    article_link = find_in_string(
-                        string=article,
-                        start_substring=to_find_start,
-                        end_substring=to_find_end,
-                    )
-                    header, raw_text = send_public_request(
-                        url=self.news_url, url_path=f"{article_link}", json=False
-                    )
-                    title = find_in_string(
-                        string=raw_text, start_substring="<h1", end_substring="</h1>"
-                    )
-                    title = find_in_string(string=title, start_substring=">")
-                    title = title.strip()
-                    release = find_in_string(
-                        string=raw_text,
-                        start_substring='<time datetime="',
-                        end_substring='"',
-                    )
-                    release = datetime.strptime(release, "%Y-%m-%dT%H:%M:%SZ")
-                    release = int(release.timestamp() * 1000)
-                    news.append(
-                        {
-                            "headline": title,
-                            "category": news_type[section_name],
-                            "hyperlink": f"{self.news_url}{article_link}",
-                            "news_time": release,
-                        }
-                    )
-        return news
+                section_links.append((section_name, section_link))
+        return section_links
+
+    def get_section_news(self, section: tuple) -> list:
+        section_name, section_link = section
+        article_links = crawler.fetch_parsed(
+            url=self.news_url,
+            url_path=f"{section_link}",
+            parse=self.parse_section,
+        )
+        return crawler.map(
+            self.get_article_news,
+            [(section_name, article_link) for article_link in article_links],
+        )
+
+    def parse_section(self, raw_text: str) -> list:
+        extractor = Extractor(raw_text)
+        return [
+            extractor.between(
+                start_substring='href="', end_substring='"', start=start, end=end
+            )
+            for start, end in extractor.spans(
+                start_substring='<li class="article-list-item', end_substring="</li>"
+            )
+        ]
+
+    def get_article_news(self, article: tuple) -> dict:
+        section_name, article_link = article
+        return dict(
+            crawler.fetch_parsed(
+                url=self.news_url,
+                url_path=f"{article_link}",
+                parse=partial(self.parse_article, section_name, article_link),
+            )
+        )
+
+    def parse_article(self, section_name: str, article_link: str, raw_text: str):
+        extractor = Extractor(raw_text)
+        title_span = extractor.span(start_substring="<h1", end_substring="</h1>")
+        title = ""
+        if title_span is not None:
+            title = extractor.between(
+                start_substring=">", start=title_span[0], end=title_span[1]
+            ).strip()
+        release = extractor.between(
+            start_substring='<time datetime="', end_substring='"'
+        )
+        release = datetime.strptime(release, "%Y-%m-%dT%H:%M:%SZ")
+        release = int(release.timestamp() * 1000)
+        return {
+            "headline": title,
+            "category": self.news_categories[section_name],
+            "hyperlink": f"{self.news_url}{article_link}",
+            "news_time": release,
+        }
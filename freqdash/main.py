@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
 from datetime import time as dt_time
 from datetime import timedelta
@@ -11,18 +13,32 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi import Path as fPath
-from fastapi import Request
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import Query, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from freqdash.analytics.performance import PerformanceAnalytics, PerformanceGroups
+from freqdash.analytics.valuation import FleetValuation
 from freqdash.connection.factory import load_tunnels
 from freqdash.core.config import load_config
+from freqdash.core.crawler import crawler
+from freqdash.core.middleware import StreamingGZipMiddleware
 from freqdash.core.utils import dt_to_ts
 from freqdash.exchange.factory import load_exchanges
 from freqdash.exchange.utils import Exchanges, Intervals, Markets, Settle
-from freqdash.models.database import Database
+from freqdash.models.async_database import AsyncDatabase
+from freqdash.models.database import Database, LogLevels, rollup_periods
+from freqdash.models.export import (
+    ExportFormats,
+    ExportTables,
+    StreamFormats,
+    media_types,
+    stream_export,
+    stream_records,
+)
+from freqdash.models.retention import RetentionJobs
+from freqdash.models.writer import DatabaseWriter
 from freqdash.scraper.scraper import Scraper
 
 ssh_keys_folder = Path(Path().resolve(), "ssh_keys")
@@ -42,41 +58,54 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 log.info("freqdash started")
 
-database = Database(config=config.database)
+database = Database(config=config.database, retention=config.retention)
+writer = DatabaseWriter(database=database)
+async_database = AsyncDatabase(database=database)
+retention_jobs = RetentionJobs(
+    database=database, writer=writer, retention=config.retention
+)
 tunnels = load_tunnels(
     config=config.remote_freqtrade_instances, ssh_keys_folder=ssh_keys_folder
 )
-scraper = Scraper(tunnels=tunnels, database=database)
+scraper = Scraper(
+    tunnels=tunnels,
+    database=database,
+    ingest_freqtrade_stats=config.ingest_freqtrade_stats,
+    writer=writer,
+)
+analytics = PerformanceAnalytics(database=database)
+valuation = FleetValuation(database=database)
 
 app = FastAPI()
 app.mount("/static", StaticFiles(directory="static"), name="static")
-app.add_middleware(GZipMiddleware)
+app.add_middleware(StreamingGZipMiddleware)
 templates = Jinja2Templates(directory="templates")
 
 exchanges = load_exchanges()
 
 
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
-def index(request: Request):
+async def index(request: Request):
     page_data = {"dashboard_title": config.dashboard_name, "year": date.today().year}
-    data: dict = {"page": "index", "instances": database.get_all_hosts(index=True)}
 
     now = datetime.now()
     one_hour_ago = now - timedelta(hours=1)
     today_start = datetime.combine(datetime.today(), dt_time.min)
     all_time = now - timedelta(weeks=104)
 
-    news: dict = {
-        "1h": database.get_count_news_items(
-            start=dt_to_ts(one_hour_ago), end=dt_to_ts(now)
-        ),
-        "1d": database.get_count_news_items(
-            start=dt_to_ts(today_start), end=dt_to_ts(now)
-        ),
-        "all": database.get_count_news_items(
-            start=dt_to_ts(all_time), end=dt_to_ts(now)
-        ),
-    }
+    # the host summary is still sync, so it runs in the threadpool alongside
+    # the news counts instead of before them
+    instances, *counts = await asyncio.gather(
+        async_database.run_sync(database.get_all_hosts, index=True),
+        *[
+            async_database.get_count_news_items(
+                start=dt_to_ts(start), end=dt_to_ts(now)
+            )
+            for start in [one_hour_ago, today_start, all_time]
+        ],
+    )
+    data: dict = {"page": "index", "instances": instances}
+    news: dict = dict(zip(["1h", "1d", "all"], counts))
     without_links = [data["instances"]["open"], data["instances"]["recent"]]
     for data_structure in without_links:
         for trade in data_structure:
@@ -95,29 +124,100 @@ def index(request: Request):
 @app.get(
     "/instance/{instance_id}", response_class=HTMLResponse, include_in_schema=False
 )
-def instance(
+async def instance(
     request: Request,
     instance_id: int = fPath(title="The ID of the account to get", gt=0),
 ):
-    account = database.get_instance(instance_id=instance_id)
+    account = await async_database.get_instance(instance_id=instance_id)
     if not account:
         return RedirectResponse("/")
 
     page_data = {"dashboard_title": config.dashboard_name, "year": date.today().year}
     return templates.TemplateResponse(
-        "account.html", {"request": request, "page_data": page_data, "account": account}
+        "account.html",
+        {
+            "request": request,
+            "page_data": page_data,
+            "account": account,
+            "instance_id": instance_id,
+        },
+    )
+
+
+@app.get("/instance/{instance_id}/equity")
+def get_equity(
+    instance_id: int = fPath(title="The ID of the account to get", gt=0),
+    period: Intervals = Intervals.ONE_DAY,
+    start: int | None = None,
+    end: int | None = None,
+):
+    if period.value not in rollup_periods:
+        return {"error": "period must be 1h or 1d"}
+    return database.get_equity(
+        host_id=instance_id, period=period.value, start=start, end=end
+    )
+
+
+@app.get("/instance/{instance_id}/analytics")
+def get_analytics(
+    instance_id: int = fPath(title="The ID of the account to get", gt=0),
+    window: int = Query(20, ge=2, le=500),
+):
+    return analytics.get(host_id=instance_id, window=window)
+
+
+@app.get("/instance/{instance_id}/sysinfo")
+def get_sysinfo(
+    instance_id: int = fPath(title="The ID of the account to get", gt=0),
+    start: int | None = None,
+    end: int | None = None,
+    max_points: int = Query(500, ge=10, le=5000),
+):
+    return database.get_sysinfo_series(
+        host_id=instance_id, start=start, end=end, max_points=max_points
+    )
+
+
+@app.get("/instance/{instance_id}/logs")
+def get_logs(
+    instance_id: int = fPath(title="The ID of the account to get", gt=0),
+    level: LogLevels = LogLevels.INFO,
+    limit: int = Query(100, ge=1, le=1000),
+    before: int | None = None,
+):
+    return database.get_logs_tail(
+        host_id=instance_id, level=level.value, limit=limit, before=before
     )
 
 
+@app.get("/instance/{instance_id}/portfolio")
+def get_portfolio(
+    instance_id: int = fPath(title="The ID of the account to get", gt=0),
+    start: int | None = None,
+    end: int | None = None,
+):
+    return database.get_portfolio_value(host_id=instance_id, start=start, end=end)
+
+
 @app.get("/news", response_class=HTMLResponse, include_in_schema=False)
-def news(
+async def news(
     request: Request,
     exchange: Exchanges | None = None,
     start: int | None = None,
     end: int | None = None,
+    q: str | None = None,
 ):
     page_data = {"dashboard_title": config.dashboard_name, "year": date.today().year}
-    news = get_news(exchange=exchange, start=start, end=end)
+    news: list = []
+    if q:
+        news = await search_news(
+            q=q, exchange=exchange, category=None, limit=500, offset=0
+        )
+    filters = {
+        key: value
+        for key, value in {"exchange": exchange, "start": start, "end": end}.items()
+        if value is not None
+    }
 
     now = datetime.now()
     one_hour_ago = now - timedelta(hours=1)
@@ -149,28 +249,182 @@ def news(
 
     return templates.TemplateResponse(
         "news.html",
-        {"request": request, "page_data": page_data, "news": news, "navbar": navbar},
+        {
+            "request": request,
+            "page_data": page_data,
+            "news": news,
+            "navbar": navbar,
+            "query": q or "",
+            "filters": filters,
+        },
     )
 
 
 @app.get("/getnews")
-def get_news(
-    exchange: Exchanges | None = None, start: int | None = None, end: int | None = None
+async def get_news(
+    exchange: Exchanges | None = None,
+    start: int | None = None,
+    end: int | None = None,
+    stream_format: StreamFormats | None = Query(None, alias="format"),
 ):
-    return database.get_news_items(start=start, end=end, exchange=exchange)
+    if stream_format is not None:
+        return StreamingResponse(
+            stream_records(
+                database.stream_news_items(start=start, end=end, exchange=exchange),
+                stream_format=stream_format.value,
+            ),
+            media_type=media_types[stream_format.value],
+        )
+    return await async_database.get_news_items(start=start, end=end, exchange=exchange)
+
+
+@app.get("/getnewspage")
+async def get_news_page(
+    exchange: Exchanges | None = None,
+    start: int | None = None,
+    end: int | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+):
+    try:
+        page, total = await asyncio.gather(
+            async_database.get_news_page(
+                start=start, end=end, exchange=exchange, limit=limit, cursor=cursor
+            ),
+            async_database.get_count_news_items(
+                start=start, end=end, exchange=exchange
+            ),
+        )
+    except ValueError:
+        return {"error": "invalid cursor"}
+    page["total"] = total
+    return page
+
+
+@app.get("/gettrades")
+async def get_trades(
+    instance_id: int | None = Query(None, gt=0),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    stream_format: StreamFormats | None = Query(None, alias="format"),
+):
+    # streaming returns every closed trade instead of a page
+    if stream_format is not None:
+        return StreamingResponse(
+            stream_records(
+                database.stream_closed_trades(host_id=instance_id),
+                stream_format=stream_format.value,
+            ),
+            media_type=media_types[stream_format.value],
+        )
+    try:
+        return await async_database.get_trades_page(
+            host_id=instance_id, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        return {"error": "invalid cursor"}
+
+
+@app.get("/getperformance")
+def get_performance(
+    group_by: PerformanceGroups = PerformanceGroups.PAIR,
+    instance_id: int | None = Query(None, gt=0),
+):
+    return analytics.get_performance(group_by=group_by.value, host_id=instance_id)
+
+
+@app.get("/getvaluation")
+def get_valuation(instance_id: int | None = Query(None, gt=0)):
+    return valuation.get(host_id=instance_id)
+
+
+@app.get("/getexposure")
+def get_exposure(
+    instance_id: int | None = Query(None, gt=0),
+    start: int | None = None,
+    end: int | None = None,
+):
+    return database.get_exposure(host_id=instance_id, start=start, end=end)
+
+
+@app.get("/instance/{instance_id}/trade/{trade_id}/pnl")
+def get_trade_pnl(
+    instance_id: int = fPath(title="The ID of the account to get", gt=0),
+    trade_id: int = fPath(title="The ID of the trade to get", gt=0),
+):
+    return database.get_open_trade_history(host_id=instance_id, trade_id=trade_id)
+
+
+@app.get("/export/{table}")
+def export(
+    table: ExportTables,
+    export_format: ExportFormats = Query(ExportFormats.PARQUET, alias="format"),
+    instance_id: int | None = Query(None, gt=0),
+    start: int | None = None,
+    end: int | None = None,
+    pair: str | None = None,
+):
+    filename = f"freqdash-{table.value}.{export_format.value}"
+    return StreamingResponse(
+        stream_export(
+            database=database,
+            table_name=table.value,
+            export_format=export_format.value,
+            host_id=instance_id,
+            start=start,
+            end=end,
+            pair=pair.upper() if pair is not None else None,
+        ),
+        media_type=media_types[export_format.value],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/getmetrics")
+def get_metrics():
+    return {
+        "database": database.get_pool_status()
+        | {"async": async_database.get_pool_status()},
+        "writer": writer.get_status(),
+        "scraper": scraper.last_report,
+        "retention": retention_jobs.last_report,
+    }
+
+
+@app.get("/searchnews")
+async def search_news(
+    q: str = Query(min_length=1),
+    exchange: Exchanges | None = None,
+    category: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    return await async_database.search_news(
+        query=q, exchange=exchange, category=category, limit=limit, offset=offset
+    )
 
 
 @app.get("/getprices")
 def get_prices(
     exchange: Exchanges,
     market: Markets,
+    stream_format: StreamFormats | None = Query(None, alias="format"),
 ):
     if market == Markets.SPOT.value:
-        return exchanges[exchange].get_spot_prices()
+        prices = exchanges[exchange].get_spot_prices()
     elif market == Markets.FUTURES.value:
-        return exchanges[exchange].get_futures_prices()
+        prices = exchanges[exchange].get_futures_prices()
     else:
         return {"error": "not implemented yet"}
+    if stream_format is None:
+        return prices
+    return StreamingResponse(
+        stream_records(
+            ({"symbol": symbol, "price": price} for symbol, price in prices.items()),
+            stream_format=stream_format.value,
+        ),
+        media_type=media_types[stream_format.value],
+    )
 
 
 @app.get("/getprice")
@@ -227,32 +481,75 @@ def get_kline(
         return {"error": "not implemented yet"}
 
 
+def _scrape_news():
+    with ThreadPoolExecutor(max_workers=len(config.news_source) or 1) as executor:
+        futures = {}
+        for exchange in config.news_source:
+            log.info(f"Scraping news from {exchange}")
+            futures[executor.submit(exchanges[exchange].get_news)] = exchange
+        for future in as_completed(futures):
+            exchange = futures[future]
+            try:
+                news = future.result()
+            except Exception as e:
+                log.error(f"News scrape for {exchange} failed: {e}")
+                continue
+            writer.submit(
+                database.delete_then_update_news, exchange=exchange, data=news
+            ).result()
+    log.info(f"News scrape cycle: {crawler.cycle_report()}")
+
+
 def _auto_scrape():
     while True:
         log.info("Auto scrape routines starting")
 
-        for exchange in config.news_source:
-            log.info(f"Scraping news from {exchange}")
-            news = exchanges[exchange].get_news()
-            database.delete_then_update_news(exchange=exchange, data=news)
+        _scrape_news()
 
         # scraper.scrape()
         all_hosts_and_modes = database.get_hosts_and_modes()
         for exchange in all_hosts_and_modes:
             for mode in all_hosts_and_modes[exchange]:
-                database.delete_then_update_price(
+                writer.submit(
+                    database.delete_then_update_price,
                     exchange=exchange,
                     market=mode,
-                    data=get_prices(exchange=exchange, market=mode),
-                )
+                    data=get_prices(exchange=exchange, market=mode, stream_format=None),
+                ).result()
+        try:
+            valuation.refresh()
+        except Exception as e:
+            log.error(f"Valuation refresh failed: {e}")
+        try:
+            writer.submit(database.snapshot_open_trades).result()
+        except Exception as e:
+            log.error(f"Open trade snapshot failed: {e}")
         log.info(
             f"Auto scrape routines terminated. Sleeping {config.scrape_interval} seconds..."
         )
         time.sleep(config.scrape_interval)
 
 
+def _auto_compact():
+    while True:
+        try:
+            retention_jobs.run()
+        except Exception as e:
+            log.error(f"Compaction failed: {e}")
+        time.sleep(config.retention.compaction_interval)
+
+
 @app.on_event("startup")
 def auto_scrape():
+    writer.start()
     thread = threading.Thread(target=_auto_scrape)
     thread.daemon = True
     thread.start()
+    compaction = threading.Thread(target=_auto_compact)
+    compaction.daemon = True
+    compaction.start()
+
+
+@app.on_event("shutdown")
+async def dispose_async_database():
+    await async_database.dispose()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import logging
+from functools import partial
+
+from anyio import to_thread
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from freqdash.models.database import Database, pool_status, sqlite_pragmas
+
+log = logging.getLogger(__name__)
+
+async_drivers = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+psycopg_async"}
+
+
+class AsyncDatabase:
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self.engine: AsyncEngine | None = None
+        config = database.config
+        url = database.read_engine.url
+        if url.get_backend_name() == "sqlite":
+            # an in-memory database lives on one connection per thread, so
+            # reads have to stay on the calling thread
+            if url.database in [None, "", ":memory:"]:
+                log.info("in-memory sqlite, async reads fall back to sync")
+                return
+            options: dict = {}
+            if config.sqlite_wal:
+                options = {"pool_size": config.read_pool_size, "max_overflow": 0}
+            self.engine = create_async_engine(
+                url.set(drivername=async_drivers["sqlite"]), **options
+            )
+            if config.sqlite_wal:
+                event.listen(
+                    self.engine.sync_engine,
+                    "connect",
+                    sqlite_pragmas(config, query_only=True),
+                )
+        elif url.get_backend_name() == "postgresql":
+            options = {
+                "pool_size": config.pool_size,
+                "max_overflow": config.max_overflow,
+                "pool_timeout": config.pool_timeout,
+                "pool_pre_ping": config.pool_pre_ping,
+                "pool_recycle": config.pool_recycle,
+            }
+            if config.statement_timeout > 0:
+                options["connect_args"] = {
+                    "options": f"-c statement_timeout={config.statement_timeout}"
+                }
+            self.engine = create_async_engine(
+                url.set(drivername=async_drivers["postgresql"]), **options
+            )
+        log.info(f"async database loaded: {self.engine is not None}")
+
+    def get_pool_status(self) -> dict:
+        if self.engine is None:
+            return {"pool": "sync"}
+        return pool_status(self.engine.sync_engine)
+
+    async def dispose(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    async def execute_read(self, statement) -> list:
+        if self.engine is None:
+            return self.database.execute_read(statement)
+        async with self.engine.connect() as connection:
+            result = await connection.execute(statement)
+            return result.all()
+
+    async def run_sync(self, function, *args, **kwargs):
+        if self.engine is None:
+            return function(*args, **kwargs)
+        return await to_thread.run_sync(partial(function, *args, **kwargs))
+
+    async def get_count_news_items(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        exchange: str | None = None,
+    ) -> int:
+        statement = self.database.count_news_statement(
+            start=start, end=end, exchange=exchange
+        )
+        return (await self.execute_read(statement))[0][0]
+
+    async def get_news_items(
+        self, start: int | None, end: int | None, exchange: str | None
+    ) -> list:
+        statement = self.database.news_items_statement(
+            start=start, end=end, exchange=exchange
+        )
+        return [
+            self.database.format_news_item(item)
+            for item in await self.execute_read(statement)
+        ]
+
+    async def get_news_page(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        exchange: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> dict:
+        statement = self.database.news_page_statement(
+            start=start, end=end, exchange=exchange, limit=limit, cursor=cursor
+        )
+        return self.database.news_page(
+            news=await self.execute_read(statement), limit=limit
+        )
+
+    async def search_news(
+        self,
+        query: str,
+        exchange: str | None = None,
+        category: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list:
+        statement = self.database.search_news_statement(
+            query=query,
+            exchange=exchange,
+            category=category,
+            limit=limit,
+            offset=offset,
+        )
+        if statement is None:
+            return []
+        return [
+            self.database.format_search_result(result)
+            for result in await self.execute_read(statement)
+        ]
+
+    async def get_trades_page(
+        self,
+        host_id: int | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> dict:
+        statement = self.database.trades_page_statement(
+            host_id=host_id, limit=limit, cursor=cursor
+        )
+        return self.database.trades_page(
+            trades=await self.execute_read(statement), limit=limit
+        )
+
+    async def get_instance(self, instance_id: int) -> dict:
+        statement = self.database.instance_statement(instance_id=instance_id)
+        return self.database.format_instance(
+            accounts=await self.execute_read(statement)
+        )
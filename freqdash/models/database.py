@@ -1,10 +1,28 @@
 from __future__ import annotations
 
+import base64
+import json
 import logging
-from datetime import datetime, timezone
-from typing import Optional
-
-from sqlalchemy import BigInteger, create_engine, delete, insert, select, update
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Iterator, Optional
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Index,
+    create_engine,
+    delete,
+    event,
+    exc,
+    insert,
+    select,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.orm import (  # type: ignore
     DeclarativeBase,
     Mapped,
@@ -12,12 +30,70 @@ from sqlalchemy.orm import (  # type: ignore
     Session,
     mapped_column,
 )
-from sqlalchemy.sql import func
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql import expression, func
 from typing_extensions import Annotated
 
+from freqdash.core.config import Retention
+
 log = logging.getLogger(__name__)
 
 
+def sqlite_pragmas(config, query_only: bool = False):
+    def set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        if not query_only:
+            # only applies to a new database and has to come before the WAL
+            # switch writes the header, lets retention hand back free pages
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(config.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(config.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout)}")
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return set_pragmas
+
+
+class MeteredQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics_lock = threading.Lock()
+        self.waiting = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        with self.metrics_lock:
+            self.waiting += 1
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self.metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            with self.metrics_lock:
+                self.waiting -= 1
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "waiting": getattr(pool, "waiting", 0),
+        "timeouts": getattr(pool, "timeouts", 0),
+    }
+
+
 class Base(MappedAsDataclass, DeclarativeBase):
     pass
 
@@ -26,27 +102,167 @@ intpk = Annotated[int, mapped_column(primary_key=True)]
 strpk = Annotated[str, mapped_column(primary_key=True)]
 
 
+rollup_periods = {"1h": 60 * 60 * 1000, "1d": 24 * 60 * 60 * 1000}
+
+
+class LogLevels(str, Enum):
+    DEBUG = "DEBUG"
+    INFO = "INFO"
+    WARNING = "WARNING"
+    ERROR = "ERROR"
+    CRITICAL = "CRITICAL"
+
+
+log_levels = [level.value for level in LogLevels]
+balance_value_tolerance = 0.001
+# snapshot row standing in for an account without any balances
+empty_balances_currency = ""
+sysinfo_resolutions = {"raw": 60 * 1000, "5m": 5 * 60 * 1000, "1h": 60 * 60 * 1000}
+partition_columns = {
+    "trades": "open_timestamp",
+    "logs": "timestamp",
+    "sysinfo": "added",
+}
+# wide covering indexes replaced by the host_id leading trades_host_*_idx ones
+dropped_indexes = [
+    "trades_pair_performance_idx",
+    "trades_enter_tag_performance_idx",
+    "trades_exit_reason_performance_idx",
+]
+
+
+def partition_args(partitioned: bool, column: str) -> dict:
+    if not partitioned:
+        return {}
+    return {"postgresql_partition_by": f"RANGE ({column})"}
+
+
+def month_ranges(now: int, months: int) -> list:
+    start = datetime.fromtimestamp(now / 1000, tz=timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    ranges = []
+    for _ in range(months + 1):
+        end = (start + timedelta(days=32)).replace(day=1)
+        ranges.append(
+            (
+                start.strftime("%Y%m"),
+                int(start.timestamp() * 1000),
+                int(end.timestamp() * 1000),
+            )
+        )
+        start = end
+    return ranges
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(values, list) or not all(
+        isinstance(value, int) for value in values
+    ):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def merge_sysinfo_points(points: list) -> dict:
+    samples = sum(point["samples"] for point in points)
+    cores = max(len(point["cpu_cores"]) for point in points)
+    cpu_cores = [0.0] * cores
+    core_samples = [0] * cores
+    for point in points:
+        for core, value in enumerate(point["cpu_cores"]):
+            cpu_cores[core] += value * point["samples"]
+            core_samples[core] += point["samples"]
+    return {
+        "samples": samples,
+        "cpu_avg": sum(point["cpu_avg"] * point["samples"] for point in points)
+        / samples,
+        "cpu_min": min(point["cpu_min"] for point in points),
+        "cpu_max": max(point["cpu_max"] for point in points),
+        "cpu_cores": [
+            round(total / core_samples[core], 2) for core, total in enumerate(cpu_cores)
+        ],
+        "ram_avg": sum(point["ram_avg"] * point["samples"] for point in points)
+        / samples,
+        "ram_min": min(point["ram_min"] for point in points),
+        "ram_max": max(point["ram_max"] for point in points),
+    }
+
+
 class Database:
-    def __init__(self, config) -> None:
+    def __init__(self, config, retention: Retention | None = None) -> None:
+        self.config = config
+        self.retention = Retention() if retention is None else retention
+        self.read_engine = None
         if config.engine == "postgres":
             engine_string = f"{config.username}:{config.password}@{config.host}:{config.port}/{config.name}"
-            self.engine = create_engine("postgresql+psycopg://" + engine_string)
+            pool_options = {
+                "poolclass": MeteredQueuePool,
+                "pool_size": config.pool_size,
+                "max_overflow": config.max_overflow,
+                "pool_timeout": config.pool_timeout,
+                "pool_pre_ping": config.pool_pre_ping,
+                "pool_recycle": config.pool_recycle,
+            }
+            if config.statement_timeout > 0:
+                pool_options["connect_args"] = {
+                    "options": f"-c statement_timeout={config.statement_timeout}"
+                }
+            self.engine = create_engine(
+                "postgresql+psycopg://" + engine_string, **pool_options
+            )
+            if config.read_replica_url is not None:
+                self.read_engine = create_engine(
+                    config.read_replica_url, **pool_options
+                )
         elif config.engine == "sqlite":
             if config.name == "":
                 self.engine = create_engine("sqlite:///:memory:")
+            elif config.sqlite_wal:
+                # a single pooled connection serializes writers, readers get
+                # their own query_only pool so they never wait on the writer
+                url = "sqlite:///" + config.name + ".db?check_same_thread=false"
+                self.engine = create_engine(
+                    url, poolclass=MeteredQueuePool, pool_size=1, max_overflow=0
+                )
+                self.read_engine = create_engine(
+                    url,
+                    poolclass=MeteredQueuePool,
+                    pool_size=config.read_pool_size,
+                    max_overflow=0,
+                )
+                event.listen(self.engine, "connect", sqlite_pragmas(config))
+                event.listen(
+                    self.read_engine,
+                    "connect",
+                    sqlite_pragmas(config, query_only=True),
+                )
             else:
                 self.engine = create_engine(
                     "sqlite:///" + config.name + ".db?check_same_thread=false"
                 )
         else:
             raise Exception(f"{config.engine} setup has not been defined")
+        if self.read_engine is None:
+            self.read_engine = self.engine
 
         log.info(f"{config.engine} loaded")
 
+        self.local = threading.local()
         self.Base = Base
+        # postgres only, partitioned tables need the range column in every key
+        partitioned = config.engine == "postgres" and config.partition_by_month
 
         class Hosts(self.Base):  # type: ignore
             __tablename__ = "hosts"
+            __table_args__ = (Index("hosts_strategy_idx", "strategy", "id"),)
 
             id: Mapped[intpk] = mapped_column(init=False)
             host: Mapped[str]
@@ -71,16 +287,38 @@ class Database:
 
         class Sysinfo(self.Base):  # type: ignore
             __tablename__ = "sysinfo"
+            __table_args__ = partition_args(partitioned, "added")
 
-            id: Mapped[intpk] = mapped_column(init=False)
+            id: Mapped[int] = mapped_column(
+                primary_key=True, init=False, autoincrement=True
+            )
             host_id: Mapped[int]
             cpu_pct: Mapped[str]
             ram_pct: Mapped[float]
             last_process_ts: Mapped[Optional[float]]
             added: Mapped[int] = mapped_column(
-                BigInteger, default=self.timestamp(dt=datetime.now())
+                BigInteger,
+                default=self.timestamp(dt=datetime.now()),
+                primary_key=partitioned,
             )
 
+        class SysinfoSeries(self.Base):  # type: ignore
+            __tablename__ = "sysinfo_series"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            resolution: Mapped[strpk] = mapped_column(init=False)
+            timestamp: Mapped[int] = mapped_column(
+                BigInteger, primary_key=True, init=False
+            )
+            samples: Mapped[int]
+            cpu_avg: Mapped[float]
+            cpu_min: Mapped[float]
+            cpu_max: Mapped[float]
+            cpu_cores: Mapped[list] = mapped_column(JSON)
+            ram_avg: Mapped[float]
+            ram_min: Mapped[float]
+            ram_max: Mapped[float]
+
         class balances(self.Base):  # type: ignore
             __tablename__ = "balances"
 
@@ -89,6 +327,18 @@ class Database:
             free: Mapped[float]
             balance: Mapped[float]
 
+        class BalanceSnapshots(self.Base):  # type: ignore
+            __tablename__ = "balance_snapshots"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            timestamp: Mapped[int] = mapped_column(
+                BigInteger, primary_key=True, init=False
+            )
+            currency: Mapped[strpk] = mapped_column(init=False)
+            free: Mapped[float]
+            balance: Mapped[float]
+            est_stake: Mapped[float]
+
         class base_lists(self.Base):  # type: ignore
             __tablename__ = "base_lists"
 
@@ -98,10 +348,16 @@ class Database:
 
         class logs(self.Base):  # type: ignore
             __tablename__ = "logs"
+            __table_args__ = (
+                Index("logs_host_timestamp_idx", "host_id", "timestamp"),
+                partition_args(partitioned, "timestamp"),
+            )
 
-            id: Mapped[intpk] = mapped_column(init=False)
+            id: Mapped[int] = mapped_column(
+                primary_key=True, init=False, autoincrement=True
+            )
             host_id: Mapped[int]
-            timestamp: Mapped[int] = mapped_column(BigInteger)
+            timestamp: Mapped[int] = mapped_column(BigInteger, primary_key=partitioned)
             name: Mapped[str]
             level: Mapped[str]
             message: Mapped[str]
@@ -120,6 +376,51 @@ class Database:
 
         class Trades(self.Base):  # type: ignore
             __tablename__ = "trades"
+            __table_args__ = (
+                Index(
+                    "trades_closed_idx",
+                    "is_open",
+                    "close_timestamp",
+                    "host_id",
+                    "trade_id",
+                ),
+                Index(
+                    "trades_host_closed_idx",
+                    "host_id",
+                    "is_open",
+                    "close_timestamp",
+                    "trade_id",
+                ),
+                Index(
+                    "trades_host_pair_idx",
+                    "host_id",
+                    "is_open",
+                    "pair",
+                    "quote_currency",
+                ),
+                Index(
+                    "trades_host_base_currency_idx",
+                    "host_id",
+                    "is_open",
+                    "base_currency",
+                    "quote_currency",
+                ),
+                Index(
+                    "trades_host_enter_tag_idx",
+                    "host_id",
+                    "is_open",
+                    "enter_tag",
+                    "quote_currency",
+                ),
+                Index(
+                    "trades_host_exit_reason_idx",
+                    "host_id",
+                    "is_open",
+                    "exit_reason",
+                    "quote_currency",
+                ),
+                partition_args(partitioned, "open_timestamp"),
+            )
 
             host_id: Mapped[intpk] = mapped_column(init=False)
             trade_id: Mapped[intpk] = mapped_column(init=False)
@@ -139,7 +440,10 @@ class Database:
             fee_close_cost: Mapped[Optional[float]]
             fee_close_currency: Mapped[Optional[str]]
 
-            open_timestamp: Mapped[int] = mapped_column(BigInteger)
+            # open_timestamp never changes, so trades don't move between partitions
+            open_timestamp: Mapped[int] = mapped_column(
+                BigInteger, primary_key=partitioned
+            )
             open_rate: Mapped[float]
             close_timestamp: Mapped[Optional[int]] = mapped_column(BigInteger)
             close_rate: Mapped[Optional[float]]
@@ -151,6 +455,126 @@ class Database:
             trading_mode: Mapped[str]
             funding_fees: Mapped[float]
 
+        class OpenTradeSnapshots(self.Base):  # type: ignore
+            __tablename__ = "open_trade_snapshots"
+            __table_args__ = (
+                Index(
+                    "open_trade_snapshots_trade_idx", "host_id", "trade_id", "timestamp"
+                ),
+            )
+
+            timestamp: Mapped[int] = mapped_column(
+                BigInteger, primary_key=True, init=False
+            )
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            trade_id: Mapped[intpk] = mapped_column(init=False)
+            price: Mapped[float]
+            unrealized_profit: Mapped[float]
+
+        class ExposureSnapshots(self.Base):  # type: ignore
+            __tablename__ = "exposure_snapshots"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            quote_currency: Mapped[strpk] = mapped_column(init=False)
+            timestamp: Mapped[int] = mapped_column(
+                BigInteger, primary_key=True, init=False
+            )
+            open_trades: Mapped[int]
+            stake_amount: Mapped[float]
+            unrealized_profit: Mapped[float]
+
+        class FreqtradeProfit(self.Base):  # type: ignore
+            __tablename__ = "ft_profit"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            trade_count: Mapped[int]
+            closed_trade_count: Mapped[int]
+            winning_trades: Mapped[int]
+            losing_trades: Mapped[int]
+            profit_closed_coin: Mapped[float]
+            profit_all_coin: Mapped[float]
+            profit_factor: Mapped[Optional[float]]
+            max_drawdown: Mapped[Optional[float]]
+            max_drawdown_abs: Mapped[Optional[float]]
+            first_trade_timestamp: Mapped[Optional[int]] = mapped_column(BigInteger)
+            latest_trade_timestamp: Mapped[Optional[int]] = mapped_column(BigInteger)
+            wins_duration: Mapped[Optional[float]]
+            draws_duration: Mapped[Optional[float]]
+            losses_duration: Mapped[Optional[float]]
+            updated: Mapped[int] = mapped_column(BigInteger)
+
+        class FreqtradeDaily(self.Base):  # type: ignore
+            __tablename__ = "ft_daily"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            date: Mapped[strpk] = mapped_column(init=False)
+            abs_profit: Mapped[float]
+            rel_profit: Mapped[Optional[float]]
+            starting_balance: Mapped[Optional[float]]
+            trade_count: Mapped[int]
+
+        class FreqtradePerformance(self.Base):  # type: ignore
+            __tablename__ = "ft_performance"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            pair: Mapped[strpk] = mapped_column(init=False)
+            profit_abs: Mapped[float]
+            profit_ratio: Mapped[float]
+            count: Mapped[int]
+
+        class FreqtradeExitReasons(self.Base):  # type: ignore
+            __tablename__ = "ft_exit_reasons"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            exit_reason: Mapped[strpk] = mapped_column(init=False)
+            wins: Mapped[int]
+            losses: Mapped[int]
+            draws: Mapped[int]
+
+        class TradeSync(self.Base):  # type: ignore
+            __tablename__ = "trade_sync"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            max_closed_trade_id: Mapped[int]
+            last_close_timestamp: Mapped[Optional[int]] = mapped_column(BigInteger)
+            closed_trade_count: Mapped[int]
+            updated: Mapped[int] = mapped_column(BigInteger)
+
+        class HostStats(self.Base):  # type: ignore
+            __tablename__ = "host_stats"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            quote_currency: Mapped[strpk] = mapped_column(init=False)
+            closed_trades: Mapped[int] = mapped_column(default=0)
+            winning_trades: Mapped[int] = mapped_column(default=0)
+            closed_profit: Mapped[float] = mapped_column(default=0.0)
+            gross_profit: Mapped[float] = mapped_column(default=0.0)
+            gross_loss: Mapped[float] = mapped_column(default=0.0)
+            open_trades: Mapped[int] = mapped_column(default=0)
+            open_profit: Mapped[float] = mapped_column(default=0.0)
+            first_close_timestamp: Mapped[Optional[int]] = mapped_column(
+                BigInteger, default=None
+            )
+            first_open_timestamp: Mapped[Optional[int]] = mapped_column(
+                BigInteger, default=None
+            )
+            version: Mapped[int] = mapped_column(default=0)
+            closed_version: Mapped[int] = mapped_column(default=0)
+
+        class EquityRollups(self.Base):  # type: ignore
+            __tablename__ = "equity_rollups"
+
+            host_id: Mapped[intpk] = mapped_column(init=False)
+            quote_currency: Mapped[strpk] = mapped_column(init=False)
+            period: Mapped[strpk] = mapped_column(init=False)
+            bucket: Mapped[int] = mapped_column(
+                BigInteger, primary_key=True, init=False
+            )
+            realized_profit: Mapped[float] = mapped_column(default=0.0)
+            trade_count: Mapped[int] = mapped_column(default=0)
+            fees: Mapped[float] = mapped_column(default=0.0)
+            cumulative_profit: Mapped[float] = mapped_column(default=0.0)
+
         class Orders(self.Base):  # type: ignore
             __tablename__ = "orders"
 
@@ -170,6 +594,7 @@ class Database:
 
         class News(self.Base):  # type: ignore
             __tablename__ = "news"
+            __table_args__ = (Index("news_time_idx", "news_time", "id"),)
 
             id: Mapped[intpk] = mapped_column(init=False)
             exchange: Mapped[str]
@@ -182,7 +607,269 @@ class Database:
             )
 
         self.Base.metadata.create_all(self.engine)  # type: ignore
+        for table in self.Base.metadata.sorted_tables:  # type: ignore
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
+        with self.engine.begin() as connection:
+            for index_name in dropped_indexes:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
         log.info("database tables loaded")
+        self.partitioned_tables: list = []
+        if partitioned:
+            self.partitioned_tables = self.check_partitioned_tables()
+            self.create_partitions()
+        self.setup_news_search()
+        self.check_host_stats_loaded()
+        self.check_equity_rollups_loaded()
+
+    def setup_news_search(self) -> None:
+        with self.engine.begin() as connection:
+            if self.engine.dialect.name == "postgresql":
+                connection.execute(
+                    text(
+                        "ALTER TABLE news ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                        "GENERATED ALWAYS AS (to_tsvector('english', headline)) STORED"
+                    )
+                )
+                connection.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS news_search_vector_idx "
+                        "ON news USING GIN (search_vector)"
+                    )
+                )
+            elif self.engine.dialect.name == "sqlite":
+                exists = connection.execute(
+                    text(
+                        "SELECT name FROM sqlite_master "
+                        "WHERE type = 'table' AND name = 'news_search'"
+                    )
+                ).first()
+                connection.execute(
+                    text(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS news_search USING fts5("
+                        "headline, content='news', content_rowid='id', "
+                        "tokenize='porter unicode61')"
+                    )
+                )
+                connection.execute(
+                    text(
+                        "CREATE TRIGGER IF NOT EXISTS news_search_insert "
+                        "AFTER INSERT ON news BEGIN "
+                        "INSERT INTO news_search(rowid, headline) "
+                        "VALUES (new.id, new.headline); END"
+                    )
+                )
+                connection.execute(
+                    text(
+                        "CREATE TRIGGER IF NOT EXISTS news_search_delete "
+                        "AFTER DELETE ON news BEGIN "
+                        "INSERT INTO news_search(news_search, rowid, headline) "
+                        "VALUES ('delete', old.id, old.headline); END"
+                    )
+                )
+                connection.execute(
+                    text(
+                        "CREATE TRIGGER IF NOT EXISTS news_search_update "
+                        "AFTER UPDATE ON news BEGIN "
+                        "INSERT INTO news_search(news_search, rowid, headline) "
+                        "VALUES ('delete', old.id, old.headline); "
+                        "INSERT INTO news_search(rowid, headline) "
+                        "VALUES (new.id, new.headline); END"
+                    )
+                )
+                if exists is None:
+                    connection.execute(
+                        text("INSERT INTO news_search(news_search) VALUES ('rebuild')")
+                    )
+        log.info("news search index loaded")
+
+    def check_partitioned_tables(self) -> list:
+        with self.engine.connect() as connection:
+            names = (
+                connection.execute(
+                    text(
+                        "SELECT c.relname FROM pg_partitioned_table p "
+                        "JOIN pg_class c ON c.oid = p.partrelid"
+                    )
+                )
+                .scalars()
+                .all()
+            )
+        tables = []
+        for table_name in partition_columns:
+            if table_name in names:
+                tables.append(table_name)
+            else:
+                log.warning(
+                    f"{table_name} was created before partitioning was enabled, "
+                    "it stays a plain table"
+                )
+        return tables
+
+    def get_partitions(self, table_name: str) -> list:
+        with self.engine.connect() as connection:
+            names = (
+                connection.execute(
+                    text(
+                        "SELECT c.relname FROM pg_inherits i "
+                        "JOIN pg_class c ON c.oid = i.inhrelid "
+                        "JOIN pg_class p ON p.oid = i.inhparent "
+                        "WHERE p.relname = :table_name ORDER BY c.relname"
+                    ),
+                    {"table_name": table_name},
+                )
+                .scalars()
+                .all()
+            )
+        partitions = []
+        for name in names:
+            suffix = name[len(table_name) + 1 :]
+            if not suffix.isdigit():
+                continue
+            month = datetime.strptime(suffix, "%Y%m").replace(tzinfo=timezone.utc)
+            _, start, end = month_ranges(self.timestamp(dt=month), 0)[0]
+            partitions.append({"name": name, "start": start, "end": end})
+        return partitions
+
+    def create_partitions(self, now: int | None = None) -> list:
+        if now is None:
+            now = self.timestamp(dt=datetime.now(timezone.utc))
+        created = []
+        for table_name in self.partitioned_tables:
+            existing = [p["name"] for p in self.get_partitions(table_name)]
+            # each partition in its own transaction, one overlapping the rows
+            # already in the default partition must not stop the others
+            for suffix, start, end in month_ranges(
+                now, self.config.partition_months_ahead
+            ):
+                name = f"{table_name}_{suffix}"
+                if name in existing:
+                    continue
+                try:
+                    with self.engine.begin() as connection:
+                        connection.execute(
+                            text(
+                                f"CREATE TABLE {name} PARTITION OF {table_name} "
+                                f"FOR VALUES FROM ({start}) TO ({end})"
+                            )
+                        )
+                except exc.DBAPIError as e:
+                    log.error(f"Partition {name} could not be created: {e}")
+                    continue
+                created.append(name)
+            with self.engine.begin() as connection:
+                connection.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {table_name}_default "
+                        f"PARTITION OF {table_name} DEFAULT"
+                    )
+                )
+        if len(created) > 0:
+            log.info(f"Partitions created: {created}")
+        return created
+
+    def drop_partitions(self, table_name: str, cutoff: int, keep=None) -> int:
+        if table_name not in self.partitioned_tables:
+            return 0
+        removed = 0
+        with self.write_session() as session:
+            for partition in self.get_partitions(table_name):
+                if partition["end"] > cutoff:
+                    continue
+                partition_table = expression.table(
+                    partition["name"], expression.column("id")
+                )
+                if keep is not None:
+                    kept = session.scalar(
+                        select(func.count())
+                        .select_from(partition_table)
+                        .where(partition_table.c.id.in_(keep))
+                    )
+                    if kept > 0:
+                        continue
+                removed += session.scalar(
+                    select(func.count()).select_from(partition_table)
+                )
+                session.execute(text(f"DROP TABLE {partition['name']}"))
+                log.info(f"Partition {partition['name']} dropped")
+        return removed
+
+    def delete_batch(self, table_name: str, filters: list, batch_size: int) -> int:
+        table_object = self.get_table_object(table_name=table_name)
+        keys = list(table_object.primary_key.columns)
+        batch = select(*keys).filter(*filters).limit(batch_size)
+        if len(keys) == 1:
+            condition = keys[0].in_(batch)
+        else:
+            condition = tuple_(*keys).in_(batch)
+        with self.write_session() as session:
+            return session.execute(delete(table_object).where(condition)).rowcount
+
+    def get_rows_per_host_cutoffs(
+        self, table_name: str, column: str, max_rows: int
+    ) -> dict:
+        table_object = self.get_table_object(table_name=table_name)
+        cutoffs = {}
+        with self.session() as session:
+            hosts = session.execute(
+                select(table_object.c.host_id)
+                .group_by(table_object.c.host_id)
+                .having(func.count() > max_rows)
+            ).all()
+            for host in hosts:
+                cutoffs[host[0]] = session.scalar(
+                    select(table_object.c[column])
+                    .filter(table_object.c.host_id == host[0])
+                    .order_by(table_object.c[column].desc())
+                    .offset(max_rows - 1)
+                    .limit(1)
+                )
+        return cutoffs
+
+    def get_database_size(self) -> int:
+        # sqlite reads the size on a reader so the writer connection stays free
+        engine = self.engine
+        if self.engine.dialect.name == "sqlite":
+            engine = self.read_engine
+        with engine.connect() as connection:
+            if self.engine.dialect.name == "postgresql":
+                return connection.scalar(
+                    text("SELECT pg_database_size(current_database())")
+                )
+            page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+            page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+        return page_count * page_size
+
+    def get_auto_vacuum(self) -> int:
+        with self.read_engine.connect() as connection:
+            return connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+
+    def run_script(self, script: str) -> None:
+        # sqlite3 steps a pragma only once, which for incremental_vacuum frees
+        # a single page, executescript runs it to the end
+        with self.transaction():
+            self.local.connection.connection.driver_connection.executescript(script)
+
+    def incremental_vacuum(self, pages: int) -> int:
+        with self.transaction():
+            connection = self.local.connection
+            free = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+            self.run_script(f"PRAGMA incremental_vacuum({int(pages)});")
+            freed = free - connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        log.info(f"Incremental vacuum freed {freed} pages")
+        return freed
+
+    def vacuum(self) -> None:
+        # setting auto_vacuum before the rebuild switches an existing
+        # database over, so later runs only need incremental_vacuum
+        self.run_script("PRAGMA auto_vacuum=INCREMENTAL; VACUUM;")
+        log.info("Database vacuumed")
+
+    def vacuum_tables(self, tables: list) -> None:
+        for table_name in tables:
+            with self.engine.connect() as connection:
+                connection.execution_options(isolation_level="AUTOCOMMIT")
+                connection.execute(text(f"VACUUM (ANALYZE) {table_name}"))
 
     def timestamp(self, dt) -> int:
         return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
@@ -196,12 +883,49 @@ class Database:
         return (delta.days * 24 * 60 * 60) + (delta.seconds // 60)
 
     def get_table_object(self, table_name: str):
-        self.Base.metadata.reflect(bind=self.engine)  # type: ignore
+        if table_name not in self.Base.metadata.tables:  # type: ignore
+            self.Base.metadata.reflect(bind=self.get_bind())  # type: ignore
         return self.Base.metadata.tables[table_name]  # type: ignore
 
+    def get_pool_status(self) -> dict:
+        status = {"write": pool_status(self.engine)}
+        if self.read_engine is not self.engine:
+            status["read"] = pool_status(self.read_engine)
+        return status
+
+    def get_bind(self):
+        connection = getattr(self.local, "connection", None)
+        return self.read_engine if connection is None else connection
+
+    def session(self) -> Session:
+        # inside transaction() every session joins the open connection, and
+        # its commit() leaves the outer transaction to be committed at the end
+        return Session(bind=self.get_bind(), join_transaction_mode="rollback_only")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        if getattr(self.local, "connection", None) is not None:
+            yield
+            return
+        with self.engine.begin() as connection:
+            self.local.connection = connection
+            try:
+                yield
+            finally:
+                self.local.connection = None
+
+    @contextmanager
+    def write_session(self) -> Iterator[Session]:
+        with self.transaction(), self.session() as session:
+            yield session
+
+    def execute_read(self, statement) -> list:
+        with self.session() as session:
+            return session.execute(statement).all()
+
     def get_hosts_and_modes(self) -> dict:
         table_object = self.get_table_object(table_name="hosts")
-        with Session(self.engine) as session:
+        with self.session() as session:
             result = session.execute(select(table_object)).all()
         hosts: dict = {}
         if result is not None:
@@ -214,7 +938,7 @@ class Database:
 
     def get_all_hosts(self, index: bool = False) -> dict:
         table_object = self.get_table_object(table_name="hosts")
-        with Session(self.engine) as session:
+        with self.session() as session:
             result = session.execute(select(table_object)).all()
         hosts: dict = {"live": {}, "dry": {}, "recent": [], "open": []}
         now = self.timestamp(datetime.now(timezone.utc))
@@ -237,18 +961,53 @@ class Database:
                     "alert": difference / 1000 > 600,
                 }
                 if index:
-                    hosts[host[8]][host[0]]["closed_trades"] = self.get_trades_count(
-                        host_id=host[0], is_open=False, quote_currency=host[6]
-                    )
-                    hosts[host[8]][host[0]]["winning_trades"] = self.get_trades_count(
-                        host_id=host[0], is_open=False, quote_currency=host[6], won=True
-                    )
-                    hosts[host[8]][host[0]]["losing_trades"] = (
-                        hosts[host[8]][host[0]]["closed_trades"]
-                        - hosts[host[8]][host[0]]["winning_trades"]
-                    )
-                    hosts[host[8]][host[0]]["closed_profit"] = self.get_trade_profit(
-                        host_id=host[0], is_open=False, quote_currency=host[6]
+                    freqtrade_profit = self.get_freqtrade_profit(host_id=host[0])
+                    if len(freqtrade_profit) > 0:
+                        # freqtrade only counts profit > 0 as a win and
+                        # profit < 0 as a loss, so draws are kept apart
+                        closed_count = freqtrade_profit["closed_trade_count"]
+                        stats = {
+                            "closed_trades": closed_count,
+                            "winning_trades": freqtrade_profit["winning_trades"],
+                            "losing_trades": freqtrade_profit["losing_trades"],
+                            "draw_trades": closed_count
+                            - freqtrade_profit["winning_trades"]
+                            - freqtrade_profit["losing_trades"],
+                            "closed_profit": freqtrade_profit["profit_closed_coin"],
+                            "open_trades": freqtrade_profit["trade_count"]
+                            - closed_count,
+                            "open_profit": freqtrade_profit["profit_all_coin"]
+                            - freqtrade_profit["profit_closed_coin"],
+                        }
+                        first_open_timestamp = freqtrade_profit["first_trade_timestamp"]
+                    else:
+                        all_stats = self.get_host_stats(host_id=host[0])
+                        stats = all_stats.get(host[6], {})
+                        # freqdash counts profit >= 0 as a win, draws included
+                        stats = stats | {
+                            "losing_trades": stats.get("closed_trades", 0)
+                            - stats.get("winning_trades", 0),
+                            "draw_trades": None,
+                        }
+                        first_trades = [
+                            currency_stats
+                            for currency_stats in all_stats.values()
+                            if currency_stats["first_close_timestamp"] is not None
+                        ]
+                        first_open_timestamp = None
+                        if len(first_trades) > 0:
+                            first_open_timestamp = min(
+                                first_trades, key=lambda x: x["first_close_timestamp"]
+                            )["first_open_timestamp"]
+                    for key in [
+                        "closed_trades",
+                        "winning_trades",
+                        "losing_trades",
+                        "draw_trades",
+                    ]:
+                        hosts[host[8]][host[0]][key] = stats.get(key, 0)
+                    hosts[host[8]][host[0]]["closed_profit"] = round(
+                        stats.get("closed_profit", 0.0), 2
                     )
                     if hosts[host[8]][host[0]]["starting_capital"] > 0:
                         hosts[host[8]][host[0]]["total_profit_percentage"] = round(
@@ -260,12 +1019,9 @@ class Database:
                     else:
                         hosts[host[8]][host[0]]["total_profit_percentage"] = 0
 
-                    first_trade = self.get_trades(
-                        host_id=host[0], is_open=False, limit=1, sort=True, order="asc"
-                    )
-                    if len(first_trade) > 0:
+                    if first_open_timestamp is not None:
                         first_trade_date = datetime.utcfromtimestamp(
-                            first_trade[0][15] / 1000.0
+                            first_open_timestamp / 1000.0
                         )
                         delta = today - first_trade_date
                         hosts[host[8]][host[0]]["days_from_first_trade"] = delta.days
@@ -281,16 +1037,22 @@ class Database:
                     else:
                         hosts[host[8]][host[0]]["daily_profit_percentage"] = 0
 
-                    hosts[host[8]][host[0]]["open_trades"] = self.get_trades_count(
-                        host_id=host[0], is_open=True, quote_currency=host[6]
-                    )
-                    hosts[host[8]][host[0]]["open_profit"] = self.get_trade_profit(
-                        host_id=host[0], is_open=True, quote_currency=host[6]
+                    hosts[host[8]][host[0]]["open_trades"] = stats.get("open_trades", 0)
+                    hosts[host[8]][host[0]]["open_profit"] = round(
+                        stats.get("open_profit", 0.0), 2
                     )
 
-                    hosts[host[8]][host[0]]["profit_factor"] = self.get_profit_factor(
-                        host_id=host[0], is_open=False, quote_currency=host[6]
-                    )
+                    if freqtrade_profit.get("profit_factor") is not None:
+                        profit_factor = round(freqtrade_profit["profit_factor"], 2)
+                    elif stats.get("winning_trades", 0) == 0:
+                        profit_factor = 0.0
+                    elif stats.get("gross_loss", 0.0) == 0.0:
+                        profit_factor = float("inf")
+                    else:
+                        profit_factor = round(
+                            stats["gross_profit"] / abs(stats["gross_loss"]), 2
+                        )
+                    hosts[host[8]][host[0]]["profit_factor"] = profit_factor
 
                     closed_trades = self.get_trades(
                         host_id=host[0],
@@ -348,7 +1110,7 @@ class Database:
 
     def check_then_add_or_update_host(self, data):
         table_object = self.get_table_object(table_name="hosts")
-        with Session(self.engine) as session:
+        with self.write_session() as session:
             check = session.scalars(
                 select(table_object)
                 .filter_by(host=data["host"], remote_host=data["remote_host"])
@@ -378,12 +1140,54 @@ class Database:
                 log.info(
                     f"Host updated. Host: {data['host']} Remote host: {data['remote_host']}"
                 )
-            session.commit()
         return check
 
+    def get_host_id(self, host: str, remote_host: str) -> int | None:
+        table_object = self.get_table_object(table_name="hosts")
+        with self.session() as session:
+            return session.scalar(
+                select(table_object.c.id)
+                .filter_by(host=host, remote_host=remote_host)
+                .limit(1)
+            )
+
+    def apply_host_snapshot(self, snapshot: dict) -> int:
+        with self.transaction():
+            host_id = snapshot.get("host_id")
+            if snapshot.get("config") is not None:
+                host_id = self.check_then_add_or_update_host(data=snapshot["config"])
+            if snapshot.get("sysinfo"):
+                self.add_sysinfo(data={"host_id": host_id} | snapshot["sysinfo"])
+            self.check_then_add_trades(data=snapshot.get("trades", []), host_id=host_id)
+            if snapshot.get("trade_sync") is not None:
+                self.update_trade_sync_state(host_id=host_id, **snapshot["trade_sync"])
+            if snapshot.get("last_process_ts") is not None:
+                self.add_last_process_ts(
+                    data=snapshot["last_process_ts"], host_id=host_id
+                )
+            if snapshot.get("starting_capital") is not None:
+                self.update_starting_capital(
+                    data=snapshot["starting_capital"], host_id=host_id
+                )
+            if snapshot.get("balances") is not None:
+                self.update_balances(data=snapshot["balances"], host_id=host_id)
+            if snapshot.get("freqtrade_stats") is not None:
+                self.update_freqtrade_stats(
+                    host_id=host_id, **snapshot["freqtrade_stats"]
+                )
+            self.update_logs(data=snapshot.get("logs", []), host_id=host_id)
+            for list_type in ["white", "black"]:
+                if snapshot.get(f"{list_type}list") is not None:
+                    self.delete_then_add_baselist(
+                        data=snapshot[f"{list_type}list"],
+                        host_id=host_id,
+                        list_type=list_type,
+                    )
+        return host_id
+
     def get_current_price(self, exchange: str, symbol: str, trading_mode: str):
         table_object = self.get_table_object(table_name="prices")
-        with Session(self.engine) as session:
+        with self.session() as session:
             price = session.execute(
                 select(table_object)
                 .filter_by(exchange=exchange, trading_mode=trading_mode, symbol=symbol)
@@ -393,7 +1197,7 @@ class Database:
 
     def get_prices(self, exchange: str, trading_mode: str, quote: str) -> dict:
         table_object = self.get_table_object(table_name="prices")
-        with Session(self.engine) as session:
+        with self.session() as session:
             all_prices = session.execute(
                 select(table_object).filter_by(
                     exchange=exchange, trading_mode=trading_mode
@@ -405,10 +1209,176 @@ class Database:
                 prices[symbol[3]] = symbol[4]
         return prices
 
-    def delete_then_update_price(self, exchange: str, market: str, data: dict):
+    def get_all_prices(self, trading_mode: str = "SPOT") -> list:
         table_object = self.get_table_object(table_name="prices")
+        with self.session() as session:
+            result = session.execute(
+                select(
+                    table_object.c.exchange,
+                    table_object.c.symbol,
+                    table_object.c.price,
+                ).filter_by(trading_mode=trading_mode)
+            ).all()
+        return result
+
+    def snapshot_open_trades(self, now: int | None = None) -> int:
+        trades_table = self.get_table_object(table_name="trades")
+        prices_table = self.get_table_object(table_name="prices")
+        snapshots_table = self.get_table_object(table_name="open_trade_snapshots")
+        exposure_table = self.get_table_object(table_name="exposure_snapshots")
+        if now is None:
+            now = self.timestamp(dt=datetime.now(timezone.utc))
+        with self.write_session() as session:
+            result = session.execute(
+                select(
+                    trades_table.c.host_id,
+                    trades_table.c.trade_id,
+                    trades_table.c.quote_currency,
+                    trades_table.c.amount,
+                    trades_table.c.stake_amount,
+                    trades_table.c.open_rate,
+                    trades_table.c.is_short,
+                    prices_table.c.price,
+                )
+                .join(
+                    prices_table,
+                    (prices_table.c.exchange == trades_table.c.exchange)
+                    & (prices_table.c.trading_mode == trades_table.c.trading_mode)
+                    & (
+                        prices_table.c.symbol
+                        == trades_table.c.base_currency + trades_table.c.quote_currency
+                    ),
+                )
+                .filter(trades_table.c.is_open.is_(True))
+                .order_by(prices_table.c.updated.desc(), prices_table.c.id.desc())
+            ).all()
+            if len(result) == 0:
+                return 0
+
+            snapshots = []
+            exposure: dict = {}
+            seen = set()
+            for row in result:
+                # a symbol listed twice would snapshot the trade twice and
+                # break the primary key, the latest price wins
+                if (row.host_id, row.trade_id) in seen:
+                    continue
+                seen.add((row.host_id, row.trade_id))
+                direction = -1 if row.is_short else 1
+                unrealized_profit = (row.price - row.open_rate) * row.amount * direction
+                snapshots.append(
+                    {
+                        "timestamp": now,
+                        "host_id": row.host_id,
+                        "trade_id": row.trade_id,
+                        "price": row.price,
+                        "unrealized_profit": unrealized_profit,
+                    }
+                )
+                key = (row.host_id, row.quote_currency)
+                if key not in exposure:
+                    exposure[key] = {
+                        "host_id": row.host_id,
+                        "quote_currency": row.quote_currency,
+                        "timestamp": now,
+                        "open_trades": 0,
+                        "stake_amount": 0.0,
+                        "unrealized_profit": 0.0,
+                    }
+                exposure[key]["open_trades"] += 1
+                exposure[key]["stake_amount"] += row.stake_amount
+                exposure[key]["unrealized_profit"] += unrealized_profit
+            session.execute(insert(snapshots_table), snapshots)
+            session.execute(insert(exposure_table), list(exposure.values()))
+        log.info(f"Open trade snapshot saved: {len(snapshots)} trades")
+        return len(snapshots)
+
+    def get_exposure(
+        self,
+        host_id: int | None = None,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> dict:
+        table_object = self.get_table_object(table_name="exposure_snapshots")
+        filters = []
+        if host_id is not None:
+            filters.append(table_object.c.host_id == host_id)
+        if start is not None:
+            filters.append(table_object.c.timestamp >= start)
+        if end is not None:
+            filters.append(table_object.c.timestamp < end)
+        with self.session() as session:
+            result = session.execute(
+                select(
+                    table_object.c.quote_currency,
+                    table_object.c.timestamp,
+                    func.sum(table_object.c.open_trades),
+                    func.sum(table_object.c.stake_amount),
+                    func.sum(table_object.c.unrealized_profit),
+                )
+                .filter(*filters)
+                .group_by(table_object.c.quote_currency, table_object.c.timestamp)
+                .order_by(table_object.c.quote_currency, table_object.c.timestamp)
+            ).all()
+        exposure: dict = {}
+        for row in result:
+            if row[0] not in exposure:
+                exposure[row[0]] = {
+                    "timestamp": [],
+                    "open_trades": [],
+                    "stake_amount": [],
+                    "unrealized_profit": [],
+                }
+            series = exposure[row[0]]
+            series["timestamp"].append(row[1])
+            series["open_trades"].append(row[2])
+            series["stake_amount"].append(round(row[3], 8))
+            series["unrealized_profit"].append(round(row[4], 8))
+        return exposure
+
+    def get_open_trade_history(self, host_id: int, trade_id: int) -> dict:
+        table_object = self.get_table_object(table_name="open_trade_snapshots")
+        with self.session() as session:
+            result = session.execute(
+                select(
+                    table_object.c.timestamp,
+                    table_object.c.price,
+                    table_object.c.unrealized_profit,
+                )
+                .filter_by(host_id=host_id, trade_id=trade_id)
+                .order_by(table_object.c.timestamp)
+            ).all()
+        return {
+            "timestamp": [row[0] for row in result],
+            "price": [row[1] for row in result],
+            "unrealized_profit": [round(row[2], 8) for row in result],
+        }
+
+    def get_all_balances(self) -> list:
+        table_object = self.get_table_object(table_name="balances")
+        hosts_table = self.get_table_object(table_name="hosts")
+        with self.session() as session:
+            result = session.execute(
+                select(
+                    table_object.c.host_id,
+                    hosts_table.c.exchange,
+                    hosts_table.c.stake_currency,
+                    table_object.c.currency,
+                    table_object.c.balance,
+                ).join(hosts_table, hosts_table.c.id == table_object.c.host_id)
+            ).all()
+        return result
 
-        with Session(self.engine) as session:
+    def delete_then_update_price(self, exchange: str, market: str, data: dict):
+        table_object = self.get_table_object(table_name="prices")
+        if isinstance(data, dict):
+            updated = self.timestamp(dt=datetime.now(timezone.utc))
+            data = [
+                {"symbol": symbol, "price": float(price), "updated": updated}
+                for symbol, price in data.items()
+            ]
+
+        with self.write_session() as session:
             check = session.scalars(
                 select(table_object)
                 .filter_by(exchange=exchange, trading_mode=market)
@@ -425,13 +1395,13 @@ class Database:
             for item in data:
                 item["exchange"] = exchange
                 item["trading_mode"] = market
-            session.execute(insert(table_object), data)
-            session.commit()
+            if len(data) > 0:
+                session.execute(insert(table_object), data)
         log.info(f"Price data saved for {exchange}/{market}")
 
     def get_balances(self, host_id: int):
         table_object = self.get_table_object(table_name="balances")
-        with Session(self.engine) as session:
+        with self.session() as session:
             balances = session.execute(
                 select(table_object).filter_by(host_id=host_id)
             ).all()
@@ -446,28 +1416,143 @@ class Database:
         order: str = "",
     ):
         table_object = self.get_table_object(table_name="trades")
-        with Session(self.engine) as session:
-            if sort:
-                if order == "asc":
-                    trades = session.execute(
-                        select(table_object)
-                        .filter_by(host_id=host_id, is_open=is_open)
-                        .order_by(table_object.c.close_timestamp.asc())
-                    ).all()
-                else:
-                    trades = session.execute(
-                        select(table_object)
-                        .filter_by(host_id=host_id, is_open=is_open)
-                        .order_by(table_object.c.close_timestamp.desc())
-                    ).all()
+        statement = select(table_object).filter_by(host_id=host_id, is_open=is_open)
+        if sort:
+            if order == "asc":
+                statement = statement.order_by(table_object.c.close_timestamp.asc())
             else:
-                trades = session.execute(
-                    select(table_object).filter_by(host_id=host_id, is_open=is_open)
-                ).all()
+                statement = statement.order_by(table_object.c.close_timestamp.desc())
         if limit is not None:
-            return trades[:limit]
+            statement = statement.limit(limit)
+        with self.session() as session:
+            trades = session.execute(statement).all()
         return trades
 
+    def get_closed_trade_columns(self, host_id: int, columns: list) -> dict:
+        table_object = self.get_table_object(table_name="trades")
+        filters = []
+        filters.append(table_object.c.host_id == host_id)
+        filters.append(table_object.c.is_open.is_(False))
+        with self.session() as session:
+            rows = session.execute(
+                select(*[table_object.c[column] for column in columns])
+                .filter(*filters)
+                .order_by(table_object.c.close_timestamp, table_object.c.trade_id)
+            ).all()
+        if len(rows) == 0:
+            return {column: [] for column in columns}
+        return dict(zip(columns, map(list, zip(*rows))))
+
+    def closed_trades_statement(
+        self, host_id: int | None = None, cursor: str | None = None
+    ):
+        table_object = self.get_table_object(table_name="trades")
+        filters = [table_object.c.is_open.is_(False)]
+        if host_id is not None:
+            filters.append(table_object.c.host_id == host_id)
+        if cursor is not None:
+            close_timestamp, cursor_host_id, trade_id = decode_cursor(cursor)
+            filters.append(
+                tuple_(
+                    table_object.c.close_timestamp,
+                    table_object.c.host_id,
+                    table_object.c.trade_id,
+                )
+                < tuple_(close_timestamp, cursor_host_id, trade_id)
+            )
+        return (
+            select(table_object)
+            .filter(*filters)
+            .order_by(
+                table_object.c.close_timestamp.desc(),
+                table_object.c.host_id.desc(),
+                table_object.c.trade_id.desc(),
+            )
+        )
+
+    def trades_page_statement(
+        self,
+        host_id: int | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ):
+        statement = self.closed_trades_statement(host_id=host_id, cursor=cursor)
+        return statement.limit(limit + 1)
+
+    def stream_closed_trades(
+        self, host_id: int | None = None, chunk_size: int = 1000
+    ) -> Iterator[dict]:
+        statement = self.closed_trades_statement(host_id=host_id)
+        for trades in self.stream_rows(statement, chunk_size=chunk_size):
+            for trade in trades:
+                yield trade._asdict()
+
+    def trades_page(self, trades: list, limit: int) -> dict:
+        next_cursor = None
+        if len(trades) > limit:
+            trades = trades[:limit]
+            next_cursor = encode_cursor(
+                [trades[-1].close_timestamp, trades[-1].host_id, trades[-1].trade_id]
+            )
+        return {
+            "items": [trade._asdict() for trade in trades],
+            "next_cursor": next_cursor,
+        }
+
+    def get_trades_page(
+        self,
+        host_id: int | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> dict:
+        statement = self.trades_page_statement(
+            host_id=host_id, limit=limit, cursor=cursor
+        )
+        return self.trades_page(trades=self.execute_read(statement), limit=limit)
+
+    def export_statement(
+        self,
+        table_name: str,
+        host_id: int | None = None,
+        start: int | None = None,
+        end: int | None = None,
+        pair: str | None = None,
+    ):
+        table_object = self.get_table_object(table_name=table_name)
+        trades_table = self.get_table_object(table_name="trades")
+        timestamp = {"trades": "open_timestamp", "orders": "order_timestamp"}
+        filters = []
+        if host_id is not None:
+            filters.append(table_object.c.host_id == host_id)
+        if start is not None:
+            filters.append(table_object.c[timestamp[table_name]] >= start)
+        if end is not None:
+            filters.append(table_object.c[timestamp[table_name]] < end)
+        if pair is not None and table_name == "trades":
+            filters.append(table_object.c.pair == pair)
+        elif pair is not None:
+            filters.append(
+                tuple_(table_object.c.host_id, table_object.c.trade_id).in_(
+                    select(trades_table.c.host_id, trades_table.c.trade_id).filter(
+                        trades_table.c.pair == pair
+                    )
+                )
+            )
+        return (
+            select(table_object)
+            .filter(*filters)
+            .order_by(*table_object.primary_key.columns)
+        )
+
+    def stream_rows(self, statement, chunk_size: int = 10000) -> Iterator[list]:
+        # a server side cursor on postgres, so only one chunk is held at a time
+        with self.read_engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=chunk_size
+            ).execute(statement)
+            for rows in result.partitions():
+                yield rows
+
     def get_trades_count(
         self,
         host_id: int,
@@ -485,7 +1570,7 @@ class Database:
         filters.append(table_object.c.quote_currency == quote_currency)
         filters.append(table_object.c.host_id == host_id)
         filters.append(table_object.c.is_open == is_open)
-        with Session(self.engine) as session:
+        with self.session() as session:
             count = session.scalar(
                 select(func.count()).select_from(table_object).filter(*filters)
             )
@@ -499,7 +1584,7 @@ class Database:
         filters.append(table_object.c.is_open == is_open)
         filters.append(table_object.c.host_id == host_id)
         filters.append(table_object.c.quote_currency == quote_currency)
-        with Session(self.engine) as session:
+        with self.session() as session:
             result = session.scalar(
                 select(func.sum(table_object.c.profit_abs))
                 .select_from(table_object)
@@ -519,13 +1604,13 @@ class Database:
             filters.append(table_object.c.status == "closed")
         filters.append(table_object.c.host_id == host_id)
         filters.append(table_object.c.trade_id == trade_id)
-        with Session(self.engine) as session:
+        with self.session() as session:
             orders = session.execute(select(table_object).filter(*filters)).all()
         return orders
 
     def get_closed_profit(self):
         table_object = self.get_table_object(table_name="trades")
-        with Session(self.engine) as session:
+        with self.session() as session:
             result = session.scalar(
                 select(func.sum(table_object.c.profit_abs))
                 .select_from(table_object)
@@ -547,7 +1632,7 @@ class Database:
         filters.append(table_object.c.quote_currency == quote_currency)
         filters.append(table_object.c.profit_abs >= 0)
 
-        with Session(self.engine) as session:
+        with self.session() as session:
             total_profit = session.scalar(
                 select(func.sum(table_object.c.profit_abs))
                 .select_from(table_object)
@@ -576,7 +1661,7 @@ class Database:
             filters.append(table_object.c.close_date >= start_datetime)
         if end_datetime is not None:
             filters.append(table_object.c.close_date <= end_datetime)
-        with Session(self.engine) as session:
+        with self.session() as session:
             result = session.scalar(
                 select(func.sum(table_object.c.profit_abs))
                 .select_from(table_object)
@@ -589,17 +1674,205 @@ class Database:
 
     def add_sysinfo(self, data):
         table_object = self.get_table_object(table_name="sysinfo")
+        series_table = self.get_table_object(table_name="sysinfo_series")
         log.info(
             f"Adding sysinfo. Host_id: {data['host_id']} CPU: {data['cpu_pct']} RAM: {data['ram_pct']}"
         )
+        cpu_cores = data["cpu_pct"]
+        if isinstance(cpu_cores, str):
+            cpu_cores = [float(each) for each in cpu_cores.split(",") if each != ""]
+        timestamp = self.timestamp(dt=datetime.now(timezone.utc))
+        cpu_avg = sum(cpu_cores) / len(cpu_cores) if len(cpu_cores) > 0 else 0.0
+
+        with self.write_session() as session:
+            session.execute(
+                insert(table_object),
+                {
+                    "host_id": data["host_id"],
+                    "cpu_pct": ",".join(str(each) for each in cpu_cores),
+                    "ram_pct": data["ram_pct"],
+                    "added": timestamp,
+                },
+            )
+            session.execute(
+                insert(series_table),
+                {
+                    "host_id": data["host_id"],
+                    "resolution": "raw",
+                    "timestamp": timestamp,
+                    "samples": 1,
+                    "cpu_avg": cpu_avg,
+                    "cpu_min": min(cpu_cores, default=0.0),
+                    "cpu_max": max(cpu_cores, default=0.0),
+                    "cpu_cores": cpu_cores,
+                    "ram_avg": data["ram_pct"],
+                    "ram_min": data["ram_pct"],
+                    "ram_max": data["ram_pct"],
+                },
+            )
+
+    def rollup_sysinfo(
+        self, source: str, target: str, cutoff: int, batch_size: int = 5000
+    ) -> int:
+        table_object = self.get_table_object(table_name="sysinfo_series")
+        step = sysinfo_resolutions[target]
+        filters = []
+        filters.append(table_object.c.resolution == source)
+        filters.append(table_object.c.timestamp < cutoff)
+        with self.write_session() as session:
+            rows = session.execute(
+                select(table_object)
+                .filter(*filters)
+                .order_by(table_object.c.host_id, table_object.c.timestamp)
+                .limit(batch_size)
+            ).all()
+            if len(rows) == 0:
+                return 0
+            # the chunk runs to the end of its last bucket, so a bucket is
+            # never split between two jobs
+            last = rows[-1]
+            rows += session.execute(
+                select(table_object)
+                .filter(
+                    *filters,
+                    table_object.c.host_id == last.host_id,
+                    table_object.c.timestamp > last.timestamp,
+                    table_object.c.timestamp
+                    < last.timestamp - last.timestamp % step + step,
+                )
+                .order_by(table_object.c.timestamp)
+            ).all()
+            last = rows[-1]
+
+            buckets: dict = {}
+            for row in rows:
+                point = row._asdict()
+                key = (point["host_id"], point["timestamp"] - point["timestamp"] % step)
+                buckets.setdefault(key, []).append(point)
+            for host_id in {key[0] for key in buckets}:
+                host_buckets = [key[1] for key in buckets if key[0] == host_id]
+                target_filters = []
+                target_filters.append(table_object.c.host_id == host_id)
+                target_filters.append(table_object.c.resolution == target)
+                target_filters.append(table_object.c.timestamp.in_(host_buckets))
+                for existing in session.execute(
+                    select(table_object).filter(*target_filters)
+                ):
+                    buckets[(host_id, existing.timestamp)].append(existing._asdict())
+                session.execute(delete(table_object).where(*target_filters))
+
+            session.execute(
+                insert(table_object),
+                [
+                    {"host_id": key[0], "resolution": target, "timestamp": key[1]}
+                    | merge_sysinfo_points(points)
+                    for key, points in buckets.items()
+                ],
+            )
+            # everything up to the last key is in this chunk, since rolled up
+            # rows are gone the next chunk starts from the top again
+            session.execute(
+                delete(table_object).where(
+                    *filters,
+                    tuple_(table_object.c.host_id, table_object.c.timestamp)
+                    <= tuple_(last.host_id, last.timestamp),
+                )
+            )
+        return len(rows)
+
+    def prune_sysinfo(self, now: int | None = None) -> dict:
+        table_object = self.get_table_object(table_name="sysinfo_series")
+        legacy_table = self.get_table_object(table_name="sysinfo")
+        if now is None:
+            now = self.timestamp(dt=datetime.now(timezone.utc))
+        day = 24 * 60 * 60 * 1000
+        report = {}
+        with self.write_session() as session:
+            filters = []
+            filters.append(table_object.c.resolution == "1h")
+            filters.append(
+                table_object.c.timestamp < now - self.retention.sysinfo_1h_days * day
+            )
+            report["1h"] = session.execute(
+                delete(table_object).where(*filters)
+            ).rowcount
+            latest = select(func.max(legacy_table.c.id)).group_by(
+                legacy_table.c.host_id
+            )
+            report["partitions"] = self.drop_partitions(
+                "sysinfo",
+                cutoff=now - self.retention.sysinfo_raw_days * day,
+                keep=latest,
+            )
+            filters = []
+            filters.append(
+                legacy_table.c.added < now - self.retention.sysinfo_raw_days * day
+            )
+            filters.append(legacy_table.c.id.not_in(latest))
+            report["sysinfo"] = session.execute(
+                delete(legacy_table).where(*filters)
+            ).rowcount
+        log.info(f"Sysinfo pruned, rows removed: {report}")
+        return report
+
+    def get_sysinfo_series(
+        self,
+        host_id: int,
+        start: int | None = None,
+        end: int | None = None,
+        max_points: int = 500,
+    ) -> dict:
+        table_object = self.get_table_object(table_name="sysinfo_series")
+        if end is None:
+            end = self.timestamp(dt=datetime.now(timezone.utc))
+        if start is None:
+            start = end - 24 * 60 * 60 * 1000
+        resolution = "1h"
+        for name, step in sysinfo_resolutions.items():
+            if (end - start) / step <= max_points:
+                resolution = name
+                break
 
-        with Session(self.engine) as session:
-            session.execute(insert(table_object), data)
-            session.commit()
+        filters = []
+        filters.append(table_object.c.host_id == host_id)
+        filters.append(table_object.c.timestamp >= start)
+        filters.append(table_object.c.timestamp < end)
+        with self.session() as session:
+            rows = session.execute(
+                select(table_object).filter(*filters).order_by(table_object.c.timestamp)
+            ).all()
+
+        if resolution == "raw":
+            points = [row._asdict() for row in rows]
+        else:
+            step = sysinfo_resolutions[resolution]
+            buckets: dict = {}
+            for row in rows:
+                buckets.setdefault(row.timestamp - row.timestamp % step, []).append(
+                    row._asdict()
+                )
+            points = [
+                {"timestamp": bucket} | merge_sysinfo_points(bucket_points)
+                for bucket, bucket_points in buckets.items()
+            ]
+
+        series: dict = {"resolution": resolution}
+        for column in [
+            "timestamp",
+            "cpu_avg",
+            "cpu_min",
+            "cpu_max",
+            "cpu_cores",
+            "ram_avg",
+            "ram_min",
+            "ram_max",
+        ]:
+            series[column] = [point[column] for point in points]
+        return series
 
     def add_last_process_ts(self, data: int, host_id: int):
         table_object = self.get_table_object(table_name="sysinfo")
-        with Session(self.engine) as session:
+        with self.write_session() as session:
             result = session.scalars(
                 select(table_object)
                 .filter_by(host_id=host_id)
@@ -615,13 +1888,12 @@ class Database:
                     .where(*filters)
                     .values({"last_process_ts": data})
                 )
-                session.commit()
 
     def delete_then_add_baselist(
         self, data: list, host_id: int, list_type: str = "white"
     ):
         table_object = self.get_table_object(table_name="base_lists")
-        with Session(self.engine) as session:
+        with self.write_session() as session:
             check = session.scalars(
                 select(table_object)
                 .filter_by(host_id=host_id, list_type=list_type)
@@ -647,79 +1919,279 @@ class Database:
             if len(formatted_data) > 0:
                 session.execute(insert(table_object), formatted_data)
                 log.info(f"{list_type}list data updated for host {host_id}")
-            session.commit()
 
     def update_starting_capital(self, data: float, host_id: int):
         table_object = self.get_table_object(table_name="hosts")
-        with Session(self.engine) as session:
+        with self.write_session() as session:
             filters = []
             filters.append(table_object.c.id == host_id)
             session.execute(
                 update(table_object).where(*filters).values({"starting_capital": data})
             )
-            session.commit()
 
     def update_balances(self, data: list, host_id: int):
         table_object = self.get_table_object(table_name="balances")
-        table_keys = table_object.columns.keys()
-        with Session(self.engine) as session:
-            check = session.scalars(
-                select(table_object).filter_by(host_id=host_id).limit(1)
-            ).first()
+        snapshots_table = self.get_table_object(table_name="balance_snapshots")
+        balances = {
+            balance["currency"]: {
+                "free": balance["free"],
+                "balance": balance["balance"],
+                "est_stake": balance.get("est_stake", 0.0),
+            }
+            for balance in data
+        }
+        previous = self.get_latest_balance_snapshot(host_id=host_id)
+        if not self.balances_changed(previous=previous, current=balances):
+            log.info(f"Balances unchanged for host {host_id}")
+            return
+
+        timestamp = self.timestamp(dt=datetime.now(timezone.utc))
+        with self.write_session() as session:
+            session.execute(
+                delete(table_object).where(table_object.c.host_id == host_id)
+            )
+            if len(balances) > 0:
+                session.execute(
+                    insert(table_object),
+                    [
+                        {
+                            "host_id": host_id,
+                            "currency": currency,
+                            "free": values["free"],
+                            "balance": values["balance"],
+                        }
+                        for currency, values in balances.items()
+                    ],
+                )
+            snapshots = [
+                {"host_id": host_id, "timestamp": timestamp, "currency": currency}
+                | values
+                for currency, values in balances.items()
+            ]
+            if len(snapshots) == 0:
+                # without a snapshot the last one with balances stays the
+                # latest and every later empty report would delete again
+                snapshots.append(
+                    {
+                        "host_id": host_id,
+                        "timestamp": timestamp,
+                        "currency": empty_balances_currency,
+                        "free": 0.0,
+                        "balance": 0.0,
+                        "est_stake": 0.0,
+                    }
+                )
+            session.execute(insert(snapshots_table), snapshots)
+            log.info(f"Updating balances for host {host_id}")
 
-            if check is not None:
-                if check > 0:
-                    log.info(f"balances found for host {host_id} - deleting")
-                    filters = []
-                    filters.append(table_object.c.host_id == host_id)
-                    session.execute(delete(table_object).where(*filters))
+    def balances_changed(self, previous: dict, current: dict) -> bool:
+        if previous.keys() != current.keys():
+            return True
+        for currency, values in current.items():
+            if values["free"] != previous[currency]["free"]:
+                return True
+            if values["balance"] != previous[currency]["balance"]:
+                return True
+        previous_value = sum(values["est_stake"] for values in previous.values())
+        current_value = sum(values["est_stake"] for values in current.values())
+        return abs(current_value - previous_value) > balance_value_tolerance * abs(
+            previous_value
+        )
 
-            for balance in data:
-                adjusted_balance = {}
-                balance["host_id"] = host_id
-                for key in table_keys:
-                    adjusted_balance[key] = balance[key]
-                session.execute(insert(table_object), adjusted_balance)
-            log.info(f"Updating balances for host {host_id}")
-            session.commit()
+    def get_latest_balance_snapshot(self, host_id: int) -> dict:
+        table_object = self.get_table_object(table_name="balance_snapshots")
+        with self.session() as session:
+            timestamp = session.scalar(
+                select(func.max(table_object.c.timestamp)).filter(
+                    table_object.c.host_id == host_id
+                )
+            )
+            if timestamp is None:
+                return {}
+            result = session.execute(
+                select(
+                    table_object.c.currency,
+                    table_object.c.free,
+                    table_object.c.balance,
+                    table_object.c.est_stake,
+                ).filter_by(host_id=host_id, timestamp=timestamp)
+            ).all()
+        return {
+            row.currency: {
+                "free": row.free,
+                "balance": row.balance,
+                "est_stake": row.est_stake,
+            }
+            for row in result
+            if row.currency != empty_balances_currency
+        }
+
+    def compact_balance_snapshots(self, now: int | None = None) -> int:
+        table_object = self.get_table_object(table_name="balance_snapshots")
+        if now is None:
+            now = self.timestamp(dt=datetime.now(timezone.utc))
+        day = 24 * 60 * 60 * 1000
+        cutoff = now - self.retention.balances_daily_after_days * day
+        last_of_day = (
+            select(table_object.c.host_id, func.max(table_object.c.timestamp))
+            .filter(table_object.c.timestamp < cutoff)
+            .group_by(table_object.c.host_id, table_object.c.timestamp // day)
+        )
+        filters = []
+        filters.append(table_object.c.timestamp < cutoff)
+        filters.append(
+            tuple_(table_object.c.host_id, table_object.c.timestamp).not_in(last_of_day)
+        )
+        with self.write_session() as session:
+            removed = session.execute(delete(table_object).where(*filters)).rowcount
+        log.info(f"Balance snapshots compacted: {removed}")
+        return removed
+
+    def get_portfolio_value(
+        self, host_id: int, start: int | None = None, end: int | None = None
+    ) -> dict:
+        table_object = self.get_table_object(table_name="balance_snapshots")
+        filters = []
+        filters.append(table_object.c.host_id == host_id)
+        if start is not None:
+            filters.append(table_object.c.timestamp >= start)
+        if end is not None:
+            filters.append(table_object.c.timestamp < end)
+        with self.session() as session:
+            result = session.execute(
+                select(table_object.c.timestamp, func.sum(table_object.c.est_stake))
+                .filter(*filters)
+                .group_by(table_object.c.timestamp)
+                .order_by(table_object.c.timestamp)
+            ).all()
+        return {
+            "timestamp": [row[0] for row in result],
+            "value": [round(row[1], 8) for row in result],
+        }
+
+    def get_last_log_timestamp(self, host_id: int) -> int:
+        table_object = self.get_table_object(table_name="logs")
+        with self.session() as session:
+            timestamp = session.scalar(
+                select(func.max(table_object.c.timestamp)).filter(
+                    table_object.c.host_id == host_id
+                )
+            )
+        if timestamp is None:
+            return 0
+        return timestamp
 
     def update_logs(self, data: list, host_id: int):
         table_object = self.get_table_object(table_name="logs")
+        timestamp = self.get_last_log_timestamp(host_id=host_id)
+
+        logs = [
+            {
+                "host_id": host_id,
+                "timestamp": int(log_item[1]),
+                "name": log_item[2],
+                "level": log_item[3],
+                "message": log_item[4],
+            }
+            for log_item in data
+            if int(log_item[1]) > timestamp
+        ]
 
-        with Session(self.engine) as session:
+        if len(logs) > 0:
+            with self.write_session() as session:
+                session.execute(insert(table_object), logs)
+        log.info(f"Logs updated for host {host_id}: {len(logs)}")
+
+    def get_logs_tail(
+        self,
+        host_id: int,
+        level: str = "DEBUG",
+        limit: int = 100,
+        before: int | None = None,
+    ) -> list:
+        table_object = self.get_table_object(table_name="logs")
+        filters = []
+        filters.append(table_object.c.host_id == host_id)
+        if level != log_levels[0]:
+            filters.append(
+                table_object.c.level.in_(log_levels[log_levels.index(level) :])
+            )
+        if before is not None:
+            filters.append(table_object.c.timestamp < before)
+        with self.session() as session:
             result = session.execute(
-                select(table_object)
-                .filter_by(host_id=host_id)
-                .order_by(table_object.c.id.desc())
-                .limit(1)
-            ).first()
+                select(
+                    table_object.c.timestamp,
+                    table_object.c.name,
+                    table_object.c.level,
+                    table_object.c.message,
+                )
+                .filter(*filters)
+                .order_by(table_object.c.timestamp.desc(), table_object.c.id.desc())
+                .limit(limit)
+            ).all()
+        return [row._asdict() for row in result]
 
-        timestamp = 0
-        if result is not None:
-            if len(result) > 0:
-                timestamp = result[2]
-
-        logs = []
-        for log_item in data:
-            ts = int(log_item[1])
-            if ts > timestamp:
-                log_data = {
+    def get_trade_sync_state(self, host_id: int) -> dict:
+        table_object = self.get_table_object(table_name="trade_sync")
+        trades_table = self.get_table_object(table_name="trades")
+        with self.session() as session:
+            state = session.execute(
+                select(table_object).filter_by(host_id=host_id)
+            ).first()
+            if state is not None:
+                return state._asdict()
+            derived = session.execute(
+                select(
+                    func.max(trades_table.c.trade_id),
+                    func.max(trades_table.c.close_timestamp),
+                    func.count(),
+                ).filter_by(host_id=host_id, is_open=False)
+            ).first()
+        return {
+            "host_id": host_id,
+            "max_closed_trade_id": derived[0] or 0,
+            "last_close_timestamp": derived[1],
+            "closed_trade_count": derived[2],
+            "updated": None,
+        }
+
+    def update_trade_sync_state(
+        self,
+        host_id: int,
+        max_closed_trade_id: int,
+        last_close_timestamp: int | None,
+        closed_trade_count: int,
+    ) -> None:
+        table_object = self.get_table_object(table_name="trade_sync")
+        with self.write_session() as session:
+            session.execute(
+                delete(table_object).where(table_object.c.host_id == host_id)
+            )
+            session.execute(
+                insert(table_object),
+                {
                     "host_id": host_id,
-                    "timestamp": ts,
-                    "name": log_item[2],
-                    "level": log_item[3],
-                    "message": log_item[4],
-                }
-                logs.append(log_data)
+                    "max_closed_trade_id": max_closed_trade_id,
+                    "last_close_timestamp": last_close_timestamp,
+                    "closed_trade_count": closed_trade_count,
+                    "updated": self.timestamp(dt=datetime.now(timezone.utc)),
+                },
+            )
 
-        if len(logs) > 0:
-            with Session(self.engine) as session:
-                session.execute(insert(table_object), logs)
-                session.commit()
+    def get_open_trade_ids(self, host_id: int) -> list:
+        table_object = self.get_table_object(table_name="trades")
+        with self.session() as session:
+            result = session.scalars(
+                select(table_object.c.trade_id)
+                .filter_by(host_id=host_id, is_open=True)
+                .order_by(table_object.c.trade_id)
+            ).all()
+        return list(result)
 
     def get_oldest_open_trade_id(self, host_id: int):
         table_object = self.get_table_object(table_name="trades")
-        with Session(self.engine) as session:
+        with self.session() as session:
             result = session.execute(
                 select(table_object)
                 .filter_by(host_id=host_id, is_open=True)
@@ -727,7 +2199,7 @@ class Database:
                 .limit(1)
             ).first()
         if result is None:
-            with Session(self.engine) as session:
+            with self.session() as session:
                 result = session.execute(
                     select(table_object)
                     .filter_by(host_id=host_id, is_open=True)
@@ -743,47 +2215,704 @@ class Database:
 
     def check_then_add_trades(self, data: list, host_id: int):
         table_object = self.get_table_object(table_name="trades")
+        stats_table = self.get_table_object(table_name="host_stats")
+        rollups_table = self.get_table_object(table_name="equity_rollups")
         table_keys = table_object.columns.keys()
-        for trade in data:
-            trade = trade | {"host_id": host_id}
-            trade["trading_mode"] = trade["trading_mode"].upper()
-            with Session(self.engine) as session:
-                check = session.execute(
-                    select(table_object)
-                    .filter_by(host_id=host_id, trade_id=trade["trade_id"])
+        with self.transaction():
+            for trade in data:
+                trade = trade | {"host_id": host_id}
+                trade["trading_mode"] = trade["trading_mode"].upper()
+                with self.session() as session:
+                    check = session.execute(
+                        select(table_object)
+                        .filter_by(host_id=host_id, trade_id=trade["trade_id"])
+                        .limit(1)
+                    ).first()
+                adjusted_trade = {}
+                for key in table_keys:
+                    adjusted_trade[key] = trade[key]
+                if check is None:
+                    log.info(
+                        f"Adding trade to db. Host: {host_id} Trade: {trade['trade_id']} - {trade['pair']}"
+                    )
+                    with self.write_session() as session:
+                        session.execute(insert(table_object), adjusted_trade)
+                        self.update_host_stats(
+                            session=session,
+                            table_object=stats_table,
+                            previous=None,
+                            current=adjusted_trade,
+                        )
+                        self.update_equity_rollups(
+                            session=session,
+                            table_object=rollups_table,
+                            previous=None,
+                            current=adjusted_trade,
+                        )
+                else:
+                    log.info(f"Trade {trade['trade_id']} already in DB, updating")
+                    with self.write_session() as session:
+                        filters = []
+                        filters.append(table_object.c.host_id == host_id)
+                        filters.append(table_object.c.trade_id == trade["trade_id"])
+                        session.execute(
+                            update(table_object).where(*filters).values(adjusted_trade)
+                        )
+                        self.update_host_stats(
+                            session=session,
+                            table_object=stats_table,
+                            previous=check._asdict(),
+                            current=adjusted_trade,
+                        )
+                        self.update_equity_rollups(
+                            session=session,
+                            table_object=rollups_table,
+                            previous=check._asdict(),
+                            current=adjusted_trade,
+                        )
+
+                self.check_then_update_or_add_orders(
+                    data=trade["orders"], host_id=host_id, trade_id=trade["trade_id"]
+                )
+
+    def trade_stats(self, trade: dict | None) -> dict:
+        if trade is None:
+            return {}
+        profit = trade["profit_abs"]
+        if trade["is_open"]:
+            return {"open_trades": 1, "open_profit": profit}
+        return {
+            "closed_trades": 1,
+            "winning_trades": 1 if profit >= 0 else 0,
+            "closed_profit": profit,
+            "gross_profit": profit if profit >= 0 else 0.0,
+            "gross_loss": profit if profit < 0 else 0.0,
+        }
+
+    def update_host_stats(
+        self, session, table_object, previous: dict | None, current: dict
+    ) -> None:
+        deltas: dict = {}
+        for trade, sign in [(previous, -1), (current, 1)]:
+            if trade is None:
+                continue
+            key = (trade["host_id"], trade["quote_currency"])
+            for column, value in self.trade_stats(trade).items():
+                deltas.setdefault(key, {})
+                deltas[key][column] = deltas[key].get(column, 0) + sign * value
+
+        # open trades are updated every scrape, only closed ones change analytics
+        closed_changed = (
+            not current["is_open"] or (previous is not None and not previous["is_open"])
+        ) and (
+            previous is None or any(previous[key] != current[key] for key in current)
+        )
+        for (host_id, quote_currency), delta in deltas.items():
+            filters = []
+            filters.append(table_object.c.host_id == host_id)
+            filters.append(table_object.c.quote_currency == quote_currency)
+            stats = session.execute(select(table_object).filter(*filters)).first()
+            if stats is None:
+                session.execute(
+                    insert(table_object),
+                    {"host_id": host_id, "quote_currency": quote_currency} | delta,
+                )
+            values = {"version": table_object.c.version + 1}
+            if closed_changed:
+                values["closed_version"] = table_object.c.closed_version + 1
+            if stats is not None:
+                for column, value in delta.items():
+                    values[column] = table_object.c[column] + value
+            if (
+                not current["is_open"]
+                and current["host_id"] == host_id
+                and current["quote_currency"] == quote_currency
+                and (
+                    stats is None
+                    or stats.first_close_timestamp is None
+                    or current["close_timestamp"] < stats.first_close_timestamp
+                )
+            ):
+                values["first_close_timestamp"] = current["close_timestamp"]
+                values["first_open_timestamp"] = current["open_timestamp"]
+            session.execute(update(table_object).where(*filters).values(values))
+
+    def trade_rollups(self, trade: dict | None) -> dict:
+        if trade is None or trade["is_open"]:
+            return {}
+        fees = 0.0
+        if trade["fee_open_currency"] == trade["quote_currency"]:
+            fees += trade["fee_open_cost"] or 0.0
+        if trade["fee_close_currency"] == trade["quote_currency"]:
+            fees += trade["fee_close_cost"] or 0.0
+        rollups = {}
+        for period, length in rollup_periods.items():
+            key = (
+                trade["host_id"],
+                trade["quote_currency"],
+                period,
+                trade["close_timestamp"] - trade["close_timestamp"] % length,
+            )
+            rollups[key] = {
+                "realized_profit": trade["profit_abs"],
+                "trade_count": 1,
+                "fees": fees,
+            }
+        return rollups
+
+    def update_equity_rollups(
+        self, session, table_object, previous: dict | None, current: dict
+    ) -> None:
+        deltas: dict = {}
+        for trade, sign in [(previous, -1), (current, 1)]:
+            for key, values in self.trade_rollups(trade).items():
+                deltas.setdefault(key, {})
+                for column, value in values.items():
+                    deltas[key][column] = deltas[key].get(column, 0) + sign * value
+
+        for (host_id, quote_currency, period, bucket), delta in deltas.items():
+            if all(value == 0 for value in delta.values()):
+                continue
+            filters = []
+            filters.append(table_object.c.host_id == host_id)
+            filters.append(table_object.c.quote_currency == quote_currency)
+            filters.append(table_object.c.period == period)
+            row = session.execute(
+                select(table_object).filter(*filters, table_object.c.bucket == bucket)
+            ).first()
+            if row is None:
+                cumulative_profit = session.scalar(
+                    select(table_object.c.cumulative_profit)
+                    .filter(*filters, table_object.c.bucket < bucket)
+                    .order_by(table_object.c.bucket.desc())
                     .limit(1)
-                ).first()
-            adjusted_trade = {}
-            for key in table_keys:
-                adjusted_trade[key] = trade[key]
-            if check is None:
-                log.info(
-                    f"Adding trade to db. Host: {host_id} Trade: {trade['trade_id']} - {trade['pair']}"
                 )
-                with Session(self.engine) as session:
-                    session.execute(insert(table_object), adjusted_trade)
-                    session.commit()
+                session.execute(
+                    insert(table_object),
+                    {
+                        "host_id": host_id,
+                        "quote_currency": quote_currency,
+                        "period": period,
+                        "bucket": bucket,
+                        "realized_profit": delta["realized_profit"],
+                        "trade_count": delta["trade_count"],
+                        "fees": delta["fees"],
+                        "cumulative_profit": cumulative_profit or 0.0,
+                    },
+                )
             else:
-                log.info(f"Trade {trade['trade_id']} already in DB, updating")
-                with Session(self.engine) as session:
-                    filters = []
-                    filters.append(table_object.c.host_id == host_id)
-                    filters.append(table_object.c.trade_id == trade["trade_id"])
-                    session.execute(
-                        update(table_object).where(*filters).values(adjusted_trade)
+                session.execute(
+                    update(table_object)
+                    .where(*filters, table_object.c.bucket == bucket)
+                    .values(
+                        {
+                            column: table_object.c[column] + value
+                            for column, value in delta.items()
+                        }
+                    )
+                )
+            if delta["realized_profit"] != 0:
+                session.execute(
+                    update(table_object)
+                    .where(*filters, table_object.c.bucket >= bucket)
+                    .values(
+                        {
+                            "cumulative_profit": table_object.c.cumulative_profit
+                            + delta["realized_profit"]
+                        }
                     )
-                    session.commit()
+                )
 
-            self.check_then_update_or_add_orders(
-                data=trade["orders"], host_id=host_id, trade_id=trade["trade_id"]
+    def rebuild_equity_rollups(self, host_id: int | None = None) -> int:
+        trades_table = self.get_table_object(table_name="trades")
+        table_object = self.get_table_object(table_name="equity_rollups")
+        filters = [trades_table.c.is_open.is_(False)]
+        if host_id is not None:
+            filters.append(trades_table.c.host_id == host_id)
+        rollups: dict = {}
+        with self.write_session() as session:
+            for trade in session.execute(select(trades_table).filter(*filters)):
+                for key, values in self.trade_rollups(trade._asdict()).items():
+                    rollups.setdefault(
+                        key, {"realized_profit": 0.0, "trade_count": 0, "fees": 0.0}
+                    )
+                    for column, value in values.items():
+                        rollups[key][column] += value
+            rows = []
+            cumulative: dict = {}
+            for key in sorted(rollups):
+                series = key[:3]
+                cumulative[series] = (
+                    cumulative.get(series, 0.0) + rollups[key]["realized_profit"]
+                )
+                rows.append(
+                    {
+                        "host_id": key[0],
+                        "quote_currency": key[1],
+                        "period": key[2],
+                        "bucket": key[3],
+                        "cumulative_profit": cumulative[series],
+                    }
+                    | rollups[key]
+                )
+            delete_filters = []
+            if host_id is not None:
+                delete_filters.append(table_object.c.host_id == host_id)
+            session.execute(delete(table_object).where(*delete_filters))
+            if len(rows) > 0:
+                session.execute(insert(table_object), rows)
+        log.info(f"equity_rollups rebuilt: {len(rows)} rows")
+        return len(rows)
+
+    def check_equity_rollups_loaded(self) -> None:
+        rollups_table = self.get_table_object(table_name="equity_rollups")
+        trades_table = self.get_table_object(table_name="trades")
+        with self.session() as session:
+            rollups = session.scalar(select(func.count()).select_from(rollups_table))
+            trades = session.scalar(
+                select(func.count())
+                .select_from(trades_table)
+                .filter(trades_table.c.is_open.is_(False))
             )
+        if rollups == 0 and trades is not None and trades > 0:
+            log.info("equity_rollups empty, building from trades")
+            self.rebuild_equity_rollups()
+
+    def get_equity(
+        self,
+        host_id: int,
+        period: str = "1d",
+        start: int | None = None,
+        end: int | None = None,
+    ) -> dict:
+        table_object = self.get_table_object(table_name="equity_rollups")
+        filters = []
+        filters.append(table_object.c.host_id == host_id)
+        filters.append(table_object.c.period == period)
+        if start is not None:
+            filters.append(table_object.c.bucket >= start)
+        if end is not None:
+            filters.append(table_object.c.bucket < end)
+        hosts_table = self.get_table_object(table_name="hosts")
+        with self.session() as session:
+            host = session.execute(
+                select(
+                    hosts_table.c.stake_currency, hosts_table.c.starting_capital
+                ).filter(hosts_table.c.id == host_id)
+            ).first()
+            rows = session.execute(
+                select(table_object)
+                .filter(*filters)
+                .order_by(table_object.c.quote_currency, table_object.c.bucket)
+            ).all()
+        equity: dict = {}
+        for row in rows:
+            if row.quote_currency not in equity:
+                equity[row.quote_currency] = {
+                    "bucket": [],
+                    "profit": [],
+                    "trades": [],
+                    "fees": [],
+                    "cumulative_profit": [],
+                }
+            series = equity[row.quote_currency]
+            series["bucket"].append(row.bucket)
+            series["profit"].append(row.realized_profit)
+            series["trades"].append(row.trade_count)
+            series["fees"].append(row.fees)
+            series["cumulative_profit"].append(row.cumulative_profit)
+        if host is not None and host.stake_currency in equity:
+            series = equity[host.stake_currency]
+            series["equity"] = [
+                round((host.starting_capital or 0.0) + profit, 8)
+                for profit in series["cumulative_profit"]
+            ]
+        return equity
+
+    def update_freqtrade_stats(
+        self,
+        host_id: int,
+        profit: dict,
+        daily: dict,
+        performance: list,
+        stats: dict,
+    ) -> None:
+        tables = {
+            name: self.get_table_object(table_name=name)
+            for name in ["ft_profit", "ft_daily", "ft_performance", "ft_exit_reasons"]
+        }
+        durations = stats.get("durations", {})
+        rows: dict = {name: [] for name in tables}
+        if "closed_trade_count" in profit:
+            rows["ft_profit"].append(
+                {
+                    "host_id": host_id,
+                    "trade_count": profit["trade_count"],
+                    "closed_trade_count": profit["closed_trade_count"],
+                    "winning_trades": profit["winning_trades"],
+                    "losing_trades": profit["losing_trades"],
+                    "profit_closed_coin": profit["profit_closed_coin"],
+                    "profit_all_coin": profit["profit_all_coin"],
+                    "profit_factor": profit.get("profit_factor"),
+                    "max_drawdown": profit.get("max_drawdown"),
+                    "max_drawdown_abs": profit.get("max_drawdown_abs"),
+                    "first_trade_timestamp": profit.get("first_trade_timestamp")
+                    or None,
+                    "latest_trade_timestamp": profit.get("latest_trade_timestamp")
+                    or None,
+                    "wins_duration": durations.get("wins"),
+                    "draws_duration": durations.get("draws"),
+                    "losses_duration": durations.get("losses"),
+                    "updated": self.timestamp(dt=datetime.now(timezone.utc)),
+                }
+            )
+        for day in daily.get("data", []):
+            rows["ft_daily"].append(
+                {
+                    "host_id": host_id,
+                    "date": day["date"],
+                    "abs_profit": day["abs_profit"],
+                    "rel_profit": day.get("rel_profit"),
+                    "starting_balance": day.get("starting_balance"),
+                    "trade_count": day["trade_count"],
+                }
+            )
+        for pair in performance:
+            rows["ft_performance"].append(
+                {
+                    "host_id": host_id,
+                    "pair": pair["pair"],
+                    "profit_abs": pair["profit_abs"],
+                    "profit_ratio": pair["profit_ratio"],
+                    "count": pair["count"],
+                }
+            )
+        for exit_reason, counts in stats.get("exit_reasons", {}).items():
+            rows["ft_exit_reasons"].append(
+                {
+                    "host_id": host_id,
+                    "exit_reason": exit_reason,
+                    "wins": counts.get("wins", 0),
+                    "losses": counts.get("losses", 0),
+                    "draws": counts.get("draws", 0),
+                }
+            )
+
+        with self.write_session() as session:
+            for name, table_object in tables.items():
+                session.execute(
+                    delete(table_object).where(table_object.c.host_id == host_id)
+                )
+                if len(rows[name]) > 0:
+                    session.execute(insert(table_object), rows[name])
+        log.info(f"Freqtrade stats updated for host {host_id}")
+
+    def get_freqtrade_profit(self, host_id: int) -> dict:
+        table_object = self.get_table_object(table_name="ft_profit")
+        with self.session() as session:
+            result = session.execute(
+                select(table_object).filter_by(host_id=host_id)
+            ).first()
+        if result is None:
+            return {}
+        return result._asdict()
+
+    def check_freqtrade_stats(self, host_id: int | None = None) -> list:
+        profit_table = self.get_table_object(table_name="ft_profit")
+        performance_table = self.get_table_object(table_name="ft_performance")
+        hosts_table = self.get_table_object(table_name="hosts")
+        filters = []
+        if host_id is not None:
+            filters.append(profit_table.c.host_id == host_id)
+        with self.session() as session:
+            profits = session.execute(
+                select(profit_table, hosts_table.c.stake_currency)
+                .join(hosts_table, hosts_table.c.id == profit_table.c.host_id)
+                .filter(*filters)
+            ).all()
+
+        mismatches = []
+
+        def compare(host, scope, column, reported, derived, tolerance=0.0):
+            if abs(reported - derived) > tolerance:
+                mismatches.append(
+                    {
+                        "host_id": host,
+                        "scope": scope,
+                        "column": column,
+                        "freqtrade": reported,
+                        "freqdash": derived,
+                    }
+                )
+
+        for profit in profits:
+            stats = self.get_host_stats(host_id=profit.host_id).get(
+                profit.stake_currency, {}
+            )
+            compare(
+                profit.host_id,
+                "profit",
+                "closed_trades",
+                profit.closed_trade_count,
+                stats.get("closed_trades", 0),
+            )
+            compare(
+                profit.host_id,
+                "profit",
+                "closed_profit",
+                profit.profit_closed_coin,
+                stats.get("closed_profit", 0.0),
+                tolerance=1e-6,
+            )
+
+            with self.session() as session:
+                reported = session.execute(
+                    select(
+                        performance_table.c.pair,
+                        performance_table.c.count,
+                        performance_table.c.profit_abs,
+                    ).filter_by(host_id=profit.host_id)
+                ).all()
+            derived = {
+                pair["pair"]: pair
+                for pair in self.get_performance(
+                    group_by="pair", host_id=profit.host_id
+                )
+            }
+            for pair in reported:
+                compare(
+                    profit.host_id,
+                    pair.pair,
+                    "trades",
+                    pair.count,
+                    derived.get(pair.pair, {}).get("trades", 0),
+                )
+                compare(
+                    profit.host_id,
+                    pair.pair,
+                    "profit",
+                    pair.profit_abs,
+                    derived.get(pair.pair, {}).get("profit", 0.0),
+                    tolerance=1e-6,
+                )
+        return mismatches
+
+    def get_host_stats(self, host_id: int) -> dict:
+        table_object = self.get_table_object(table_name="host_stats")
+        with self.session() as session:
+            result = session.execute(
+                select(table_object).filter_by(host_id=host_id)
+            ).all()
+        return {stats.quote_currency: stats._asdict() for stats in result}
+
+    def get_ingest_version(self, host_id: int | None = None) -> int:
+        table_object = self.get_table_object(table_name="host_stats")
+        filters = []
+        if host_id is not None:
+            filters.append(table_object.c.host_id == host_id)
+        with self.session() as session:
+            version = session.scalar(
+                select(func.sum(table_object.c.version)).filter(*filters)
+            )
+        if version is None:
+            return 0
+        return version
+
+    def get_closed_trades_version(self, host_id: int | None = None) -> int:
+        table_object = self.get_table_object(table_name="host_stats")
+        filters = []
+        if host_id is not None:
+            filters.append(table_object.c.host_id == host_id)
+        with self.session() as session:
+            version = session.scalar(
+                select(func.sum(table_object.c.closed_version)).filter(*filters)
+            )
+        if version is None:
+            return 0
+        return version
+
+    def get_starting_capital(self, host_id: int) -> float | None:
+        table_object = self.get_table_object(table_name="hosts")
+        with self.session() as session:
+            return session.scalar(
+                select(table_object.c.starting_capital).filter(
+                    table_object.c.id == host_id
+                )
+            )
+
+    def get_performance(self, group_by: str, host_id: int | None = None) -> list:
+        table_object = self.get_table_object(table_name="trades")
+        hosts_table = self.get_table_object(table_name="hosts")
+        filters = [table_object.c.is_open.is_(False)]
+        if host_id is not None:
+            filters.append(table_object.c.host_id == host_id)
+        if group_by == "strategy":
+            group = hosts_table.c.strategy
+        else:
+            group = table_object.c[group_by]
+        statement = select(
+            group,
+            table_object.c.quote_currency,
+            func.count(),
+            func.count().filter(table_object.c.profit_abs >= 0),
+            func.sum(table_object.c.profit_abs),
+            func.avg(table_object.c.profit_abs),
+            func.avg(table_object.c.close_timestamp - table_object.c.open_timestamp),
+        ).filter(*filters)
+        if group_by == "strategy":
+            statement = statement.join(
+                hosts_table, hosts_table.c.id == table_object.c.host_id
+            )
+        statement = statement.group_by(group, table_object.c.quote_currency).order_by(
+            func.sum(table_object.c.profit_abs).desc()
+        )
+        with self.session() as session:
+            result = session.execute(statement).all()
+        return [
+            {
+                group_by: row[0],
+                "quote_currency": row[1],
+                "trades": row[2],
+                "win_rate": round(row[3] / row[2], 4),
+                "profit": round(row[4], 8),
+                "avg_profit": round(row[5], 8),
+                "avg_duration_minutes": round(row[6] / 60000, 2),
+            }
+            for row in result
+        ]
+
+    def calculate_host_stats(self, host_id: int | None = None) -> dict:
+        table_object = self.get_table_object(table_name="trades")
+        filters = []
+        if host_id is not None:
+            filters.append(table_object.c.host_id == host_id)
+        closed = table_object.c.is_open.is_(False)
+        won = table_object.c.profit_abs >= 0
+        with self.session() as session:
+            result = session.execute(
+                select(
+                    table_object.c.host_id,
+                    table_object.c.quote_currency,
+                    func.count().filter(closed),
+                    func.count().filter(closed, won),
+                    func.coalesce(
+                        func.sum(table_object.c.profit_abs).filter(closed), 0.0
+                    ),
+                    func.coalesce(
+                        func.sum(table_object.c.profit_abs).filter(closed, won), 0.0
+                    ),
+                    func.coalesce(
+                        func.sum(table_object.c.profit_abs).filter(closed, ~won), 0.0
+                    ),
+                    func.count().filter(~closed),
+                    func.coalesce(
+                        func.sum(table_object.c.profit_abs).filter(~closed), 0.0
+                    ),
+                    func.min(table_object.c.close_timestamp).filter(closed),
+                )
+                .filter(*filters)
+                .group_by(table_object.c.host_id, table_object.c.quote_currency)
+            ).all()
+            all_stats: dict = {}
+            for row in result:
+                first_open_timestamp = None
+                if row[9] is not None:
+                    first_open_timestamp = session.scalar(
+                        select(table_object.c.open_timestamp)
+                        .filter_by(
+                            host_id=row[0],
+                            quote_currency=row[1],
+                            is_open=False,
+                            close_timestamp=row[9],
+                        )
+                        .limit(1)
+                    )
+                all_stats[(row[0], row[1])] = {
+                    "host_id": row[0],
+                    "quote_currency": row[1],
+                    "closed_trades": row[2],
+                    "winning_trades": row[3],
+                    "closed_profit": row[4],
+                    "gross_profit": row[5],
+                    "gross_loss": row[6],
+                    "open_trades": row[7],
+                    "open_profit": row[8],
+                    "first_close_timestamp": row[9],
+                    "first_open_timestamp": first_open_timestamp,
+                }
+        return all_stats
+
+    def rebuild_host_stats(self, host_id: int | None = None) -> list:
+        table_object = self.get_table_object(table_name="host_stats")
+        calculated = self.calculate_host_stats(host_id=host_id)
+        filters = []
+        if host_id is not None:
+            filters.append(table_object.c.host_id == host_id)
+        with self.write_session() as session:
+            stored = {
+                (stats.host_id, stats.quote_currency): stats._asdict()
+                for stats in session.execute(
+                    select(table_object).filter(*filters)
+                ).all()
+            }
+            mismatches = []
+            for key in sorted(set(stored) | set(calculated)):
+                expected = calculated.get(key, {})
+                actual = stored.get(key, {})
+                for column in [
+                    "closed_trades",
+                    "winning_trades",
+                    "closed_profit",
+                    "gross_profit",
+                    "gross_loss",
+                    "open_trades",
+                    "open_profit",
+                    "first_close_timestamp",
+                ]:
+                    expected_value = expected.get(column)
+                    actual_value = actual.get(column)
+                    if isinstance(expected_value, float) and actual_value is not None:
+                        if abs(expected_value - actual_value) < 1e-6:
+                            continue
+                    if expected_value != actual_value:
+                        mismatches.append(
+                            {
+                                "host_id": key[0],
+                                "quote_currency": key[1],
+                                "column": column,
+                                "stored": actual_value,
+                                "calculated": expected_value,
+                            }
+                        )
+            session.execute(delete(table_object).where(*filters))
+            for key, stats in calculated.items():
+                version = stored.get(key, {}).get("version", 0) + 1
+                closed_version = stored.get(key, {}).get("closed_version", 0) + 1
+                session.execute(
+                    insert(table_object),
+                    stats | {"version": version, "closed_version": closed_version},
+                )
+        for mismatch in mismatches:
+            log.warning(f"host_stats mismatch: {mismatch}")
+        log.info(f"host_stats rebuilt: {len(calculated)} rows")
+        return mismatches
+
+    def check_host_stats_loaded(self) -> None:
+        stats_table = self.get_table_object(table_name="host_stats")
+        trades_table = self.get_table_object(table_name="trades")
+        with self.session() as session:
+            stats = session.scalar(select(func.count()).select_from(stats_table))
+            trades = session.scalar(select(func.count()).select_from(trades_table))
+        if stats == 0 and trades is not None and trades > 0:
+            log.info("host_stats empty, building from trades")
+            self.rebuild_host_stats()
 
     def check_then_update_or_add_orders(self, data: dict, host_id: int, trade_id: int):
         table_object = self.get_table_object(table_name="orders")
         table_keys = table_object.columns.keys()
         for order in data:
             order = order | {"host_id": host_id, "trade_id": trade_id}
-            with Session(self.engine) as session:
+            with self.session() as session:
                 check = session.execute(
                     select(table_object)
                     .filter_by(
@@ -800,12 +2929,11 @@ class Database:
                 log.info(
                     f"Adding order to db. Host: {host_id} Trade: {trade_id} Order:{order['order_id']}"
                 )
-                with Session(self.engine) as session:
+                with self.write_session() as session:
                     session.execute(insert(table_object), adjusted_order)
-                    session.commit()
             else:
                 log.info(f"Order {order['order_id']} already in DB, updating")
-                with Session(self.engine) as session:
+                with self.write_session() as session:
                     filters = []
                     filters.append(table_object.c.host_id == host_id)
                     filters.append(table_object.c.trade_id == trade_id)
@@ -813,36 +2941,38 @@ class Database:
                     session.execute(
                         update(table_object).where(*filters).values(adjusted_order)
                     )
-                    session.commit()
 
-    def get_instance(self, instance_id: int) -> dict:
+    def instance_statement(self, instance_id: int):
         table_object = self.get_table_object(table_name="hosts")
-        instance_data: dict = {}
-        with Session(self.engine) as session:
-            account = session.execute(
-                select(table_object).filter_by(id=instance_id)
-            ).first()
-            if account:
-                instance_data = {
-                    "remote_host": account[1],
-                    "exchange": account[2],
-                    "strategy": account[3],
-                    "state": account[4],
-                    "stake_currency": account[5],
-                    "trading_mode": account[6],
-                    "run_mode": account[7],
-                    "ft_version": account[8],
-                    "strategy_version": account[9],
-                    "starting_capital": account[10],
-                    "added": account[11],
-                    "last_checked": account[12],
-                }
-        return instance_data
+        return select(table_object).filter_by(id=instance_id).limit(1)
+
+    def format_instance(self, accounts: list) -> dict:
+        if len(accounts) == 0:
+            return {}
+        account = accounts[0]
+        return {
+            "remote_host": account[1],
+            "exchange": account[2],
+            "strategy": account[3],
+            "state": account[4],
+            "stake_currency": account[5],
+            "trading_mode": account[6],
+            "run_mode": account[7],
+            "ft_version": account[8],
+            "strategy_version": account[9],
+            "starting_capital": account[10],
+            "added": account[11],
+            "last_checked": account[12],
+        }
+
+    def get_instance(self, instance_id: int) -> dict:
+        statement = self.instance_statement(instance_id=instance_id)
+        return self.format_instance(accounts=self.execute_read(statement))
 
     def delete_then_update_news(self, exchange: str, data: dict) -> None:
         table_object = self.get_table_object(table_name="news")
 
-        with Session(self.engine) as session:
+        with self.write_session() as session:
             check = session.scalars(
                 select(table_object).filter_by(exchange=exchange).limit(1)
             ).first()
@@ -856,61 +2986,193 @@ class Database:
                 for item in data:
                     item["exchange"] = exchange
                 session.execute(insert(table_object), data)
-            session.commit()
         log.info(f"News data updated for {exchange}: {len(data)}")
 
+    def news_filters(
+        self, start: int | None, end: int | None, exchange: str | None
+    ) -> list:
+        table_object = self.get_table_object(table_name="news")
+        filters = []
+        if start is not None:
+            filters.append(table_object.c.news_time >= start)
+        if end is not None:
+            filters.append(table_object.c.news_time < end)
+        if exchange is not None:
+            filters.append(table_object.c.exchange == exchange)
+        return filters
+
+    def count_news_statement(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        exchange: str | None = None,
+    ):
+        table_object = self.get_table_object(table_name="news")
+        return (
+            select(func.count())
+            .select_from(table_object)
+            .filter(*self.news_filters(start=start, end=end, exchange=exchange))
+        )
+
     def get_count_news_items(
         self,
         start: int | None = None,
         end: int | None = None,
         exchange: str | None = None,
     ) -> int:
+        statement = self.count_news_statement(start=start, end=end, exchange=exchange)
+        return self.execute_read(statement)[0][0]
+
+    def news_items_statement(
+        self, start: int | None, end: int | None, exchange: str | None
+    ):
         table_object = self.get_table_object(table_name="news")
-        with Session(self.engine) as session:
-            filters = []
-            if start is not None:
-                filters.append(table_object.c.news_time >= start)
-            if end is not None:
-                filters.append(table_object.c.news_time < end)
-            if exchange is not None:
-                filters.append(table_object.c.exchange == exchange)
-            count = session.scalar(
-                select(func.count()).select_from(table_object).filter(*filters)
-            )
-        if count is not None:
-            return count
-        return 0
+        return (
+            select(table_object)
+            .filter(*self.news_filters(start=start, end=end, exchange=exchange))
+            .order_by(table_object.c.news_time.desc())
+        )
+
+    def format_news_item(self, news_item) -> dict:
+        return {
+            "exchange": news_item[1],
+            "headline": news_item[2],
+            "category": news_item[3],
+            "hyperlink": news_item[4],
+            "timestamp": self.mins_since_timestamp(ts=news_item[5], utc=True),
+        }
 
     def get_news_items(
         self, start: int | None, end: int | None, exchange: str | None
     ) -> list:
+        statement = self.news_items_statement(start=start, end=end, exchange=exchange)
+        return [self.format_news_item(item) for item in self.execute_read(statement)]
+
+    def stream_news_items(
+        self,
+        start: int | None,
+        end: int | None,
+        exchange: str | None,
+        chunk_size: int = 1000,
+    ) -> Iterator[dict]:
+        statement = self.news_items_statement(start=start, end=end, exchange=exchange)
+        for news in self.stream_rows(statement, chunk_size=chunk_size):
+            for news_item in news:
+                yield self.format_news_item(news_item)
+
+    def search_news_statement(
+        self,
+        query: str,
+        exchange: str | None = None,
+        category: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ):
+        terms = [term for term in query.split() if len(term) > 0]
+        if len(terms) == 0:
+            return None
+        params: dict = {"limit": limit, "offset": offset}
+        filters = ""
+        if exchange is not None:
+            filters += " AND news.exchange = :exchange"
+            params["exchange"] = exchange
+        if category is not None:
+            filters += " AND news.category = :category"
+            params["category"] = category
+
+        if self.engine.dialect.name == "postgresql":
+            params["query"] = " ".join(terms)
+            statement = text(
+                "SELECT news.exchange, news.headline, news.category, news.hyperlink, "
+                "news.news_time, ts_rank(news.search_vector, query) AS rank "
+                "FROM news, websearch_to_tsquery('english', :query) AS query "
+                f"WHERE news.search_vector @@ query{filters} "
+                "ORDER BY rank DESC, news.news_time DESC LIMIT :limit OFFSET :offset"
+            )
+        else:
+            params["query"] = " ".join(
+                '"' + term.replace('"', '""') + '"*' for term in terms
+            )
+            statement = text(
+                "SELECT news.exchange, news.headline, news.category, news.hyperlink, "
+                "news.news_time, -bm25(news_search) AS rank "
+                "FROM news_search JOIN news ON news.id = news_search.rowid "
+                f"WHERE news_search MATCH :query{filters} "
+                "ORDER BY rank DESC, news.news_time DESC LIMIT :limit OFFSET :offset"
+            )
+        return statement.bindparams(**params)
+
+    def format_search_result(self, result) -> dict:
+        return {
+            "exchange": result[0],
+            "headline": result[1],
+            "category": result[2],
+            "hyperlink": result[3],
+            "timestamp": self.mins_since_timestamp(ts=result[4], utc=True),
+            "rank": round(result[5], 6),
+        }
+
+    def search_news(
+        self,
+        query: str,
+        exchange: str | None = None,
+        category: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list:
+        statement = self.search_news_statement(
+            query=query,
+            exchange=exchange,
+            category=category,
+            limit=limit,
+            offset=offset,
+        )
+        if statement is None:
+            return []
+        return [self.format_search_result(r) for r in self.execute_read(statement)]
+
+    def news_page_statement(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        exchange: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ):
         table_object = self.get_table_object(table_name="news")
-        all_news: list = []
-        with Session(self.engine) as session:
-            filters = []
-            if start is not None:
-                filters.append(table_object.c.news_time >= start)
-            if end is not None:
-                filters.append(table_object.c.news_time < end)
-            if exchange is not None:
-                filters.append(table_object.c.exchange == exchange)
-            news = session.execute(
-                select(table_object)
-                .filter(*filters)
-                .order_by(table_object.c.news_time.desc())
-            ).all()
-        if news is None:
-            return all_news
-        if len(news) == 0:
-            return all_news
-        for news_item in news:
-            all_news.append(
-                {
-                    "exchange": news_item[1],
-                    "headline": news_item[2],
-                    "category": news_item[3],
-                    "hyperlink": news_item[4],
-                    "timestamp": self.mins_since_timestamp(ts=news_item[5], utc=True),
-                }
+        filters = self.news_filters(start=start, end=end, exchange=exchange)
+        if cursor is not None:
+            news_time, news_id = decode_cursor(cursor)
+            filters.append(
+                tuple_(table_object.c.news_time, table_object.c.id)
+                < tuple_(news_time, news_id)
             )
-        return all_news
+        return (
+            select(table_object)
+            .filter(*filters)
+            .order_by(table_object.c.news_time.desc(), table_object.c.id.desc())
+            .limit(limit + 1)
+        )
+
+    def news_page(self, news: list, limit: int) -> dict:
+        next_cursor = None
+        if len(news) > limit:
+            news = news[:limit]
+            next_cursor = encode_cursor([news[-1][5], news[-1][0]])
+        return {
+            "items": [self.format_news_item(news_item) for news_item in news],
+            "next_cursor": next_cursor,
+        }
+
+    def get_news_page(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        exchange: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> dict:
+        statement = self.news_page_statement(
+            start=start, end=end, exchange=exchange, limit=limit, cursor=cursor
+        )
+        return self.news_page(news=self.execute_read(statement), limit=limit)
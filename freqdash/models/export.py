@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+from decimal import Decimal
+from enum import Enum
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from freqdash.models.database import Database
+
+log = logging.getLogger(__name__)
+
+arrow_types = {
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    bool: pa.bool_(),
+}
+
+
+class ExportTables(str, Enum):
+    TRADES = "trades"
+    ORDERS = "orders"
+
+
+class ExportFormats(str, Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+class StreamFormats(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+media_types = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class ChunkSink(io.RawIOBase):
+    # keeps the offsets the parquet footer needs while handing out the bytes
+    # written so far, so nothing but the current chunk stays in memory
+    def __init__(self) -> None:
+        self.chunks: list = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def export_schema(database: Database, table_name: str) -> pa.Schema:
+    table_object = database.get_table_object(table_name=table_name)
+    return pa.schema(
+        [
+            pa.field(column.name, arrow_types[column.type.python_type])
+            for column in table_object.columns
+        ]
+    )
+
+
+def stream_export(
+    database: Database,
+    table_name: str,
+    export_format: str = ExportFormats.PARQUET.value,
+    host_id: int | None = None,
+    start: int | None = None,
+    end: int | None = None,
+    pair: str | None = None,
+    chunk_size: int = 10000,
+) -> Iterator[bytes]:
+    schema = export_schema(database=database, table_name=table_name)
+    statement = database.export_statement(
+        table_name=table_name, host_id=host_id, start=start, end=end, pair=pair
+    )
+    sink = ChunkSink()
+    if export_format == ExportFormats.PARQUET.value:
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+    rows = 0
+    for chunk in database.stream_rows(statement, chunk_size=chunk_size):
+        columns = list(zip(*chunk))
+        batch = pa.RecordBatch.from_arrays(
+            [
+                pa.array(column, type=field.type)
+                for column, field in zip(columns, schema)
+            ],
+            schema=schema,
+        )
+        if export_format == ExportFormats.PARQUET.value:
+            writer.write_batch(batch, row_group_size=chunk_size)
+        else:
+            writer.write_batch(batch)
+        rows += len(chunk)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+    log.info(f"Exported {rows} {table_name} rows as {export_format}")
+
+
+def encode_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def stream_records(
+    records: Iterable[dict],
+    stream_format: str = StreamFormats.NDJSON.value,
+    batch_size: int = 500,
+) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = None
+    count = 0
+    for record in records:
+        if stream_format == StreamFormats.CSV.value:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(record))
+                writer.writeheader()
+            writer.writerow(record)
+        else:
+            buffer.write(json.dumps(record, default=encode_value) + "\n")
+        count += 1
+        # the first record goes out on its own to get the first byte out fast
+        if count == 1 or count % batch_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell() > 0:
+        yield buffer.getvalue().encode()
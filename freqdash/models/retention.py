@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from freqdash.core.config import Retention
+from freqdash.models.database import Database
+from freqdash.models.writer import DatabaseWriter
+
+log = logging.getLogger(__name__)
+
+day = 24 * 60 * 60 * 1000
+
+
+class RetentionPolicy:
+    def __init__(
+        self,
+        table_name: str,
+        column: str | None = None,
+        max_age_days: int | None = None,
+        max_rows_per_host: int | None = None,
+        downsample: Callable | None = None,
+    ) -> None:
+        self.table_name = table_name
+        self.column = column
+        self.max_age_days = max_age_days
+        self.max_rows_per_host = max_rows_per_host
+        self.downsample = downsample
+
+
+class RetentionJobs:
+    def __init__(
+        self,
+        database: Database,
+        writer: DatabaseWriter,
+        retention: Retention | None = None,
+    ) -> None:
+        self.database = database
+        self.writer = writer
+        self.retention = database.retention if retention is None else retention
+        self.last_report: dict = {}
+
+    def policies(self) -> list:
+        return [
+            # rollups keep the history, raw rows go once they are summarised
+            RetentionPolicy("sysinfo_series", downsample=self.compact_sysinfo),
+            RetentionPolicy(
+                "balance_snapshots", downsample=self.compact_balance_snapshots
+            ),
+            RetentionPolicy(
+                "logs",
+                column="timestamp",
+                max_age_days=self.retention.logs_days,
+                max_rows_per_host=self.retention.logs_max_rows,
+            ),
+            RetentionPolicy(
+                "open_trade_snapshots",
+                column="timestamp",
+                max_age_days=self.retention.open_trade_snapshot_days,
+            ),
+            RetentionPolicy(
+                "news", column="news_time", max_age_days=self.retention.news_days
+            ),
+            RetentionPolicy(
+                "prices", column="updated", max_age_days=self.retention.prices_days
+            ),
+        ]
+
+    def delete_batches(self, table_name: str, filters: list) -> int:
+        # every batch is its own writer job, so scraper writes queued in the
+        # meantime go in between instead of waiting for the whole table
+        removed = 0
+        while True:
+            batch = self.writer.submit(
+                self.database.delete_batch,
+                table_name=table_name,
+                filters=filters,
+                batch_size=self.retention.batch_size,
+            ).result()
+            removed += batch
+            if batch < self.retention.batch_size:
+                return removed
+
+    def compact_sysinfo(self, now: int) -> dict:
+        report = {}
+        for source, target, days in [
+            ("raw", "5m", self.retention.sysinfo_raw_days),
+            ("5m", "1h", self.retention.sysinfo_5m_days),
+        ]:
+            # one writer job per chunk, so a large backlog doesn't hold the
+            # writer for one big read and delete
+            report[source] = 0
+            while True:
+                rolled = self.writer.submit(
+                    self.database.rollup_sysinfo,
+                    source=source,
+                    target=target,
+                    cutoff=now - days * day,
+                    batch_size=self.retention.batch_size,
+                ).result()
+                report[source] += rolled
+                if rolled < self.retention.batch_size:
+                    break
+        report |= self.writer.submit(self.database.prune_sysinfo, now=now).result()
+        log.info(f"Sysinfo compacted, rows removed: {report}")
+        return report
+
+    def compact_balance_snapshots(self, now: int) -> int:
+        return self.writer.submit(
+            self.database.compact_balance_snapshots, now=now
+        ).result()
+
+    def reclaim_space(self, tables: list) -> int:
+        before = self.database.get_database_size()
+        if self.database.engine.dialect.name == "postgresql":
+            self.database.vacuum_tables(tables=tables)
+            return max(before - self.database.get_database_size(), 0)
+        mode = self.database.get_auto_vacuum()
+        if mode == 0 and self.retention.vacuum:
+            self.writer.submit(self.database.vacuum).result()
+        elif mode == 0:
+            log.warning(
+                "auto_vacuum is off for this database, so deleted rows don't "
+                "shrink the file. Set retention.vacuum to convert it once"
+            )
+        elif mode == 2:
+            # one writer job per batch, like the deletes, so ingestion
+            # gets the connection in between
+            while True:
+                freed = self.writer.submit(
+                    self.database.incremental_vacuum,
+                    pages=self.retention.batch_size,
+                ).result()
+                if freed < self.retention.batch_size:
+                    break
+        return max(before - self.database.get_database_size(), 0)
+
+    def apply(self, policy: RetentionPolicy, now: int) -> int:
+        removed = 0
+        if policy.downsample is not None:
+            result = policy.downsample(now=now)
+            removed += sum(result.values()) if isinstance(result, dict) else result
+        if policy.column is None:
+            return removed
+        table_object = self.database.get_table_object(table_name=policy.table_name)
+        column = table_object.c[policy.column]
+        if policy.max_age_days is not None:
+            cutoff = now - policy.max_age_days * day
+            removed += self.writer.submit(
+                self.database.drop_partitions,
+                table_name=policy.table_name,
+                cutoff=cutoff,
+            ).result()
+            removed += self.delete_batches(policy.table_name, [column < cutoff])
+        if policy.max_rows_per_host is not None:
+            cutoffs = self.database.get_rows_per_host_cutoffs(
+                table_name=policy.table_name,
+                column=policy.column,
+                max_rows=policy.max_rows_per_host,
+            )
+            for host_id, oldest_kept in cutoffs.items():
+                removed += self.delete_batches(
+                    policy.table_name,
+                    [table_object.c.host_id == host_id, column < oldest_kept],
+                )
+        return removed
+
+    def run(self, now: int | None = None) -> dict:
+        if now is None:
+            now = self.database.timestamp(dt=datetime.now(timezone.utc))
+        started = time.perf_counter()
+        self.database.create_partitions(now=now)
+        policies = self.policies()
+        report: dict = {"removed": {}}
+        for policy in policies:
+            try:
+                report["removed"][policy.table_name] = self.apply(policy, now)
+            except Exception as e:
+                log.error(f"Retention for {policy.table_name} failed: {e}")
+        report["reclaimed_bytes"] = self.reclaim_space(
+            tables=[policy.table_name for policy in policies]
+        )
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        self.last_report = report
+        log.info(f"Retention run: {report}")
+        return report
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import nullcontext
+from typing import Callable
+
+from freqdash.models.database import Database
+
+log = logging.getLogger(__name__)
+
+
+class DatabaseWriter:
+    def __init__(self, database: Database | None = None, maxsize: int = 64) -> None:
+        self.database = database
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.thread: threading.Thread | None = None
+        self.lock = threading.Lock()
+        self.stats = self.empty_stats()
+
+    def empty_stats(self) -> dict:
+        return {"jobs": 0, "failed": 0, "max_queued": 0}
+
+    def cycle_report(self) -> dict:
+        with self.lock:
+            report, self.stats = self.stats, self.empty_stats()
+        report["queued"] = self.queue.qsize()
+        return report
+
+    def get_status(self) -> dict:
+        with self.lock:
+            stats = dict(self.stats)
+        return stats | {
+            "running": self.thread is not None and self.thread.is_alive(),
+            "queued": self.queue.qsize(),
+            "maxsize": self.queue.maxsize,
+        }
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self.run, name="database-writer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def submit(self, function: Callable, *args, **kwargs) -> Future:
+        future: Future = Future()
+        if self.thread is None or threading.current_thread() is self.thread:
+            self.execute(future, function, args, kwargs)
+            return future
+        # blocks once the queue is full so scrapers can't outrun the database
+        self.queue.put((future, function, args, kwargs))
+        with self.lock:
+            self.stats["max_queued"] = max(self.stats["max_queued"], self.queue.qsize())
+        return future
+
+    def join(self) -> None:
+        self.queue.join()
+
+    def execute(self, future: Future, function: Callable, args, kwargs) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        # each job is one transaction, so reads inside it use the writer's
+        # connection instead of competing with request threads for the pool
+        transaction = nullcontext()
+        if self.database is not None:
+            transaction = self.database.transaction()
+        try:
+            with transaction:
+                result = function(*args, **kwargs)
+            future.set_result(result)
+        except Exception as e:
+            log.error(f"Database write {function.__name__} failed: {e}")
+            future.set_exception(e)
+            with self.lock:
+                self.stats["failed"] += 1
+        with self.lock:
+            self.stats["jobs"] += 1
+
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.execute(*item)
+            finally:
+                self.queue.task_done()
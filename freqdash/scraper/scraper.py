@@ -1,84 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import json
 import logging
+import threading
 
 import requests  # type: ignore
 import sshtunnel
 
 from freqdash.core.utils import send_public_request
 from freqdash.models.database import Database
+from freqdash.models.writer import DatabaseWriter
 
 log = logging.getLogger(__name__)
 
+fingerprint_sections = [
+    "host",
+    "starting_capital",
+    "balances",
+    "whitelist",
+    "blacklist",
+]
+
+
+def fingerprint(data) -> str:
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
 
 class Scraper:
-    def __init__(self, tunnels: list, database: Database) -> None:
+    def __init__(
+        self,
+        tunnels: list,
+        database: Database,
+        ingest_freqtrade_stats: bool = False,
+        writer: DatabaseWriter | None = None,
+    ) -> None:
         self.tunnels = tunnels
         self.database = database
+        self.ingest_freqtrade_stats = ingest_freqtrade_stats
+        self.writer = DatabaseWriter() if writer is None else writer
+        self.fingerprints: dict[tuple, str] = {}
+        self.host_ids: dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.stats = self.empty_stats()
+        self.last_report: dict = {}
 
     def scrape(self) -> None:
         self.scrape_cycle()
 
+    def empty_stats(self) -> dict:
+        return {
+            section: {"written": 0, "skipped": 0} for section in fingerprint_sections
+        }
+
+    def cycle_report(self) -> dict:
+        with self.lock:
+            report, self.stats = self.stats, self.empty_stats()
+        written = sum(section["written"] for section in report.values())
+        skipped = sum(section["skipped"] for section in report.values())
+        report["skip_rate"] = (
+            round(skipped / (written + skipped), 4) if written + skipped > 0 else 0.0
+        )
+        return report
+
+    def changed(self, host: str, section: str, data) -> str | None:
+        digest = fingerprint(data)
+        unchanged = self.fingerprints.get((host, section)) == digest
+        with self.lock:
+            self.stats[section]["skipped" if unchanged else "written"] += 1
+        return None if unchanged else digest
+
     def scrape_cycle(self) -> None:
         for tunnel in self.tunnels:
+            snapshot = None
             try:
                 tunnel.start()
                 tunnel.jwt = self.get_jwt_token(tunnel=tunnel)
-                config = self.get_config(tunnel=tunnel)
-                if config:
-                    log.info(f"Scraped {config['host']}")
-                    config["trading_mode"] = config["trading_mode"].upper()
-                    result = self.database.check_then_add_or_update_host(data=config)
-                    sysinfo = self.get_sysinfo(tunnel=tunnel)
-                    if sysinfo:
-                        data = {"host_id": result} | sysinfo
-                        self.database.add_sysinfo(data=data)
-                    last_open_trade_id = self.database.get_oldest_open_trade_id(
-                        host_id=result
-                    )
-                    last_open_trade_id //= 2
-                    log.info(f"last open trade id = {last_open_trade_id}")
-                    closed_trades = self.get_closed_trades(
-                        tunnel=tunnel, offset=last_open_trade_id
-                    )
-
-                    self.database.check_then_add_trades(
-                        data=closed_trades, host_id=result
-                    )
-                    open_trades = self.get_open_trades(tunnel=tunnel)
-                    self.database.check_then_add_trades(
-                        data=open_trades, host_id=result
-                    )
-
-                    health = self.get_health(tunnel=tunnel)
-                    self.database.add_last_process_ts(data=health, host_id=result)
-                    balance = self.get_balance(tunnel=tunnel)
-                    self.database.update_starting_capital(
-                        data=balance["starting_capital"], host_id=result
-                    )
-                    self.database.update_balances(
-                        data=balance["currencies"], host_id=result
-                    )
-
-                    logs = self.get_logs(tunnel=tunnel)
-                    self.database.update_logs(data=logs, host_id=result)
-                    locks = self.get_locks(tunnel=tunnel)
-                    log.info(locks)
-
-                    whitelist = self.get_whitelist(tunnel=tunnel)
-                    self.database.delete_then_add_baselist(
-                        data=whitelist, host_id=result
-                    )
-
-                    blacklist = self.get_blacklist(tunnel=tunnel)
-                    self.database.delete_then_add_baselist(
-                        data=blacklist, host_id=result, list_type="black"
-                    )
-
+                snapshot = self.scrape_host(tunnel=tunnel)
                 tunnel.jwt = None
                 tunnel.stop()
             except sshtunnel.BaseSSHTunnelForwarderError as e:
                 log.error(
                     f"SSH Tunnel for {tunnel.ssh_host}:{tunnel.ssh_port} unable to connect: {e}"
                 )
+            if snapshot is not None:
+                self.writer.submit(self.write_snapshot, snapshot)
+        self.last_report = self.cycle_report()
+        log.info(f"Host scrape cycle: {self.last_report}")
+
+    def scrape_host(self, tunnel) -> dict | None:
+        config = self.get_config(tunnel=tunnel)
+        if not config:
+            return None
+        log.info(f"Scraped {config['host']}")
+        config["trading_mode"] = config["trading_mode"].upper()
+        host = config["host"]
+        host_id = self.host_ids.get(host)
+        if host_id is None:
+            host_id = self.database.get_host_id(
+                host=host, remote_host=config["remote_host"]
+            )
+
+        balance = self.get_balance(tunnel=tunnel)
+        sections = {
+            "host": config,
+            "starting_capital": balance["starting_capital"],
+            "balances": balance["currencies"],
+            "whitelist": self.get_whitelist(tunnel=tunnel),
+            "blacklist": self.get_blacklist(tunnel=tunnel),
+        }
+        fingerprints = {}
+        for section, data in sections.items():
+            digest = self.changed(host=host, section=section, data=data)
+            if digest is not None or (section == "host" and host_id is None):
+                fingerprints[section] = digest or fingerprint(data)
+
+        sync = self.sync_trades(tunnel=tunnel, host_id=host_id)
+        log.info(f"Trades synced for {host}: {sync['report']}")
+        freqtrade_stats = None
+        if self.ingest_freqtrade_stats:
+            freqtrade_stats = {
+                "profit": self.get_profit(tunnel=tunnel),
+                "daily": self.get_daily(tunnel=tunnel),
+                "performance": self.get_performance(tunnel=tunnel),
+                "stats": self.get_stats(tunnel=tunnel),
+            }
+        since = 0
+        if host_id is not None:
+            since = self.database.get_last_log_timestamp(host_id=host_id)
+        log.info(self.get_locks(tunnel=tunnel))
+
+        snapshot = {
+            "host": host,
+            "host_id": host_id,
+            "sysinfo": self.get_sysinfo(tunnel=tunnel),
+            "trades": sync["trades"],
+            "trade_sync": sync["trade_sync"],
+            "last_process_ts": self.get_health(tunnel=tunnel),
+            "freqtrade_stats": freqtrade_stats,
+            "logs": self.get_logs(tunnel=tunnel, since=since),
+            "fingerprints": fingerprints,
+        }
+        for section, key in [
+            ("host", "config"),
+            ("starting_capital", "starting_capital"),
+            ("balances", "balances"),
+            ("whitelist", "whitelist"),
+            ("blacklist", "blacklist"),
+        ]:
+            snapshot[key] = sections[section] if section in fingerprints else None
+        return snapshot
+
+    def write_snapshot(self, snapshot: dict) -> int:
+        host_id = self.database.apply_host_snapshot(snapshot)
+        self.host_ids[snapshot["host"]] = host_id
+        for section, digest in snapshot.get("fingerprints", {}).items():
+            self.fingerprints[(snapshot["host"], section)] = digest
+        return host_id
 
     def get_jwt_token(self, tunnel) -> str:
         basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
@@ -127,7 +207,7 @@ class Scraper:
         data = {}
         if "cpu_pct" in [*json]:
             data = {
-                "cpu_pct": ",".join(str(each) for each in json["cpu_pct"]),
+                "cpu_pct": [float(each) for each in json["cpu_pct"]],
                 "ram_pct": json["ram_pct"],
             }
         return data
@@ -142,6 +222,98 @@ class Scraper:
         )
         return json["trades"]
 
+    def get_trades_page(self, tunnel, offset: int = 0, limit: int = 500) -> dict:
+        basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
+        headers, json = send_public_request(
+            url=basepath + "trades",
+            payload={"limit": limit, "offset": offset},
+            method="GET",
+            access_token=tunnel.jwt,
+        )
+        return json
+
+    def get_trade(self, tunnel, trade_id: int) -> dict:
+        basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
+        headers, json = send_public_request(
+            url=basepath + f"trade/{trade_id}",
+            method="GET",
+            access_token=tunnel.jwt,
+        )
+        if "trade_id" not in json:
+            return {}
+        return json
+
+    def sync_trades(self, tunnel, host_id: int | None, page_size: int = 500) -> dict:
+        state = self.database.get_trade_sync_state(host_id=host_id)
+        high_water_mark = state["max_closed_trade_id"]
+        max_closed_trade_id = high_water_mark
+        last_close_timestamp = state["last_close_timestamp"]
+        report = {"pages": 0, "closed": 0, "open": 0, "refetched": 0}
+
+        open_trades = self.get_open_trades(tunnel=tunnel)
+        collected = list(open_trades)
+        report["open"] = len(open_trades)
+
+        # the page starting at the last known closed trade must still begin with
+        # the high-water mark, otherwise trades were deleted on the bot and we
+        # step back until the anchor is found again
+        offset = max(state["closed_trade_count"] - 1, 0)
+        anchored = offset == 0
+        synced = set()
+        while True:
+            page = self.get_trades_page(tunnel=tunnel, offset=offset, limit=page_size)
+            report["pages"] += 1
+            trades = page.get("trades", [])
+            total = page.get("total_trades", offset + len(trades))
+            if not anchored:
+                if len(trades) == 0 or trades[0]["trade_id"] > high_water_mark:
+                    log.info(f"Trades removed on host {host_id}, stepping back")
+                    offset = max(offset - page_size, 0)
+                    anchored = offset == 0
+                    continue
+                anchored = True
+
+            new_trades = [
+                trade for trade in trades if trade["trade_id"] > max_closed_trade_id
+            ]
+            collected += new_trades
+            for trade in new_trades:
+                synced.add(trade["trade_id"])
+                max_closed_trade_id = max(max_closed_trade_id, trade["trade_id"])
+                if trade["close_timestamp"] is not None:
+                    last_close_timestamp = max(
+                        last_close_timestamp or 0, trade["close_timestamp"]
+                    )
+            report["closed"] += len(new_trades)
+            offset += len(trades)
+            if len(trades) < page_size or offset >= total:
+                break
+
+        still_open = {trade["trade_id"] for trade in open_trades} | synced
+        for trade_id in self.database.get_open_trade_ids(host_id=host_id):
+            if trade_id in still_open:
+                continue
+            trade = self.get_trade(tunnel=tunnel, trade_id=trade_id)
+            if len(trade) == 0:
+                log.warning(f"Trade {trade_id} not found on host {host_id}")
+                continue
+            collected.append(trade)
+            report["refetched"] += 1
+            if not trade["is_open"] and trade["close_timestamp"] is not None:
+                last_close_timestamp = max(
+                    last_close_timestamp or 0, trade["close_timestamp"]
+                )
+
+        return {
+            "trades": collected,
+            "trade_sync": {
+                "max_closed_trade_id": max_closed_trade_id,
+                "last_close_timestamp": last_close_timestamp,
+                "closed_trade_count": total,
+            },
+            "report": report,
+        }
+
     def get_open_trades(self, tunnel) -> list:
         basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
         headers, json = send_public_request(
@@ -160,14 +332,61 @@ class Scraper:
         )
         return json
 
-    def get_logs(self, tunnel):
+    def get_profit(self, tunnel) -> dict:
         basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
         headers, json = send_public_request(
-            url=basepath + "logs",
+            url=basepath + "profit",
             method="GET",
             access_token=tunnel.jwt,
         )
-        return json["logs"]
+        return json
+
+    def get_daily(self, tunnel, days: int = 30) -> dict:
+        basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
+        headers, json = send_public_request(
+            url=basepath + "daily",
+            payload={"timescale": days},
+            method="GET",
+            access_token=tunnel.jwt,
+        )
+        return json
+
+    def get_performance(self, tunnel) -> list:
+        basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
+        headers, json = send_public_request(
+            url=basepath + "performance",
+            method="GET",
+            access_token=tunnel.jwt,
+        )
+        if not isinstance(json, list):
+            return []
+        return json
+
+    def get_stats(self, tunnel) -> dict:
+        basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
+        headers, json = send_public_request(
+            url=basepath + "stats",
+            method="GET",
+            access_token=tunnel.jwt,
+        )
+        return json
+
+    def get_logs(
+        self, tunnel, since: int = 0, limit: int = 100, max_limit: int = 1000
+    ) -> list:
+        basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
+        while True:
+            headers, json = send_public_request(
+                url=basepath + "logs",
+                payload={"limit": limit},
+                method="GET",
+                access_token=tunnel.jwt,
+            )
+            logs = json["logs"]
+            if len(logs) < limit or limit >= max_limit or int(logs[0][1]) <= since:
+                break
+            limit = min(limit * 4, max_limit)
+        return [log_item for log_item in logs if int(log_item[1]) > since]
 
     def get_locks(self, tunnel):
         basepath = f"http://{tunnel.remote_host}:{tunnel.local_bind_port}/api/v1/"
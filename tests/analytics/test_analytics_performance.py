@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from freqdash.analytics.performance import (
+    calculate,
+    daily_returns,
+    expectancy,
+    max_drawdown,
+    rolling_metrics,
+    win_rate_by,
+)
+
+day = 24 * 60 * 60 * 1000
+
+
+def make_trades(profits: list, tags: list | None = None) -> dict:
+    size = len(profits)
+    close = np.arange(1, size + 1, dtype=np.int64) * day
+    return {
+        "open_timestamp": close - 60 * 60 * 1000,
+        "close_timestamp": close,
+        "profit_abs": np.asarray(profits, dtype=np.float64),
+        "stake_amount": np.full(size, 100.0),
+        "exit_reason": np.asarray(["roi"] * size, dtype=object),
+        "enter_tag": np.asarray(tags or [""] * size, dtype=object),
+    }
+
+
+class TestAnalyticsPerformance(unittest.TestCase):
+    def test_max_drawdown(self):
+        drawdown = max_drawdown(np.array([10.0, -5.0, -10.0, 20.0, -3.0]), 100.0)
+        assert drawdown["max_drawdown"] == 15.0
+        assert round(drawdown["max_drawdown_pct"], 4) == round(15 / 110 * 100, 4)
+        assert drawdown["index"] == 2
+        assert max_drawdown(np.array([1.0, 2.0]))["index"] is None
+        assert max_drawdown(np.array([-1.0, -2.0]))["max_drawdown"] == 3.0
+
+    def test_expectancy(self):
+        result = expectancy(np.array([3.0, -1.0, 1.0, -1.0]))
+        assert result["win_rate"] == 0.5
+        assert result["expectancy"] == 0.5 * 2.0 - 0.5 * 1.0
+        assert result["expectancy_ratio"] == 0.5
+        assert expectancy(np.array([1.0]))["expectancy_ratio"] is None
+
+    def test_win_rate_by(self):
+        result = win_rate_by(
+            np.array(["a", "b", "a", "a"], dtype=object), np.array([1.0, -1, -2, 3])
+        )
+        assert result["a"] == {"trades": 3, "win_rate": 2 / 3, "profit": 2.0}
+        assert result["b"] == {"trades": 1, "win_rate": 0.0, "profit": -1.0}
+
+    def test_daily_returns(self):
+        returns = daily_returns(
+            np.array([0, 1000, 2 * day], dtype=np.int64), np.array([5.0, 5, -11]), 100
+        )
+        assert returns.tolist() == [0.1, 0.0, -0.1]
+
+    def test_rolling_matches_loop(self):
+        profits = np.random.default_rng(1).normal(0.1, 1.0, 200)
+        window = 20
+        rolling = rolling_metrics(profits, window)
+        for end in [window, 57, 200]:
+            chunk = profits[end - window : end]
+            index = end - window
+            assert np.isclose(rolling["profit"][index], chunk.sum())
+            assert np.isclose(rolling["win_rate"][index], (chunk >= 0).mean())
+            assert np.isclose(
+                rolling["profit_factor"][index],
+                chunk[chunk >= 0].sum() / -chunk[chunk < 0].sum(),
+            )
+        assert rolling_metrics(profits[:5], window)["profit"].size == 0
+
+    def test_calculate(self):
+        result = calculate(
+            make_trades([2.0, -1.0, 4.0], ["a", "b", "a"]), starting_capital=100.0
+        )
+        assert result["trades"] == 3
+        assert result["profit"] == 5.0
+        assert result["max_drawdown"] == 1.0
+        assert result["max_drawdown_timestamp"] == 2 * day
+        assert result["avg_holding_minutes"] == 60.0
+        assert result["enter_tag"]["a"]["win_rate"] == 1.0
+        assert result["sharpe"] is not None
+        assert result["rolling"]["profit"] == []
+        empty = calculate(make_trades([]), starting_capital=None)
+        assert empty["trades"] == 0
+        assert empty["sharpe"] is None
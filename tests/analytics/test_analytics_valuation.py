@@ -0,0 +1,105 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from freqdash.analytics.valuation import FleetValuation, normalise_symbol, price_vector
+
+
+def balance(host_id, exchange, stake, currency, amount):
+    return SimpleNamespace(
+        host_id=host_id,
+        exchange=exchange,
+        stake_currency=stake,
+        currency=currency,
+        balance=amount,
+    )
+
+
+class TestAnalyticsValuation(unittest.TestCase):
+    def test_normalise_symbol(self):
+        assert normalise_symbol("btc_usdt") == "BTCUSDT"
+        assert normalise_symbol("BTC-USDT") == "BTCUSDT"
+
+    def test_price_vector(self):
+        prices = {"BTCUSDT": 20000.0, "USDTTRY": 20.0, "XYZBTC": 0.001}
+        vector = price_vector(prices, ["BTC", "TRY", "USDT", "XYZ", "ABC"])
+        assert vector[:4].tolist() == [20000.0, 0.05, 1.0, 20.0]
+        assert np.isnan(vector[4])
+
+    def test_refresh(self):
+        database = MagicMock()
+        database.get_all_balances.return_value = [
+            balance(1, "binance", "USDT", "USDT", 100.0),
+            balance(1, "binance", "USDT", "BTC", 0.01),
+            balance(1, "binance", "USDT", "ABC", 5.0),
+            balance(2, "okx", "BTC", "BTC", 0.02),
+            balance(2, "okx", "BTC", "ETH", 1.0),
+        ]
+        database.get_all_prices.return_value = [
+            ("binance", "BTCUSDT", 20000.0),
+            ("okx", "BTC-USDT", 21000.0),
+            ("okx", "ETH-USDT", 1500.0),
+        ]
+        valuation = FleetValuation(database=database)
+        snapshot = valuation.get()
+        assert snapshot["hosts"][1]["value"] == 300.0
+        assert snapshot["hosts"][1]["stake_value"] == 300.0
+        assert snapshot["hosts"][1]["unpriced"] == ["ABC"]
+        assert snapshot["hosts"][2]["value"] == 420.0 + 1500.0
+        assert snapshot["hosts"][2]["stake_value"] == round(1920.0 / 21000.0, 8)
+        assert snapshot["hosts"][2]["currencies"]["ETH"] == {
+            "amount": 1.0,
+            "value": 1500.0,
+        }
+        assert snapshot["total"] == 2220.0
+        assert snapshot["totals"]["USDT"] == 2220.0
+        assert snapshot["totals"]["BTC"] == round(2220.0 / 20500.0, 8)
+        assert snapshot["currencies"]["BTC"]["amount"] == 0.03
+        assert valuation.get(host_id=2) is snapshot["hosts"][2]
+        assert valuation.get(host_id=3) == {"error": "instance not found"}
+        assert database.get_all_balances.call_count == 1
+
+    def test_refresh_empty(self):
+        database = MagicMock()
+        database.get_all_balances.return_value = []
+        database.get_all_prices.return_value = []
+        snapshot = FleetValuation(database=database).refresh()
+        assert snapshot["total"] == 0.0
+        assert snapshot["hosts"] == {}
+        database.get_all_prices.assert_not_called()
+
+    def test_refresh_futures_prices(self):
+        database = MagicMock()
+        database.get_all_balances.return_value = [
+            balance(1, "binance", "USDT", "BTC", 0.01),
+            balance(2, "bybit", "USDT", "USDT", 50.0),
+            balance(2, "bybit", "USDT", "ETH", 1.0),
+        ]
+        prices = {
+            "SPOT": [("binance", "BTCUSDT", 20000.0)],
+            "FUTURES": [
+                ("binance", "BTCUSDT", 20100.0),
+                ("bybit", "ETHUSDT", 1500.0),
+            ],
+        }
+        database.get_all_prices.side_effect = lambda trading_mode: prices[trading_mode]
+        snapshot = FleetValuation(database=database).refresh()
+        assert snapshot["hosts"][1]["value"] == 200.0
+        assert snapshot["hosts"][2]["value"] == 1550.0
+        assert snapshot["hosts"][2]["stake_value"] == 1550.0
+        assert snapshot["hosts"][2]["unpriced"] == []
+
+    def test_refresh_without_stake_currency(self):
+        database = MagicMock()
+        database.get_all_balances.return_value = [
+            balance(1, "binance", None, "BTC", 0.01),
+            balance(2, "binance", "USDT", "USDT", 10.0),
+        ]
+        database.get_all_prices.return_value = [("binance", "BTCUSDT", 20000.0)]
+        snapshot = FleetValuation(database=database).refresh()
+        assert snapshot["hosts"][1]["value"] == 200.0
+        assert snapshot["hosts"][1]["stake_value"] is None
+        assert snapshot["hosts"][2]["stake_value"] == 10.0
+        assert snapshot["totals"] == {"USDT": 210.0}
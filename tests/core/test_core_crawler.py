@@ -0,0 +1,156 @@
+import threading
+import time
+import unittest
+
+import responses
+
+from freqdash.core.crawler import Crawler, DomainLimiter
+
+
+class TestCoreCrawler(unittest.TestCase):
+    def test_map_keeps_order(self):
+        crawler = Crawler(max_workers=4)
+        assert crawler.map(lambda x: x * 2, [1, 2, 3, 4, 5]) == [2, 4, 6, 8, 10]
+        assert crawler.map(lambda x: x * 2, [3]) == [6]
+        assert crawler.map(lambda x: x * 2, []) == []
+
+    def test_map_runs_in_parallel(self):
+        crawler = Crawler(max_workers=4)
+        start = time.monotonic()
+        crawler.map(lambda x: time.sleep(0.2), range(4))
+        assert time.monotonic() - start < 0.6
+
+    def test_limiter_per_domain(self):
+        crawler = Crawler()
+        limiter = crawler.get_limiter("https://www.okx.com/support")
+        assert crawler.get_limiter("https://www.okx.com/other") is limiter
+        assert crawler.get_limiter("https://api.bybit.com") is not limiter
+
+    def test_limiter_concurrency_cap(self):
+        limiter = DomainLimiter(max_concurrency=2, min_interval=0)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def work():
+            with limiter:
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert peak[0] == 2
+
+    def test_limiter_min_interval(self):
+        limiter = DomainLimiter(max_concurrency=4, min_interval=0.1)
+        start = time.monotonic()
+        for _ in range(3):
+            with limiter:
+                pass
+        assert time.monotonic() - start >= 0.2
+
+    @responses.activate
+    def test_fetch(self):
+        responses.get(
+            url="http://api.freqdash.com/test?limit=5",
+            body="<html></html>",
+            status=200,
+        )
+        crawler = Crawler(min_interval=0)
+        header, text = crawler.fetch(
+            url="http://api.freqdash.com/",
+            url_path="test",
+            payload={"limit": 5},
+            json=False,
+        )
+        assert text == "<html></html>"
+
+    @responses.activate
+    def test_fetch_parsed_not_modified(self):
+        responses.get(
+            url="http://api.freqdash.com/news",
+            body="<html>news</html>",
+            status=200,
+            headers={"ETag": '"abc"'},
+        )
+        responses.get(url="http://api.freqdash.com/news", status=304)
+        crawler = Crawler(min_interval=0)
+        calls = []
+
+        def parse(text):
+            calls.append(text)
+            return [text]
+
+        first = crawler.fetch_parsed(
+            url="http://api.freqdash.com/", url_path="news", parse=parse
+        )
+        second = crawler.fetch_parsed(
+            url="http://api.freqdash.com/", url_path="news", parse=parse
+        )
+        assert first == second == ["<html>news</html>"]
+        assert calls == ["<html>news</html>"]
+        assert responses.calls[1].request.headers["If-None-Match"] == '"abc"'
+        report = crawler.cycle_report()
+        assert report["requests"] == 2
+        assert report["parsed"] == 1
+        assert report["not_modified"] == 1
+        assert report["bytes_saved"] == len("<html>news</html>")
+        assert crawler.cycle_report()["requests"] == 0
+
+    @responses.activate
+    def test_fetch_parsed_unchanged_hash(self):
+        responses.get(
+            url="http://api.freqdash.com/news",
+            body="<html>news</html>",
+            status=200,
+            headers={"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+        )
+        crawler = Crawler(min_interval=0)
+        calls = []
+
+        def parse(text):
+            calls.append(text)
+            return len(text)
+
+        for _ in range(3):
+            assert (
+                crawler.fetch_parsed(
+                    url="http://api.freqdash.com/", url_path="news", parse=parse
+                )
+                == 17
+            )
+        assert len(calls) == 1
+        assert (
+            responses.calls[1].request.headers["If-Modified-Since"]
+            == "Wed, 21 Oct 2015 07:28:00 GMT"
+        )
+        report = crawler.cycle_report()
+        assert report["unchanged"] == 2
+        assert report["bytes_saved"] == 0
+
+    @responses.activate
+    def test_fetch_parsed_validators_bounded(self):
+        for page in range(3):
+            responses.get(
+                url=f"http://api.freqdash.com/news?page={page}",
+                body=f"<html>{page}</html>",
+                status=200,
+                headers={"ETag": f'"{page}"'},
+            )
+        crawler = Crawler(min_interval=0, max_validators=2)
+        # the refetch of page 0 keeps it over page 1
+        for page in [0, 1, 0, 2]:
+            crawler.fetch_parsed(
+                url="http://api.freqdash.com/",
+                url_path="news",
+                payload={"page": page},
+                parse=len,
+            )
+        assert len(crawler.validators) == 2
+        assert [key[-1] for key in crawler.validators] == ["0", "2"]
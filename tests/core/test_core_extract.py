@@ -0,0 +1,88 @@
+import unittest
+from pathlib import Path
+
+from freqdash.core.extract import Extractor
+from freqdash.core.utils import find_all_occurrences_in_string, find_in_string
+
+fixtures = Path(Path(__file__).parent.parent, "fixtures", "news")
+
+
+class TestCoreExtract(unittest.TestCase):
+    def test_between_matches_find_in_string(self):
+        for page in fixtures.glob("*.html"):
+            text = page.read_text()
+            for start, end in [
+                ("<title>", "</title>"),
+                ('<script id="__APP_DATA" type="application/json">', "</script>"),
+                ('href="', '"'),
+                ("<h1", None),
+                ("missing", "</title>"),
+                ("<title>", "missing"),
+            ]:
+                expected = find_in_string(
+                    string=text, start_substring=start, end_substring=end
+                )
+                assert Extractor(text).between(start, end) == expected
+                assert Extractor(text.encode()).between(start, end) == expected
+
+    def test_all_between_matches_find_all_occurrences(self):
+        text = Path(fixtures, "okx.html").read_text()
+        expected = find_all_occurrences_in_string(
+            string=text,
+            start_substring='<section class="section">',
+            end_substring="</section>",
+        )
+        assert len(expected) == 4
+        extractor = Extractor(memoryview(text.encode()))
+        assert (
+            extractor.all_between('<section class="section">', "</section>") == expected
+        )
+
+    def test_bounded_search(self):
+        extractor = Extractor("<a>1</a><b><a>2</a></b>")
+        span = extractor.span("<b>", "</b>")
+        assert extractor.between("<a>", "</a>", start=span[0], end=span[1]) == "2"
+        assert extractor.between("<c>", start=span[0], end=span[1]) == ""
+        assert extractor.spans("<a>", "</a>", start=span[0], end=span[1]) == [(14, 15)]
+
+    def test_json_path(self):
+        text = Path(fixtures, "binance.html").read_text()
+        expected = find_in_string(
+            string=text,
+            start_substring='<script id="__APP_DATA" type="application/json">',
+            end_substring="</script>",
+            return_json=True,
+        )["routeProps"]["ce50"]["catalogs"]
+        for data in [text, text.encode()]:
+            assert (
+                Extractor(data).json_path(
+                    path=["routeProps", "ce50", "catalogs"],
+                    start_substring='<script id="__APP_DATA" type="application/json">',
+                    end_substring="</script>",
+                )
+                == expected
+            )
+
+    def test_json_path_missing(self):
+        extractor = Extractor('<script>{"a": {"b": 1}}</script>')
+        assert extractor.json_path(["a", "c"], "<script>", "</script>") is None
+        assert extractor.json_path(["a"], "<style>", "</style>") is None
+        assert extractor.json_path(["a", "b"], "<script>", "</script>") == 1
+
+    def test_json_path_fallback(self):
+        extractor = Extractor('<script>{"a": {"b": [1, 2}, "c": 3}</script>')
+        assert extractor.json_path(["a", "b"], "<script>", "</script>") is None
+
+    def test_json_path_scoped(self):
+        text = (
+            '<script>{"routeProps": {"other": 1}, '
+            '"zzz": {"ce50": {"catalogs": ["WRONG"]}}}</script>'
+        )
+        for data in [text, text.encode()]:
+            extractor = Extractor(data)
+            path = ["routeProps", "ce50", "catalogs"]
+            assert extractor.json_path(path, "<script>", "</script>") is None
+        extractor = Extractor(
+            '<script>{"a": {"x": "}{\\"b\\": 2", "c": {"b": 3}, "b": [1]}}</script>'
+        )
+        assert extractor.json_path(["a", "b"], "<script>", "</script>") == [1]
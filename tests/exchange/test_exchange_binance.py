@@ -1,5 +1,6 @@
 import unittest
 from decimal import Decimal
+from pathlib import Path
 
 import requests  # type: ignore
 import responses
@@ -7,6 +8,8 @@ import responses
 from freqdash.exchange.binance import Binance
 from freqdash.exchange.utils import Intervals
 
+fixtures = Path(Path(__file__).parent.parent, "fixtures", "news")
+
 
 class TestBinanceExchange(unittest.TestCase):
     def test_attributes(self):
@@ -273,6 +276,20 @@ class TestBinanceExchange(unittest.TestCase):
         assert futures_kline == []
         assert binance.weight == 10
 
+    def test_parse_news(self):
+        binance = Binance()
+        raw_text = Path(fixtures, "binance.html").read_text()
+        news = binance.parse_news(raw_text=raw_text)
+        assert len(news) == 3
+        assert news[0] == {
+            "headline": "Binance Will List Arbitrum (ARB)",
+            "category": "New crypto",
+            "hyperlink": f"{binance.news_url}5b6e1f2c",
+            "news_time": 1679587200000,
+        }
+        assert news[2]["category"] == "Delisting"
+        assert binance.parse_news(raw_text="") == []
+
 
 if __name__ == "__main__":
     unittest.main()
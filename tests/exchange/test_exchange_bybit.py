@@ -1,5 +1,6 @@
 import unittest
 from decimal import Decimal
+from pathlib import Path
 
 import requests  # type: ignore
 import responses
@@ -7,6 +8,8 @@ import responses
 from freqdash.exchange.bybit import Bybit
 from freqdash.exchange.utils import Intervals
 
+fixtures = Path(Path(__file__).parent.parent, "fixtures", "news")
+
 
 class TestBybitExchange(unittest.TestCase):
     def test_attributes(self):
@@ -291,6 +294,47 @@ class TestBybitExchange(unittest.TestCase):
         )
         assert futures_kline == []
 
+    @responses.activate
+    def test_get_news(self):
+        bybit = Bybit()
+        for category in bybit.news_categories:
+            responses.get(
+                url=f"{bybit.news_url}?category={category}&page=1",
+                body='<script id="__NEXT_DATA__" type="application/json">{"props":{"pageProps":{"articleInitEntity":{"list":[{"title":"'
+                + category
+                + '","date_timestamp":1672314240,"url":"article/'
+                + category
+                + '"}]}}}}</script>',
+                status=200,
+            )
+        news = bybit.get_news()
+        assert [item["headline"] for item in news] == [*bybit.news_categories]
+        assert news[0] == {
+            "headline": "new_crypto",
+            "category": "New crypto",
+            "hyperlink": f"{bybit.news_url}article/new_crypto",
+            "news_time": 1672314240000,
+        }
+
+    def test_parse_category_news(self):
+        bybit = Bybit()
+        raw_text = Path(fixtures, "bybit.html").read_text()
+        news = bybit.parse_category_news(category="delistings", raw_text=raw_text)
+        assert news == [
+            {
+                "headline": "New Listing: ARB/USDT",
+                "category": "Delisting",
+                "hyperlink": f"{bybit.news_url}article/new-listing-arb-usdt-blt1a2b3c",
+                "news_time": 1679590800000,
+            },
+            {
+                "headline": "Bybit to Delist SRM/USDT",
+                "category": "Delisting",
+                "hyperlink": f"{bybit.news_url}article/bybit-to-delist-srm-usdt-blt4d5e6f",
+                "news_time": 1679504400000,
+            },
+        ]
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from decimal import Decimal
+from pathlib import Path
 from unittest.mock import patch
 
 import requests  # type: ignore
@@ -8,6 +9,8 @@ import responses
 from freqdash.exchange.okx import Okx
 from freqdash.exchange.utils import Intervals
 
+fixtures = Path(Path(__file__).parent.parent, "fixtures", "news")
+
 
 class TestBybitExchange(unittest.TestCase):
     def test_attributes(self):
@@ -285,6 +288,33 @@ class TestBybitExchange(unittest.TestCase):
         futures_instance_ids = okx.get_instance_ids(base="BTC", quote="USDT")
         assert futures_instance_ids == []
 
+    def test_parse_news_pages(self):
+        okx = Okx()
+        sections = okx.parse_sections(raw_text=Path(fixtures, "okx.html").read_text())
+        assert sections == [
+            ("New-Token", "/hc/en-us/sections/360000030652-New-Token"),
+            (
+                "Latest-Announcements",
+                "/hc/en-us/sections/115000447632-Latest-Announcements",
+            ),
+            ("API", "/hc/en-us/sections/115000275131-API"),
+        ]
+        articles = okx.parse_section(
+            raw_text=Path(fixtures, "okx_section.html").read_text()
+        )
+        assert articles == [
+            "/hc/en-us/articles/12975216390413-OKX-will-list-ARB",
+            "/hc/en-us/articles/12922047462925-OKX-to-delist-SRM",
+        ]
+        article = okx.parse_article(
+            section_name="New-Token",
+            article_link=articles[0],
+            raw_text=Path(fixtures, "okx_article.html").read_text(),
+        )
+        assert article["headline"] == "OKX will list ARB"
+        assert article["category"] == "New crypto"
+        assert article["hyperlink"] == f"{okx.news_url}{articles[0]}"
+
 
 if __name__ == "__main__":
     unittest.main()
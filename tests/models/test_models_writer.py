@@ -0,0 +1,66 @@
+import threading
+import unittest
+
+from freqdash.models.writer import DatabaseWriter
+
+
+class TestModelsWriter(unittest.TestCase):
+    def test_submit_without_thread_runs_inline(self):
+        writer = DatabaseWriter()
+        future = writer.submit(lambda x: x * 2, 21)
+        assert future.done()
+        assert future.result() == 42
+
+    def test_single_writer_thread(self):
+        writer = DatabaseWriter(maxsize=4)
+        writer.start()
+        threads = set()
+        futures = [
+            writer.submit(lambda i: threads.add(threading.get_ident()) or i, i)
+            for i in range(20)
+        ]
+        assert [future.result(timeout=5) for future in futures] == list(range(20))
+        assert threads == {writer.thread.ident}
+        writer.stop()
+        assert writer.thread is None
+        assert writer.get_status()["running"] is False
+
+    def test_failed_job_keeps_writer_running(self):
+        writer = DatabaseWriter()
+        writer.start()
+
+        def fail():
+            raise ValueError("database is locked")
+
+        failed = writer.submit(fail)
+        assert isinstance(failed.exception(timeout=5), ValueError)
+        assert writer.submit(lambda: "ok").result(timeout=5) == "ok"
+        writer.join()
+        status = writer.get_status()
+        assert status["running"] is True
+        assert status["jobs"] == 2
+        report = writer.cycle_report()
+        assert report["jobs"] == 2
+        assert report["failed"] == 1
+        assert report["queued"] == 0
+        writer.stop()
+
+    def test_bounded_queue_blocks(self):
+        writer = DatabaseWriter(maxsize=1)
+        writer.start()
+        release = threading.Event()
+        writer.submit(release.wait)
+        writer.submit(lambda: None)
+        submitted = threading.Event()
+
+        def submit():
+            writer.submit(lambda: None)
+            submitted.set()
+
+        thread = threading.Thread(target=submit)
+        thread.start()
+        assert not submitted.wait(timeout=0.2)
+        release.set()
+        assert submitted.wait(timeout=5)
+        thread.join()
+        writer.stop()
@@ -1,16 +1,95 @@
+import asyncio
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+import threading
+import time
 import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 import requests  # type: ignore
+from freezegun import freeze_time
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    exc,
+    insert,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
 
+from freqdash.analytics.performance import PerformanceAnalytics
 from freqdash.connection.tunnel import Tunnel
 from freqdash.core.config import Database as DBConfig
-from freqdash.core.config import RemoteFreqtradeAPI
-from freqdash.models.database import Database
+from freqdash.core.config import RemoteFreqtradeAPI, Retention
+from freqdash.models.async_database import AsyncDatabase
+from freqdash.models.database import (
+    Database,
+    MeteredQueuePool,
+    month_ranges,
+    partition_args,
+    pool_status,
+    sqlite_pragmas,
+)
+from freqdash.models.export import stream_export, stream_records
+from freqdash.models.retention import RetentionJobs, RetentionPolicy
+from freqdash.models.writer import DatabaseWriter
 from freqdash.scraper.scraper import Scraper
 
 
+def make_trade(
+    trade_id: int,
+    close_timestamp: int | None,
+    profit_abs: float,
+    pair: str = "SUSHI/USDT",
+    open_timestamp: int = 1670329806846,
+    **kwargs,
+) -> dict:
+    base_currency, quote_currency = pair.split("/")
+    return {
+        "trade_id": trade_id,
+        "pair": pair,
+        "base_currency": base_currency,
+        "quote_currency": quote_currency,
+        "exchange": "binance",
+        "is_open": close_timestamp is None,
+        "amount": 10.0,
+        "stake_amount": 12.86,
+        "profit_abs": profit_abs,
+        "enter_tag": "force_entry",
+        "fee_open_cost": 0.01286,
+        "fee_open_currency": quote_currency,
+        "fee_close_cost": None if close_timestamp is None else 0.013,
+        "fee_close_currency": None if close_timestamp is None else quote_currency,
+        "open_timestamp": open_timestamp,
+        "open_rate": 1.286,
+        "close_timestamp": close_timestamp,
+        "close_rate": None if close_timestamp is None else 1.3,
+        "exit_reason": None if close_timestamp is None else "roi",
+        "stop_loss_abs": 1.2,
+        "leverage": 1.0,
+        "is_short": False,
+        "trading_mode": "spot",
+        "funding_fees": 0.0,
+        "orders": [],
+    } | kwargs
+
+
 class TestDatabaseAndScraper(unittest.TestCase):
     db = DBConfig(
         engine="sqlite", username="", password="", host="127.0.0.1", port=5432, name=""
@@ -117,7 +196,7 @@ class TestDatabaseAndScraper(unittest.TestCase):
         send_post.return_value = ["header", {"cpu_pct": [5, 6], "ram_pct": 5}]
         sysinfo = self.scraper.get_sysinfo(tunnel=self.scraper.tunnels[0])
         assert sysinfo == {
-            "cpu_pct": "5,6",
+            "cpu_pct": [5.0, 6.0],
             "ram_pct": 5,
         }
         data = {"host_id": result} | sysinfo
@@ -1039,6 +1118,7 @@ class TestDatabaseAndScraper(unittest.TestCase):
                     "closed_trades": 1,
                     "winning_trades": 1,
                     "losing_trades": 0,
+                    "draw_trades": None,
                     "closed_profit": 0.31,
                     "total_profit_percentage": 0.05,
                     "days_from_first_trade": 105,
@@ -1113,6 +1193,1258 @@ class TestDatabaseAndScraper(unittest.TestCase):
             ],
         }
 
+    def test_search_news(self):
+        self.database.delete_then_update_news(
+            exchange="okx",
+            data=[
+                {
+                    "headline": "OKX will list Arbitrum (ARB)",
+                    "category": "New crypto",
+                    "hyperlink": "https://www.okx.com/support/1",
+                    "news_time": 1679587200000,
+                },
+                {
+                    "headline": "OKX will delist SRM",
+                    "category": "Delisting",
+                    "hyperlink": "https://www.okx.com/support/2",
+                    "news_time": 1679500800000,
+                },
+                {
+                    "headline": "Listing fees update for listing partners",
+                    "category": "Latest news",
+                    "hyperlink": "https://www.okx.com/support/3",
+                    "news_time": 1679414400000,
+                },
+            ],
+        )
+        results = self.database.search_news(query="listing", exchange="okx")
+        assert [result["hyperlink"][-1] for result in results] == ["3", "1"]
+        assert results[0]["rank"] >= results[1]["rank"]
+        assert (
+            self.database.search_news(query="arb", exchange="okx")[0]["headline"]
+            == "OKX will list Arbitrum (ARB)"
+        )
+        assert (
+            len(
+                self.database.search_news(
+                    query="listing", exchange="okx", category="Delisting"
+                )
+            )
+            == 0
+        )
+        assert len(self.database.search_news(query="listing", limit=1)) == 1
+        assert len(self.database.search_news(query="listing", offset=1)) == 1
+        assert self.database.search_news(query="   ") == []
+        assert self.database.search_news(query='"unbalanced') == []
+
+        self.database.delete_then_update_news(exchange="okx", data=[])
+        assert self.database.search_news(query="listing", exchange="okx") == []
+
+    def test_trades_page(self):
+        host_id = 90
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=1, close_timestamp=1670334197000, profit_abs=1.0),
+                make_trade(trade_id=2, close_timestamp=1670334198000, profit_abs=2.0),
+                make_trade(trade_id=3, close_timestamp=1670334198000, profit_abs=3.0),
+                make_trade(trade_id=4, close_timestamp=None, profit_abs=4.0),
+                make_trade(trade_id=5, close_timestamp=1670334199000, profit_abs=5.0),
+            ],
+            host_id=host_id,
+        )
+        assert len(self.database.get_trades(host_id=host_id, is_open=False)) == 4
+        latest = self.database.get_trades(
+            host_id=host_id, is_open=False, limit=2, sort=True, order="desc"
+        )
+        assert [trade[1] for trade in latest] == [5, 3]
+
+        seen = []
+        cursor = None
+        while True:
+            page = self.database.get_trades_page(
+                host_id=host_id, limit=2, cursor=cursor
+            )
+            seen += [trade["trade_id"] for trade in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [5, 3, 2, 1]
+        assert (
+            self.database.get_trades_page(host_id=host_id, limit=4)["next_cursor"]
+            is None
+        )
+        with self.assertRaises(ValueError):
+            self.database.get_trades_page(host_id=host_id, cursor="not-a-cursor")
+
+    def test_news_page(self):
+        self.database.delete_then_update_news(
+            exchange="gateio",
+            data=[
+                {
+                    "headline": f"Gate.io news {i}",
+                    "category": "Latest news",
+                    "hyperlink": f"https://www.gate.io/article/{i}",
+                    "news_time": 1679414400000 + (i // 2) * 1000,
+                }
+                for i in range(7)
+            ],
+        )
+        seen = []
+        cursor = None
+        while True:
+            page = self.database.get_news_page(
+                exchange="gateio", limit=3, cursor=cursor
+            )
+            seen += [item["headline"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [f"Gate.io news {i}" for i in [6, 5, 4, 3, 2, 1, 0]]
+        page = self.database.get_news_page(
+            exchange="gateio", start=1679414401000, limit=10
+        )
+        assert len(page["items"]) == 5
+        assert page["next_cursor"] is None
+        self.database.delete_then_update_news(exchange="gateio", data=[])
+
+    def test_host_stats(self):
+        host_id = 91
+        version = self.database.get_ingest_version(host_id=host_id)
+        assert version == 0
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=1, close_timestamp=1670334197000, profit_abs=3.0),
+                make_trade(trade_id=2, close_timestamp=1670334198000, profit_abs=-1.0),
+                make_trade(trade_id=3, close_timestamp=None, profit_abs=-0.5),
+                make_trade(
+                    trade_id=4,
+                    close_timestamp=1670334199000,
+                    profit_abs=1.0,
+                    pair="ETH/BTC",
+                ),
+            ],
+            host_id=host_id,
+        )
+        stats = self.database.get_host_stats(host_id=host_id)
+        assert set(stats) == {"USDT", "BTC"}
+        assert stats["USDT"]["closed_trades"] == 2
+        assert stats["USDT"]["winning_trades"] == 1
+        assert stats["USDT"]["closed_profit"] == 2.0
+        assert stats["USDT"]["gross_loss"] == -1.0
+        assert stats["USDT"]["open_trades"] == 1
+        assert stats["USDT"]["open_profit"] == -0.5
+        assert stats["USDT"]["first_close_timestamp"] == 1670334197000
+        assert self.database.get_ingest_version(host_id=host_id) > version
+        closed_version = self.database.get_closed_trades_version(host_id=host_id)
+        assert closed_version > 0
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=1, close_timestamp=1670334197000, profit_abs=3.0),
+                make_trade(trade_id=3, close_timestamp=None, profit_abs=-0.6),
+            ],
+            host_id=host_id,
+        )
+        assert (
+            self.database.get_closed_trades_version(host_id=host_id) == closed_version
+        )
+
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=3, close_timestamp=None, profit_abs=-0.7),
+                make_trade(trade_id=2, close_timestamp=1670334198000, profit_abs=-2.0),
+            ],
+            host_id=host_id,
+        )
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=3, close_timestamp=1670334100000, profit_abs=0.5)
+            ],
+            host_id=host_id,
+        )
+        stats = self.database.get_host_stats(host_id=host_id)["USDT"]
+        assert stats["closed_trades"] == 3
+        assert stats["winning_trades"] == 2
+        assert stats["closed_profit"] == 1.5
+        assert stats["gross_profit"] == 3.5
+        assert stats["open_trades"] == 0
+        assert stats["open_profit"] == 0.0
+        assert stats["first_close_timestamp"] == 1670334100000
+        assert self.database.rebuild_host_stats(host_id=host_id) == []
+
+        table_object = self.database.get_table_object(table_name="host_stats")
+        with Session(self.database.engine) as session:
+            session.execute(
+                update(table_object)
+                .where(table_object.c.host_id == host_id)
+                .values({"closed_trades": 10})
+            )
+            session.commit()
+        mismatches = self.database.rebuild_host_stats(host_id=host_id)
+        assert len(mismatches) == 2
+        assert mismatches[0]["column"] == "closed_trades"
+        assert self.database.rebuild_host_stats(host_id=host_id) == []
+
+    def test_equity_rollups(self):
+        host_id = 92
+        day = 24 * 60 * 60 * 1000
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=1, close_timestamp=day * 19000 + 5, profit_abs=2.0),
+                make_trade(trade_id=2, close_timestamp=day * 19002 + 5, profit_abs=1.0),
+                make_trade(trade_id=3, close_timestamp=None, profit_abs=5.0),
+            ],
+            host_id=host_id,
+        )
+        equity = self.database.get_equity(host_id=host_id)["USDT"]
+        assert equity["bucket"] == [day * 19000, day * 19002]
+        assert equity["profit"] == [2.0, 1.0]
+        assert equity["cumulative_profit"] == [2.0, 3.0]
+        assert equity["fees"][0] == 0.01286 + 0.013
+
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=3, close_timestamp=day * 19001, profit_abs=-0.5),
+                make_trade(trade_id=1, close_timestamp=day * 19000 + 5, profit_abs=2.5),
+            ],
+            host_id=host_id,
+        )
+        equity = self.database.get_equity(host_id=host_id)["USDT"]
+        assert equity["bucket"] == [day * 19000, day * 19001, day * 19002]
+        assert equity["trades"] == [1, 1, 1]
+        assert equity["cumulative_profit"] == [2.5, 2.0, 3.0]
+        hourly = self.database.get_equity(host_id=host_id, period="1h")["USDT"]
+        assert hourly["cumulative_profit"] == [2.5, 2.0, 3.0]
+
+        before = self.database.get_equity(host_id=host_id, period="1h")
+        self.database.rebuild_equity_rollups(host_id=host_id)
+        assert self.database.get_equity(host_id=host_id, period="1h") == before
+
+    def test_performance_analytics(self):
+        host_id = 93
+        analytics = PerformanceAnalytics(database=self.database)
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=1, close_timestamp=1670334197000, profit_abs=3.0),
+                make_trade(trade_id=2, close_timestamp=1670334198000, profit_abs=-1.0),
+            ],
+            host_id=host_id,
+        )
+        result = analytics.get(host_id=host_id, window=2)
+        assert result["trades"] == 2
+        assert result["exit_reason"]["roi"]["win_rate"] == 0.5
+        assert result["rolling"]["profit"] == [2.0]
+        assert analytics.get(host_id=host_id, window=2) is result
+        self.database.check_then_add_trades(
+            data=[make_trade(trade_id=4, close_timestamp=None, profit_abs=0.2)],
+            host_id=host_id,
+        )
+        assert analytics.get(host_id=host_id, window=2) is result
+
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=3, close_timestamp=1670334199000, profit_abs=1.0)
+            ],
+            host_id=host_id,
+        )
+        result = analytics.get(host_id=host_id, window=2)
+        assert result["trades"] == 3
+        assert result["rolling"]["profit"] == [2.0, 0.0]
+
+        with patch.object(
+            self.database, "get_starting_capital", return_value=100.0
+        ) as get_starting_capital:
+            result = analytics.get(host_id=host_id, window=2)
+            assert result["max_drawdown_pct"] == 1 / 103 * 100
+            assert analytics.get(host_id=host_id, window=2) is result
+            get_starting_capital.return_value = 200.0
+            result = analytics.get(host_id=host_id, window=2)
+            assert result["max_drawdown_pct"] == 1 / 203 * 100
+
+    def test_performance_analytics_cache_bound(self):
+        analytics = PerformanceAnalytics(database=self.database, max_entries=2)
+        first = analytics.get(host_id=93, window=2)
+        analytics.get(host_id=93, window=3)
+        assert analytics.get(host_id=93, window=2) is first
+        analytics.get(host_id=93, window=4)
+        assert list(analytics.cache) == [(93, 2), (93, 4)]
+
+    def test_performance_groups(self):
+        host_id = 94
+        analytics = PerformanceAnalytics(database=self.database)
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=1, close_timestamp=1670333406846, profit_abs=3.0),
+                make_trade(trade_id=2, close_timestamp=1670331606846, profit_abs=-1.0),
+                make_trade(
+                    trade_id=3,
+                    close_timestamp=1670331606846,
+                    profit_abs=1.0,
+                    pair="ETH/USDT",
+                    enter_tag="breakout",
+                ),
+                make_trade(trade_id=4, close_timestamp=None, profit_abs=9.0),
+            ],
+            host_id=host_id,
+        )
+        pairs = analytics.get_performance(group_by="pair", host_id=host_id)
+        assert pairs == [
+            {
+                "pair": "SUSHI/USDT",
+                "quote_currency": "USDT",
+                "trades": 2,
+                "win_rate": 0.5,
+                "profit": 2.0,
+                "avg_profit": 1.0,
+                "avg_duration_minutes": 45.0,
+            },
+            {
+                "pair": "ETH/USDT",
+                "quote_currency": "USDT",
+                "trades": 1,
+                "win_rate": 1.0,
+                "profit": 1.0,
+                "avg_profit": 1.0,
+                "avg_duration_minutes": 30.0,
+            },
+        ]
+        assert analytics.get_performance(group_by="pair", host_id=host_id) is pairs
+        tags = analytics.get_performance(group_by="enter_tag", host_id=host_id)
+        assert [tag["enter_tag"] for tag in tags] == ["force_entry", "breakout"]
+
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=4, close_timestamp=1670333406846, profit_abs=9.0)
+            ],
+            host_id=host_id,
+        )
+        pairs = analytics.get_performance(group_by="pair", host_id=host_id)
+        assert pairs[0]["trades"] == 3
+        assert pairs[0]["profit"] == 11.0
+
+    def test_strategy_performance(self):
+        host_id = self.database.check_then_add_or_update_host(
+            data={
+                "host": "127.0.0.11:11",
+                "remote_host": "127.0.0.12:12",
+                "exchange": "binance",
+                "strategy": "GridRunner",
+                "state": "running",
+                "stake_currency": "USDT",
+                "trading_mode": "SPOT",
+                "run_mode": "dry",
+                "ft_version": "2023.1",
+                "strategy_version": "v1.0",
+            }
+        )
+        self.database.update_starting_capital(data=1000.0, host_id=host_id)
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=1, close_timestamp=1670333406846, profit_abs=3.0),
+                make_trade(
+                    trade_id=2,
+                    close_timestamp=1670331606846,
+                    profit_abs=-1.0,
+                    pair="ETH/BTC",
+                ),
+                make_trade(trade_id=3, close_timestamp=1670331606846, profit_abs=1.0),
+                make_trade(trade_id=4, close_timestamp=None, profit_abs=9.0),
+            ],
+            host_id=host_id,
+        )
+        strategies = self.database.get_performance(group_by="strategy", host_id=host_id)
+        assert strategies == [
+            {
+                "strategy": "GridRunner",
+                "quote_currency": "USDT",
+                "trades": 2,
+                "win_rate": 1.0,
+                "profit": 4.0,
+                "avg_profit": 2.0,
+                "avg_duration_minutes": 45.0,
+            },
+            {
+                "strategy": "GridRunner",
+                "quote_currency": "BTC",
+                "trades": 1,
+                "win_rate": 0.0,
+                "profit": -1.0,
+                "avg_profit": -1.0,
+                "avg_duration_minutes": 30.0,
+            },
+        ]
+        fleet = self.database.get_performance(group_by="strategy")
+        assert [
+            (row["quote_currency"], row["trades"])
+            for row in fleet
+            if row["strategy"] == "GridRunner"
+        ] == [("USDT", 2), ("BTC", 1)]
+        currencies = self.database.get_performance(
+            group_by="base_currency", host_id=host_id
+        )
+        assert [row["base_currency"] for row in currencies] == ["SUSHI", "ETH"]
+
+    def test_sysinfo_compaction(self):
+        host_id = 95
+        for minute, cpu, ram in [(0, [10, 30], 40), (2, [20, 40], 50), (7, [0, 0], 60)]:
+            with freeze_time(datetime(2023, 1, 1, 12, minute)):
+                self.database.add_sysinfo(
+                    data={"host_id": host_id, "cpu_pct": cpu, "ram_pct": ram}
+                )
+        start = int(datetime(2023, 1, 1, 12, tzinfo=timezone.utc).timestamp() * 1000)
+        raw = self.database.get_sysinfo_series(
+            host_id=host_id, start=start, end=start + 60 * 60 * 1000
+        )
+        assert raw["resolution"] == "raw"
+        assert raw["cpu_avg"] == [20.0, 30.0, 0.0]
+        assert raw["cpu_cores"][1] == [20, 40]
+
+        now = start + 8 * 24 * 60 * 60 * 1000
+        cutoff = now - 7 * 24 * 60 * 60 * 1000
+        # a one row chunk still takes the rest of its 5m bucket along
+        rolled = [
+            self.database.rollup_sysinfo(
+                source="raw", target="5m", cutoff=cutoff, batch_size=1
+            )
+            for _ in range(3)
+        ]
+        assert rolled == [2, 1, 0]
+        series = self.database.get_sysinfo_series(
+            host_id=host_id, start=start, end=start + 60 * 60 * 1000
+        )
+        assert series["timestamp"] == [start, start + 5 * 60 * 1000]
+        assert series["cpu_avg"] == [25.0, 0.0]
+        assert series["cpu_min"] == [10, 0]
+        assert series["cpu_max"] == [40, 0]
+        assert series["cpu_cores"][0] == [15.0, 35.0]
+        assert series["ram_avg"] == [45.0, 60.0]
+
+        writer = DatabaseWriter(database=self.database)
+        retention_jobs = RetentionJobs(database=self.database, writer=writer)
+        report = retention_jobs.compact_sysinfo(now=now + 30 * 24 * 60 * 60 * 1000)
+        assert report["raw"] == 0
+        assert report["5m"] == 2
+        # one job per source resolution, the chunks are smaller than a batch
+        assert writer.cycle_report()["jobs"] == 3
+        weekly = self.database.get_sysinfo_series(
+            host_id=host_id, start=start, end=start + 7 * 24 * 60 * 60 * 1000
+        )
+        assert weekly["resolution"] == "1h"
+        assert weekly["timestamp"] == [start]
+        assert weekly["cpu_avg"] == [50 / 3]
+        assert weekly["ram_max"] == [60]
+
+    @patch("freqdash.scraper.scraper.send_public_request")
+    def test_logs(self, send_post):
+        host_id = 96
+        base = 1674114866000
+        buffer = [
+            ["", base + i * 1000.5, "freqtrade.worker", level, f"line {i}"]
+            for i, level in enumerate(["INFO", "WARNING", "INFO", "ERROR"] * 50)
+        ]
+        send_post.side_effect = lambda **kwargs: (
+            "header",
+            {"logs": buffer[-kwargs["payload"]["limit"] :]},
+        )
+        logs = self.scraper.get_logs(tunnel=self.scraper.tunnels[0], limit=50)
+        assert len(logs) == 200
+        assert send_post.call_count == 3
+        self.database.update_logs(data=logs, host_id=host_id)
+        assert self.database.get_last_log_timestamp(host_id=host_id) == int(
+            base + 199 * 1000.5
+        )
+
+        send_post.reset_mock()
+        buffer.append(["", base + 300000.2, "freqtrade.worker", "INFO", "new"])
+        logs = self.scraper.get_logs(
+            tunnel=self.scraper.tunnels[0],
+            since=self.database.get_last_log_timestamp(host_id=host_id),
+        )
+        assert [log_item[4] for log_item in logs] == ["new"]
+        assert send_post.call_count == 1
+        self.database.update_logs(data=logs, host_id=host_id)
+        self.database.update_logs(data=logs, host_id=host_id)
+
+        tail = self.database.get_logs_tail(host_id=host_id, limit=3)
+        assert [line["message"] for line in tail] == ["new", "line 199", "line 198"]
+        errors = self.database.get_logs_tail(host_id=host_id, level="ERROR", limit=2)
+        assert [line["message"] for line in errors] == ["line 199", "line 195"]
+        warnings = self.database.get_logs_tail(
+            host_id=host_id, level="WARNING", before=base + 196000
+        )
+        assert [line["message"] for line in warnings][:2] == ["line 195", "line 193"]
+
+        retention_jobs = RetentionJobs(
+            database=self.database, writer=DatabaseWriter(database=self.database)
+        )
+        policy = RetentionPolicy(
+            "logs", column="timestamp", max_age_days=30, max_rows_per_host=150
+        )
+        removed = retention_jobs.apply(policy, now=base + 10 * 24 * 60 * 60 * 1000)
+        assert removed == 51
+        assert len(self.database.get_logs_tail(host_id=host_id, limit=1000)) == 150
+        removed = retention_jobs.apply(policy, now=base + 31 * 24 * 60 * 60 * 1000)
+        assert removed == 150
+        assert self.database.get_last_log_timestamp(host_id=host_id) == 0
+
+    def test_balance_snapshots(self):
+        host_id = 97
+
+        def balances(usdt: float, value: float) -> list:
+            return [
+                {"currency": "USDT", "free": usdt, "balance": usdt, "est_stake": usdt},
+                {"currency": "BTC", "free": 0.01, "balance": 0.01, "est_stake": value},
+            ]
+
+        for day, hour, usdt, value in [
+            (1, 10, 100.0, 200.0),
+            (1, 11, 100.0, 200.1),
+            (1, 12, 100.0, 210.0),
+            (1, 13, 90.0, 210.0),
+            (2, 10, 90.0, 210.0),
+            (2, 11, 80.0, 230.0),
+        ]:
+            with freeze_time(datetime(2023, 1, day, hour)):
+                self.database.update_balances(
+                    data=balances(usdt, value), host_id=host_id
+                )
+        assert self.database.get_balances(host_id=host_id) == [
+            (host_id, "BTC", 0.01, 0.01),
+            (host_id, "USDT", 80.0, 80.0),
+        ]
+        start = int(datetime(2023, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+        hour = 60 * 60 * 1000
+        portfolio = self.database.get_portfolio_value(host_id=host_id)
+        assert portfolio["timestamp"] == [
+            start + 10 * hour,
+            start + 12 * hour,
+            start + 13 * hour,
+            start + 35 * hour,
+        ]
+        assert portfolio["value"] == [300.0, 310.0, 300.0, 310.0]
+        assert self.database.get_portfolio_value(
+            host_id=host_id, start=start + 11 * hour, end=start + 24 * hour
+        )["value"] == [310.0, 300.0]
+
+        removed = self.database.compact_balance_snapshots(
+            now=start + 31 * 24 * hour + 12 * hour
+        )
+        assert removed == 4
+        portfolio = self.database.get_portfolio_value(host_id=host_id)
+        assert portfolio["timestamp"] == [start + 13 * hour, start + 35 * hour]
+        assert self.database.compact_balance_snapshots(now=start + 40 * 24 * hour) == 0
+
+        for report_hour in [12, 13]:
+            with freeze_time(datetime(2023, 2, 10, report_hour)):
+                self.database.update_balances(data=[], host_id=host_id)
+        assert self.database.get_balances(host_id=host_id) == []
+        assert self.database.get_latest_balance_snapshot(host_id=host_id) == {}
+        portfolio = self.database.get_portfolio_value(host_id=host_id, start=start)
+        assert portfolio["value"] == [300.0, 310.0, 0.0]
+        with freeze_time(datetime(2023, 2, 10, 14)):
+            self.database.update_balances(data=balances(80.0, 230.0), host_id=host_id)
+        assert len(self.database.get_balances(host_id=host_id)) == 2
+        assert self.database.get_portfolio_value(host_id=host_id)["value"][-1] == 310.0
+
+    def test_price_snapshot(self):
+        self.database.delete_then_update_price(
+            exchange="kucoin",
+            market="FUTURES",
+            data={"XBTUSDTM": Decimal("20000.5"), "ETHUSDTM": Decimal("1500")},
+        )
+        prices = self.database.get_all_prices(trading_mode="FUTURES")
+        assert sorted(prices) == [
+            ("kucoin", "ETHUSDTM", 1500.0),
+            ("kucoin", "XBTUSDTM", 20000.5),
+        ]
+        self.database.delete_then_update_price(
+            exchange="kucoin", market="FUTURES", data={}
+        )
+        assert self.database.get_all_prices(trading_mode="FUTURES") == []
+
+    def test_open_trade_snapshots(self):
+        host_id = 98
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(
+                    trade_id=1, close_timestamp=None, profit_abs=0.0, exchange="gateio"
+                ),
+                make_trade(
+                    trade_id=2,
+                    close_timestamp=None,
+                    profit_abs=0.0,
+                    pair="ETH/USDT",
+                    exchange="gateio",
+                    is_short=True,
+                ),
+                make_trade(
+                    trade_id=3,
+                    close_timestamp=1670334197000,
+                    profit_abs=1.0,
+                    exchange="gateio",
+                ),
+            ],
+            host_id=host_id,
+        )
+
+        for now, sushi, eth in [(1000, 1.386, 1.186), (2000, 1.186, 1.386)]:
+            self.database.delete_then_update_price(
+                exchange="gateio",
+                market="SPOT",
+                data={"SUSHIUSDT": sushi, "ETHUSDT": eth, "BTCUSDT": 20000},
+            )
+            assert self.database.snapshot_open_trades(now=now) == 2
+        self.database.delete_then_update_price(
+            exchange="gateio", market="SPOT", data={}
+        )
+
+        exposure = self.database.get_exposure(host_id=host_id)["USDT"]
+        assert exposure["timestamp"] == [1000, 2000]
+        assert exposure["open_trades"] == [2, 2]
+        assert exposure["stake_amount"] == [25.72, 25.72]
+        assert exposure["unrealized_profit"] == [2.0, -2.0]
+        history = self.database.get_open_trade_history(host_id=host_id, trade_id=2)
+        assert history["price"] == [1.186, 1.386]
+        assert history["unrealized_profit"] == [1.0, -1.0]
+        assert self.database.get_exposure(host_id=host_id, start=1500)["USDT"][
+            "timestamp"
+        ] == [2000]
+
+        retention_jobs = RetentionJobs(
+            database=self.database, writer=DatabaseWriter(database=self.database)
+        )
+        policy = RetentionPolicy(
+            "open_trade_snapshots", column="timestamp", max_age_days=14
+        )
+        now = 2000 + 14 * 24 * 60 * 60 * 1000
+        assert retention_jobs.apply(policy, now=now) == 2
+        history = self.database.get_open_trade_history(host_id=host_id, trade_id=2)
+        assert history["timestamp"] == [2000]
+
+        # a symbol listed twice must not snapshot the trade twice
+        self.database.delete_then_update_price(
+            exchange="gateio",
+            market="SPOT",
+            data={"SUSHIUSDT": 1.386, "ETHUSDT": 1.186},
+        )
+        with self.database.write_session() as session:
+            session.execute(
+                insert(self.database.get_table_object(table_name="prices")),
+                [
+                    {
+                        "exchange": "gateio",
+                        "trading_mode": "SPOT",
+                        "symbol": "SUSHIUSDT",
+                        "price": 1.486,
+                        "updated": 0,
+                    }
+                ],
+            )
+        assert self.database.snapshot_open_trades(now=now) == 2
+        history = self.database.get_open_trade_history(host_id=host_id, trade_id=1)
+        assert history["price"] == [1.186, 1.386]
+        self.database.delete_then_update_price(
+            exchange="gateio", market="SPOT", data={}
+        )
+
+    @patch("freqdash.scraper.scraper.send_public_request")
+    def test_update_freqtrade_stats(self, send_post):
+        host_id = self.database.check_then_add_or_update_host(
+            data={
+                "host": "127.0.0.9:9",
+                "remote_host": "127.0.0.10:10",
+                "exchange": "binance",
+                "strategy": "PocketRocket",
+                "state": "running",
+                "stake_currency": "USDT",
+                "trading_mode": "SPOT",
+                "run_mode": "dry",
+                "ft_version": "2023.1",
+                "strategy_version": "v1.5",
+            }
+        )
+        self.database.update_starting_capital(data=1000.0, host_id=host_id)
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(trade_id=1, close_timestamp=1670334197000, profit_abs=3.0),
+                make_trade(trade_id=2, close_timestamp=1670334198000, profit_abs=-1.0),
+            ],
+            host_id=host_id,
+        )
+        tunnel = self.scraper.tunnels[0]
+        send_post.return_value = [
+            "header",
+            {
+                "trade_count": 2,
+                "closed_trade_count": 2,
+                "winning_trades": 1,
+                "losing_trades": 1,
+                "profit_closed_coin": 2.0,
+                "profit_all_coin": 2.0,
+                "profit_factor": 3.0,
+                "max_drawdown": 0.1,
+                "max_drawdown_abs": 1.0,
+                "first_trade_timestamp": 1670329806846,
+                "latest_trade_timestamp": 1670334198000,
+            },
+        ]
+        profit = self.scraper.get_profit(tunnel=tunnel)
+        send_post.return_value = [
+            "header",
+            {
+                "data": [
+                    {
+                        "date": "2022-12-06",
+                        "abs_profit": 2.0,
+                        "starting_balance": 1000.0,
+                        "rel_profit": 0.002,
+                        "fiat_value": 2.0,
+                        "trade_count": 2,
+                    }
+                ],
+                "stake_currency": "USDT",
+            },
+        ]
+        daily = self.scraper.get_daily(tunnel=tunnel)
+        assert send_post.call_args.kwargs["payload"] == {"timescale": 30}
+        send_post.return_value = [
+            "header",
+            [
+                {
+                    "pair": "SUSHI/USDT",
+                    "profit": 0.2,
+                    "profit_ratio": 0.002,
+                    "profit_abs": 2.0,
+                    "count": 2,
+                }
+            ],
+        ]
+        performance = self.scraper.get_performance(tunnel=tunnel)
+        send_post.return_value = [
+            "header",
+            {
+                "exit_reasons": {"roi": {"wins": 1, "losses": 1, "draws": 0}},
+                "durations": {"wins": 4390.0, "draws": None, "losses": 4391.0},
+            },
+        ]
+        stats = self.scraper.get_stats(tunnel=tunnel)
+        self.database.update_freqtrade_stats(
+            host_id=host_id,
+            profit=profit,
+            daily=daily,
+            performance=performance,
+            stats=stats,
+        )
+        self.database.update_freqtrade_stats(
+            host_id=host_id,
+            profit=profit,
+            daily=daily,
+            performance=performance,
+            stats=stats,
+        )
+        stored = self.database.get_freqtrade_profit(host_id=host_id)
+        assert stored["closed_trade_count"] == 2
+        assert stored["wins_duration"] == 4390.0
+        assert self.database.check_freqtrade_stats(host_id=host_id) == []
+        with patch.object(self.database, "get_host_stats") as get_host_stats:
+            instance = self.database.get_all_hosts(index=True)["dry"][host_id]
+        assert call(host_id=host_id) not in get_host_stats.call_args_list
+        assert instance["closed_trades"] == 2
+        assert instance["winning_trades"] == 1
+        assert instance["losing_trades"] == 1
+        assert instance["draw_trades"] == 0
+        assert instance["open_trades"] == 0
+        assert instance["profit_factor"] == 3.0
+
+        profit["profit_closed_coin"] = 2.5
+        performance[0]["count"] = 3
+        self.database.update_freqtrade_stats(
+            host_id=host_id,
+            profit=profit,
+            daily=daily,
+            performance=performance,
+            stats=stats,
+        )
+        mismatches = self.database.check_freqtrade_stats(host_id=host_id)
+        assert [(m["scope"], m["column"]) for m in mismatches] == [
+            ("profit", "closed_profit"),
+            ("SUSHI/USDT", "trades"),
+        ]
+
+    @patch("freqdash.scraper.scraper.send_public_request")
+    def test_sync_trades(self, send_post):
+        host_id = 99
+        remote = {
+            "closed": [
+                make_trade(trade_id=i, close_timestamp=1670334100000 + i, profit_abs=1)
+                for i in range(1, 6)
+            ],
+            "open": [make_trade(trade_id=6, close_timestamp=None, profit_abs=0)],
+            "lookup": [],
+        }
+        pages = []
+
+        def freqtrade(url, method="GET", payload=None, access_token=None):
+            if url.endswith("/trades"):
+                pages.append(payload["offset"])
+                closed = remote["closed"]
+                return "header", {
+                    "trades": closed[
+                        payload["offset"] : payload["offset"] + payload["limit"]
+                    ],
+                    "total_trades": len(closed),
+                }
+            if url.endswith("/status"):
+                return "header", remote["open"]
+            trade_id = int(url.rsplit("/", 1)[1])
+            for trade in remote["closed"] + remote["open"] + remote["lookup"]:
+                if trade["trade_id"] == trade_id:
+                    return "header", trade
+            return "header", {"detail": "Trade not found."}
+
+        send_post.side_effect = freqtrade
+        tunnel = self.scraper.tunnels[0]
+        sync = self.scraper.sync_trades(tunnel=tunnel, host_id=host_id, page_size=2)
+        self.scraper.write_snapshot({"host": "sync", "host_id": host_id, **sync})
+        assert sync["report"] == {"pages": 3, "closed": 5, "open": 1, "refetched": 0}
+        assert pages == [0, 2, 4]
+        state = self.database.get_trade_sync_state(host_id=host_id)
+        assert state["max_closed_trade_id"] == 5
+        assert state["last_close_timestamp"] == 1670334100005
+        assert state["closed_trade_count"] == 5
+        assert self.database.get_open_trade_ids(host_id=host_id) == [6]
+
+        # trade 6 closes and four more close before the next scrape: paging
+        # starts at the high-water mark and walks the new tail across pages
+        remote["closed"] += [
+            make_trade(trade_id=i, close_timestamp=1670334200000 + i, profit_abs=2)
+            for i in range(6, 11)
+        ]
+        remote["open"] = [make_trade(trade_id=11, close_timestamp=None, profit_abs=0)]
+        pages.clear()
+        sync = self.scraper.sync_trades(tunnel=tunnel, host_id=host_id, page_size=2)
+        self.scraper.write_snapshot({"host": "sync", "host_id": host_id, **sync})
+        assert sync["report"] == {"pages": 3, "closed": 5, "open": 1, "refetched": 0}
+        assert pages == [4, 6, 8]
+        state = self.database.get_trade_sync_state(host_id=host_id)
+        assert state["max_closed_trade_id"] == 10
+        assert state["closed_trade_count"] == 10
+        assert self.database.get_open_trade_ids(host_id=host_id) == [11]
+
+        # trades 1 and 2 were deleted on the bot and trade 11 left /status
+        # without showing up in /trades yet, so it is fetched on its own
+        remote["closed"] = remote["closed"][2:]
+        remote["open"] = []
+        remote["lookup"] = [
+            make_trade(trade_id=11, close_timestamp=1670334300000, profit_abs=3)
+        ]
+        pages.clear()
+        sync = self.scraper.sync_trades(tunnel=tunnel, host_id=host_id, page_size=2)
+        self.scraper.write_snapshot({"host": "sync", "host_id": host_id, **sync})
+        assert pages == [9, 7]
+        assert sync["report"] == {"pages": 2, "closed": 0, "open": 0, "refetched": 1}
+        assert self.database.get_open_trade_ids(host_id=host_id) == []
+        state = self.database.get_trade_sync_state(host_id=host_id)
+        assert state["closed_trade_count"] == 8
+        assert state["last_close_timestamp"] == 1670334300000
+
+    def test_host_snapshot_fingerprints(self):
+        self.scraper.cycle_report()
+        host = "127.0.0.8:8"
+        whitelist = ["BTC/USDT", "ETH/USDT"]
+        digest = self.scraper.changed(host=host, section="whitelist", data=whitelist)
+        assert digest is not None
+
+        # fingerprints only stick once the snapshot was written, so a failed
+        # transaction leaves nothing behind and the section is sent again
+        snapshot = {
+            "host": host,
+            "host_id": 89,
+            "trades": [make_trade(trade_id=1, close_timestamp=None, profit_abs=0)],
+            "whitelist": whitelist,
+            "logs": [[None, "not a timestamp"]],
+            "fingerprints": {"whitelist": digest},
+        }
+        with self.assertRaises(ValueError):
+            self.scraper.write_snapshot(snapshot)
+        assert self.database.get_open_trade_ids(host_id=89) == []
+        assert self.scraper.changed(host=host, section="whitelist", data=whitelist)
+
+        snapshot["logs"] = []
+        assert self.scraper.write_snapshot(snapshot) == 89
+        assert self.database.get_open_trade_ids(host_id=89) == [1]
+        assert self.scraper.host_ids[host] == 89
+        for _ in range(2):
+            assert (
+                self.scraper.changed(host=host, section="whitelist", data=whitelist)
+                is None
+            )
+        assert self.scraper.changed(
+            host=host, section="whitelist", data=whitelist + ["SUSHI/USDT"]
+        )
+
+        report = self.scraper.cycle_report()
+        assert report["whitelist"] == {"written": 3, "skipped": 2}
+        assert report["blacklist"] == {"written": 0, "skipped": 0}
+        assert report["skip_rate"] == 0.4
+        assert self.scraper.cycle_report()["skip_rate"] == 0.0
+
+    def test_sqlite_pragmas(self):
+        config = DBConfig(engine="sqlite", username="", password="", name="wal")
+        with tempfile.TemporaryDirectory() as folder:
+            for query_only in [False, True]:
+                connection = sqlite3.connect(Path(folder, "wal.db"))
+                sqlite_pragmas(config, query_only=query_only)(connection, None)
+                pragmas = {
+                    name: connection.execute(f"PRAGMA {name}").fetchone()[0]
+                    for name in [
+                        "auto_vacuum",
+                        "journal_mode",
+                        "synchronous",
+                        "cache_size",
+                        "busy_timeout",
+                        "query_only",
+                    ]
+                }
+                assert pragmas == {
+                    "auto_vacuum": 2,
+                    "journal_mode": "wal",
+                    "synchronous": 1,
+                    "cache_size": -64000,
+                    "busy_timeout": 5000,
+                    "query_only": int(query_only),
+                }
+                if query_only:
+                    with self.assertRaises(sqlite3.OperationalError):
+                        connection.execute("CREATE TABLE readonly (id INTEGER)")
+                connection.close()
+
+    def test_pool_status(self):
+        assert self.database.get_pool_status() == {
+            "write": {"pool": "SingletonThreadPool"}
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            engine = create_engine(
+                f"sqlite:///{folder}/pool.db",
+                poolclass=MeteredQueuePool,
+                pool_size=1,
+                max_overflow=0,
+                pool_timeout=0.2,
+            )
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                status = pool_status(engine)
+                assert status["checked_out"] == 1
+                assert status["waiting"] == 0
+                waiting = []
+
+                def checkout():
+                    try:
+                        with engine.connect():
+                            pass
+                    except exc.TimeoutError:
+                        waiting.append(True)
+
+                thread = threading.Thread(target=checkout)
+                thread.start()
+                time.sleep(0.05)
+                assert pool_status(engine)["waiting"] == 1
+                thread.join()
+            assert waiting == [True]
+            assert pool_status(engine) == {
+                "pool": "MeteredQueuePool",
+                "size": 1,
+                "checked_out": 0,
+                "idle": 1,
+                "overflow": 0,
+                "waiting": 0,
+                "timeouts": 1,
+            }
+            engine.dispose()
+
+    def test_async_database(self):
+        async_database = AsyncDatabase(database=self.database)
+        assert async_database.engine is None
+        assert async_database.get_pool_status() == {"pool": "sync"}
+        self.database.delete_then_update_news(
+            exchange="kucoin",
+            data=[
+                {
+                    "headline": f"KuCoin token {i} airdrop",
+                    "category": "airdrop",
+                    "hyperlink": f"https://www.kucoin.com/news/{i}",
+                    "news_time": 1679414400000 + i * 1000,
+                }
+                for i in range(5)
+            ],
+        )
+
+        def strip(items: list) -> list:
+            return [{k: v for k, v in i.items() if k != "timestamp"} for i in items]
+
+        async def read():
+            return await asyncio.gather(
+                async_database.get_count_news_items(exchange="kucoin"),
+                async_database.get_news_items(start=None, end=None, exchange="kucoin"),
+                async_database.get_news_page(exchange="kucoin", limit=2),
+                async_database.search_news(query="token", exchange="kucoin"),
+                async_database.get_trades_page(host_id=98),
+                async_database.get_instance(instance_id=9999),
+            )
+
+        count, items, page, search, trades, instance = asyncio.run(read())
+        assert count == 5
+        assert strip(items) == strip(
+            self.database.get_news_items(start=None, end=None, exchange="kucoin")
+        )
+        assert (
+            page["next_cursor"]
+            == self.database.get_news_page(exchange="kucoin", limit=2)["next_cursor"]
+        )
+        assert len(search) == 5
+        assert trades == {"items": [], "next_cursor": None}
+        assert instance == {}
+        self.database.delete_then_update_news(exchange="kucoin", data=[])
+
+        with tempfile.TemporaryDirectory() as folder:
+            engine = create_engine(f"sqlite:///{folder}/async.db")
+            self.database.Base.metadata.create_all(engine)
+            news_table = self.database.get_table_object(table_name="news")
+            with engine.begin() as connection:
+                connection.execute(
+                    news_table.insert(),
+                    [
+                        {
+                            "exchange": "okx",
+                            "headline": f"OKX news {i}",
+                            "category": "latest",
+                            "hyperlink": f"https://www.okx.com/{i}",
+                            "news_time": 1679414400000 + i,
+                        }
+                        for i in range(3)
+                    ],
+                )
+            async_database.engine = create_async_engine(
+                f"sqlite+aiosqlite:///{folder}/async.db"
+            )
+
+            async def native():
+                result = await asyncio.gather(
+                    async_database.get_count_news_items(exchange="okx"),
+                    async_database.get_news_page(exchange="okx", limit=2),
+                )
+                await async_database.dispose()
+                return result
+
+            count, page = asyncio.run(native())
+            engine.dispose()
+        assert count == 3
+        assert [item["headline"] for item in page["items"]] == [
+            "OKX news 2",
+            "OKX news 1",
+        ]
+        assert page["next_cursor"] is not None
+
+    def test_partitions(self):
+        assert self.database.partitioned_tables == []
+        assert self.database.create_partitions() == []
+        assert month_ranges(1765000000000, 2) == [
+            ("202512", 1764547200000, 1767225600000),
+            ("202601", 1767225600000, 1769904000000),
+            ("202602", 1769904000000, 1772323200000),
+        ]
+        assert partition_args(False, "timestamp") == {}
+        table_object = Table(
+            "partitioned_logs",
+            MetaData(),
+            Column("id", Integer, primary_key=True, autoincrement=True),
+            Column("timestamp", BigInteger, primary_key=True),
+            **partition_args(True, "timestamp"),
+        )
+        ddl = str(CreateTable(table_object).compile(dialect=postgresql.dialect()))
+        assert "PRIMARY KEY (id, timestamp)" in ddl
+        assert "PARTITION BY RANGE (timestamp)" in ddl
+
+    def test_reclaim_space(self):
+        def free_pages() -> int:
+            with self.database.engine.connect() as connection:
+                return connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+        writer = DatabaseWriter(database=self.database)
+        retention_jobs = RetentionJobs(
+            database=self.database,
+            writer=writer,
+            retention=Retention(batch_size=100, vacuum=False),
+        )
+        assert self.database.get_auto_vacuum() == 0
+        with self.assertLogs("freqdash.models.retention", level="WARNING"):
+            retention_jobs.reclaim_space(tables=["news"])
+        assert self.database.get_auto_vacuum() == 0
+
+        retention_jobs.retention.vacuum = True
+        retention_jobs.reclaim_space(tables=["news"])
+        assert self.database.get_auto_vacuum() == 2
+
+        self.database.delete_then_update_news(
+            exchange="mexc",
+            data=[
+                {
+                    "headline": "x" * 2000,
+                    "category": "Listing",
+                    "hyperlink": f"https://www.mexc.com/{i}",
+                    "news_time": 1679414400000 + i,
+                }
+                for i in range(1000)
+            ],
+        )
+        self.database.delete_then_update_news(exchange="mexc", data=[])
+        free = free_pages()
+        assert free > 250
+        writer.cycle_report()
+        assert retention_jobs.reclaim_space(tables=["news"]) >= free * 4096
+        assert free_pages() == 0
+        # one job per 100 pages, every job frees a whole batch
+        assert writer.cycle_report()["jobs"] == free // 100 + 1
+
+    def test_retention(self):
+        day = 24 * 60 * 60 * 1000
+        now = 1679414400000 + 100 * day
+        self.database.delete_then_update_news(
+            exchange="bybit",
+            data=[
+                {
+                    "headline": f"Bybit announcement {i}",
+                    "category": "announcement",
+                    "hyperlink": f"https://announcements.bybit.com/{i}",
+                    "news_time": 1679414400000 + i * day,
+                }
+                for i in range(25)
+            ],
+        )
+        writer = DatabaseWriter(database=self.database)
+        jobs = []
+        submit = writer.submit
+
+        def count_jobs(function, *args, **kwargs):
+            jobs.append(function.__name__)
+            return submit(function, *args, **kwargs)
+
+        writer.submit = count_jobs  # type: ignore
+        retention = Retention(batch_size=100, news_days=90)
+        retention_jobs = RetentionJobs(
+            database=self.database, writer=writer, retention=retention
+        )
+        retention.batch_size = 4
+        policy = RetentionPolicy("news", column="news_time", max_age_days=90)
+        assert retention_jobs.apply(policy, now=now) == 10
+        assert jobs.count("delete_batch") == 3
+        assert self.database.get_count_news_items(exchange="bybit") == 15
+
+        report = retention_jobs.run(now=now)
+        assert set(report["removed"]) == {
+            "sysinfo_series",
+            "balance_snapshots",
+            "logs",
+            "open_trade_snapshots",
+            "news",
+            "prices",
+        }
+        assert report["removed"]["news"] == 0
+        assert report["reclaimed_bytes"] >= 0
+        assert retention_jobs.last_report is report
+        self.database.delete_then_update_news(exchange="bybit", data=[])
+
+    def test_export(self):
+        host_id = 88
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(
+                    trade_id=i,
+                    close_timestamp=None if i % 5 == 0 else 1670334197000 + i,
+                    profit_abs=i * 0.1,
+                    pair="ETH/USDT" if i % 2 else "SUSHI/USDT",
+                    open_timestamp=1670329806846 + i * 1000,
+                )
+                for i in range(1, 26)
+            ],
+            host_id=host_id,
+        )
+        chunks = list(
+            stream_export(
+                database=self.database,
+                table_name="trades",
+                export_format="parquet",
+                host_id=host_id,
+                pair="ETH/USDT",
+                chunk_size=4,
+            )
+        )
+        assert len(chunks) == 5
+        trades = pq.read_table(io.BytesIO(b"".join(chunks)))
+        assert trades.num_rows == 13
+        assert trades.column("trade_id").to_pylist() == list(range(1, 26, 2))
+        assert trades.schema.field("profit_abs").type == pa.float64()
+        assert trades.column("close_timestamp").null_count == 3
+
+        data = b"".join(
+            stream_export(
+                database=self.database,
+                table_name="trades",
+                export_format="arrow",
+                host_id=host_id,
+                start=1670329806846 + 10 * 1000,
+                end=1670329806846 + 20 * 1000,
+            )
+        )
+        trades = pa.ipc.open_file(io.BytesIO(data)).read_all()
+        assert trades.column("trade_id").to_pylist() == list(range(10, 20))
+
+        data = b"".join(
+            stream_export(database=self.database, table_name="orders", host_id=host_id)
+        )
+        orders = pq.read_table(io.BytesIO(data))
+        assert orders.num_rows == 0
+        assert "order_timestamp" in orders.schema.names
+
+    def test_stream_records(self):
+        host_id = 89
+        self.database.check_then_add_trades(
+            data=[
+                make_trade(
+                    trade_id=i,
+                    close_timestamp=None if i == 7 else 1670334197000 + i,
+                    profit_abs=Decimal("0.5"),
+                )
+                for i in range(1, 8)
+            ],
+            host_id=host_id,
+        )
+        chunks = list(
+            stream_records(
+                self.database.stream_closed_trades(host_id=host_id, chunk_size=2),
+                batch_size=4,
+            )
+        )
+        assert len(chunks) == 3
+        trades = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        assert [trade["trade_id"] for trade in trades] == [6, 5, 4, 3, 2, 1]
+        assert all(trade["host_id"] == host_id for trade in trades)
+
+        data = b"".join(
+            stream_records(
+                self.database.stream_closed_trades(host_id=host_id),
+                stream_format="csv",
+            )
+        )
+        trades = list(csv.DictReader(io.StringIO(data.decode())))
+        assert [trade["trade_id"] for trade in trades] == ["6", "5", "4", "3", "2", "1"]
+        assert trades[0]["profit_abs"] == "0.5"
+
+        lines = b"".join(
+            stream_records([{"symbol": "BTCUSDT", "price": Decimal("1.5")}])
+        ).splitlines()
+        assert json.loads(lines[0]) == {"symbol": "BTCUSDT", "price": 1.5}
+        assert list(stream_records([])) == []
+
 
 if __name__ == "__main__":
     unittest.main()